@@ -5,8 +5,10 @@ from langchain_community.tools import DuckDuckGoSearchRun, WikipediaQueryRun
 from langchain_community.utilities import WikipediaAPIWrapper
 from langgraph.graph import StateGraph, END
 from pydantic import BaseModel
+import os
 import typing
 import json
+from src.config.ollama_config import OllamaConfig
 
 # Initialize session state
 if 'messages' not in st.session_state:
@@ -24,6 +26,9 @@ def update_current_step(step):
 
 # Set up the LLM
 llm = "gemma3:4b"
+# One pooled client for every turn; keep_alive keeps the model loaded and num_ctx stays fixed so it is never reloaded
+ollama_client = ollama.Client(host=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+ollama_options = {"num_ctx": OllamaConfig.get_num_ctx(), "num_predict": OllamaConfig.ollama_num_predict}
 
 # Tool definitions
 @tool("tool_browser")
@@ -134,7 +139,8 @@ def node_agent(state):
                 {"role":"user", "content":state["user_q"]},
                 *save_memory(lst_res=state["lst_res"], user_q=state["user_q"])]
     
-    llm_res = ollama.chat(model=llm, messages=messages, format="json")
+    llm_res = ollama_client.chat(model=llm, messages=messages, format="json", options=ollama_options,
+                                 keep_alive=OllamaConfig.ollama_keep_alive)
     agent_res = AgentRes.from_llm(llm_res)
     return {"lst_res":[agent_res]}
 
@@ -151,7 +157,8 @@ def node_agent_2(state):
                 {"role":"user", "content":output_text},
                 *save_memory(lst_res=state["lst_res"], user_q=state["user_q"])]
     
-    llm_res = ollama.chat(model=llm, messages=messages, format="json")
+    llm_res = ollama_client.chat(model=llm, messages=messages, format="json", options=ollama_options,
+                                 keep_alive=OllamaConfig.ollama_keep_alive)
     agent_res = AgentRes.from_llm(llm_res)
     return {"lst_res":[agent_res]}
 
@@ -0,0 +1,270 @@
+"""Deterministic stand-in for an Ollama / OpenAI-compatible LLM server
+
+Serves /v1/chat/completions (what CrewAI uses for ollama/ models) and Ollama's
+native /api/chat, both with and without streaming, plus /api/generate without
+a prompt (model preloading). Replies follow the agents'
+prompts closely enough to drive the real pipeline: the planner gets a routing
+decision (a JSON plan for the combined plan-and-answer prompt), tool-using
+agents get one search call before answering (one call per search tool at once
+for the parallel LangGraph prompt), and every other prompt gets a
+"Final Answer" of answer_tokens words. Each reply waits latency_ms, then
+streams its tokens at tokens_per_sec.
+
+Run standalone with: python -m benchmarks.fake_llm_server --port 11500
+"""
+import argparse
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+GREETING = re.compile(r"^\s*(hi|hello|hey|thanks|thank you|good (morning|evening))\b", re.I)
+QUERY_IN_PROMPT = re.compile(r'Query: "(.*?)"', re.S)
+TOOL_NAME_IN_PROMPT = re.compile(r"Tool Name: (.+)")
+GRAPH_TOOL_IN_PROMPT = re.compile(r"^\s*\d+\. `(\w+)`:", re.M)
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+class FakeLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 200,
+                 tokens_per_sec: float = 50, answer_tokens: int = 60):
+        self.latency = latency_ms / 1000
+        self.tokens_per_sec = tokens_per_sec
+        self.answer_tokens = answer_tokens
+        self._lock = threading.Lock()
+        self.reset()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.loads = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "loads": self.loads, "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": self.completion_tokens}
+
+    def _record(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def reply(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Content and optional tool call answering a conversation"""
+        prompt = "\n".join(message_text(m) for m in messages)
+        match = QUERY_IN_PROMPT.search(prompt)
+        query = match.group(1) if match else message_text(messages[-1]).strip().split("\n")[0][:200]
+
+        if '"action": "research"' in prompt:
+            # Combined plan-and-answer prompt
+            if GREETING.match(query):
+                return json.dumps({"action": "answer", "answer": "Hello! How can I help you today?"}), None
+            return json.dumps({"action": "research", "queries": [query, f"{query} overview"]}), None
+
+        if "SIMPLE_RESPONSE" in prompt and "INTERNET_SEARCH" in prompt:
+            decision = "SIMPLE_RESPONSE" if GREETING.match(query) else "INTERNET_SEARCH"
+            return f"Thought: I know how to route this.\nFinal Answer: {decision}", None
+
+        words = " ".join(f"fact{i % 17}" for i in range(self.answer_tokens))
+        if '"name":"<tool_name>"' in prompt:
+            # LangGraph agents: JSON tool calls, answering once earlier calls are replayed in the context
+            if any(m.get("role") == "assistant" and '"name"' in message_text(m) for m in messages):
+                return json.dumps({"name": "final_answer", "parameters": {"text": f"Here is what I found. {words}."}}), None
+            graph_tools = [name for name in GRAPH_TOOL_IN_PROMPT.findall(prompt) if name != "final_answer"]
+            calls = [{"name": name, "parameters": {"query": query}} for name in graph_tools]
+            if '"tool_calls"' in prompt:
+                return json.dumps({"tool_calls": calls}), None
+            return json.dumps(calls[0]), None
+
+        searched = any(m.get("role") == "tool" for m in messages) or "Observation:" in prompt
+        if tools and not searched:
+            name = tools[0].get("function", {}).get("name", "search")
+            return "", {"id": f"call_{uuid.uuid4().hex[:8]}", "type": "function",
+                        "function": {"name": name, "arguments": json.dumps({"query": query})}}
+        if not searched and "Action Input:" in prompt and (tool := TOOL_NAME_IN_PROMPT.search(prompt)):
+            return (f"Thought: I should search for this.\nAction: {tool.group(1).strip()}\n"
+                    f"Action Input: {json.dumps({'query': query})}"), None
+
+        return f"Thought: I now know the final answer.\nFinal Answer: Here is what I found. {words}.", None
+
+    def _pace(self, text: str) -> List[str]:
+        """Wait out the first-token latency and split a reply into chunks of about 4 words"""
+        time.sleep(self.latency)
+        words = re.findall(r"\S+\s*", text) or [text]
+        return ["".join(words[i:i + 4]) for i in range(0, len(words), 4)]
+
+    def _delay(self, chunk: str):
+        if self.tokens_per_sec > 0:
+            time.sleep(estimate_tokens(chunk) / self.tokens_per_sec)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, payload: Any, status: int = 200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _start_stream(self, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._json({"models": [{"name": "fake:latest", "model": "fake:latest"}]})
+                elif self.path == "/v1/models":
+                    self._json({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+                elif self.path == "/stats":
+                    self._json(server.stats())
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/v1/chat/completions":
+                    self._openai_chat(request)
+                elif self.path == "/api/chat":
+                    self._ollama_chat(request)
+                elif self.path == "/api/generate" and not request.get("prompt"):
+                    # Loads the model without generating
+                    with server._lock:
+                        server.loads += 1
+                    self._json({"model": request.get("model", "fake"), "response": "", "done": True,
+                                "done_reason": "load"})
+                elif self.path == "/reset":
+                    server.reset()
+                    self._json({"ok": True})
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def _openai_chat(self, request: Dict[str, Any]):
+                messages = request.get("messages", [])
+                content, tool_call = server.reply(messages, request.get("tools"))
+                prompt_tokens = sum(estimate_tokens(message_text(m)) for m in messages)
+                completion_tokens = estimate_tokens(content or json.dumps(tool_call))
+                server._record(prompt_tokens, completion_tokens)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()),
+                        "model": request.get("model", "fake")}
+                finish_reason = "tool_calls" if tool_call else "stop"
+
+                if not request.get("stream"):
+                    chunks = server._pace(content or " ")
+                    for chunk in chunks:
+                        server._delay(chunk)
+                    message = {"role": "assistant", "content": content or None}
+                    if tool_call:
+                        message["tool_calls"] = [tool_call]
+                    self._json({**base, "object": "chat.completion", "usage": usage,
+                                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}]})
+                    return
+
+                self._start_stream("text/event-stream")
+                def event(delta: Dict[str, Any], finish: Optional[str] = None, **extra):
+                    payload = {**base, "object": "chat.completion.chunk",
+                               "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+                    self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+                event({"role": "assistant", "content": ""})
+                if tool_call:
+                    time.sleep(server.latency)
+                    event({"tool_calls": [{"index": 0, **tool_call}]})
+                else:
+                    for chunk in server._pace(content):
+                        server._delay(chunk)
+                        event({"content": chunk})
+                event({}, finish_reason, usage=usage)
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _ollama_chat(self, request: Dict[str, Any]):
+                messages = request.get("messages", [])
+                content, tool_call = server.reply(messages, request.get("tools"))
+                prompt_tokens = sum(estimate_tokens(message_text(m)) for m in messages)
+                completion_tokens = estimate_tokens(content or json.dumps(tool_call))
+                server._record(prompt_tokens, completion_tokens)
+                message = {"role": "assistant", "content": content}
+                if tool_call:
+                    message["tool_calls"] = [{"function": {"name": tool_call["function"]["name"],
+                                                           "arguments": json.loads(tool_call["function"]["arguments"])}}]
+                final = {"model": request.get("model", "fake"), "done": True, "done_reason": "stop",
+                         "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens}
+
+                # Ollama streams unless told otherwise
+                if request.get("stream", True) is False:
+                    for chunk in server._pace(content or " "):
+                        server._delay(chunk)
+                    self._json({**final, "message": message})
+                    return
+
+                self._start_stream("application/x-ndjson")
+                for chunk in server._pace(content or " "):
+                    server._delay(chunk)
+                    self._write_chunk((json.dumps({"model": final["model"], "done": False,
+                                                   "message": {"role": "assistant", "content": chunk}}) + "\n").encode())
+                self._write_chunk((json.dumps({**final, "message": {**message, "content": ""}}) + "\n").encode())
+                self._write_chunk(b"")
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=200, help="Delay before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="Generation speed; 0 for instant")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="Length of final answers in words")
+    args = parser.parse_args()
+    server = FakeLLMServer(args.host, args.port, args.latency_ms, args.tokens_per_sec, args.answer_tokens)
+    print(f"Fake LLM server listening on {server.url}")
+    server.httpd.serve_forever()
+
+if __name__ == "__main__":
+    main()
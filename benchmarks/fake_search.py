@@ -0,0 +1,84 @@
+"""Search tools answering from a canned corpus, for offline benchmarks"""
+import re
+import time
+from typing import Dict, List
+
+from crewai.tools import BaseTool
+from pydantic import Field
+
+CORPUS: Dict[str, List[str]] = {
+    "python": [
+        "Python is a high-level, general-purpose programming language created by Guido van Rossum and first released in 1991.",
+        "Python's design philosophy emphasizes code readability with the use of significant indentation.",
+        "The Python Package Index hosts hundreds of thousands of third-party packages."
+    ],
+    "langgraph": [
+        "LangGraph is a library for building stateful, multi-actor applications with LLMs as graphs of nodes and edges.",
+        "LangGraph supports cycles, which lets agents loop between reasoning and tool use until a condition is met."
+    ],
+    "crewai": [
+        "CrewAI is a framework for orchestrating role-playing autonomous AI agents that work together as a crew.",
+        "In CrewAI, tasks are assigned to agents and a crew runs them sequentially or hierarchically."
+    ],
+    "transformer": [
+        "The transformer architecture was introduced in the 2017 paper Attention Is All You Need.",
+        "Transformers rely on self-attention instead of recurrence to model relationships between tokens."
+    ],
+    "everest": [
+        "Mount Everest is Earth's highest mountain above sea level, at 8,849 metres.",
+        "Everest lies in the Mahalangur Himal sub-range of the Himalayas on the China-Nepal border."
+    ],
+    "photosynthesis": [
+        "Photosynthesis converts light energy into chemical energy stored in glucose.",
+        "In plants, photosynthesis takes place mainly in the chloroplasts of leaf cells."
+    ],
+    "vector database": [
+        "A vector database stores embeddings and retrieves the nearest neighbours of a query vector.",
+        "Approximate nearest neighbour indexes such as HNSW and IVF trade a little recall for much faster search."
+    ]
+}
+
+QUERIES: List[str] = [
+    "What is Python and who created it?",
+    "How does LangGraph model agent workflows?",
+    "What is CrewAI used for?",
+    "Explain the transformer architecture",
+    "How tall is Mount Everest?",
+    "How does photosynthesis work?",
+    "What is a vector database?",
+    "Hello there!",
+    "Compare CrewAI and LangGraph for building agents",
+    "Which paper introduced transformers?"
+]
+
+def words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+def lookup(query: str, corpus: Dict[str, List[str]] = CORPUS, top_k: int = 3) -> str:
+    """The corpus passages sharing the most words with the query"""
+    query_words = words(query)
+    passages = [p for topic, texts in corpus.items() for p in texts]
+    ranked = sorted(passages, key=lambda p: -len(query_words & words(p)))
+    hits = [p for p in ranked[:top_k] if query_words & words(p)]
+    return "\n\n".join(hits) or "No good search result found"
+
+class FakeSearchTool(BaseTool):
+    name: str = "Fake Search"
+    description: str = "Search a fixed corpus. Use this for general queries."
+    latency_ms: float = 100
+    corpus: Dict[str, List[str]] = Field(default_factory=lambda: CORPUS)
+    calls: int = 0
+
+    def _run(self, query: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        return lookup(query, self.corpus)
+
+def get_fake_search_tools(latency_ms: float = 100) -> List[FakeSearchTool]:
+    """Stand-ins for the DuckDuckGo and Wikipedia tools"""
+    return [
+        FakeSearchTool(name="DuckDuckGo Search", latency_ms=latency_ms,
+                       description="Search the internet using DuckDuckGo. Use this for general queries and finding current information."),
+        FakeSearchTool(name="Wikipedia Research", latency_ms=latency_ms,
+                       description="Search Wikipedia for factual information and detailed explanations.")
+    ]
@@ -0,0 +1,64 @@
+"""Import-time report of the app's entry points
+
+Imports each module in a fresh interpreter with -X importtime and reports
+the total time and the slowest top-level packages it pulled in.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time src.agents.crew_workflow --top 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+# What the Streamlit app and the HTTP service import at startup, and what the first query adds
+ENTRY_MODULES = ["src.agents.engine", "src.utils.ui_helper", "src.serving.server", "src.agents.crew_workflow"]
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Rows of -X importtime output as {"module", "depth", "self_us", "cumulative_us"}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.lstrip()
+        rows.append({"module": module, "depth": (len(name) - len(module) - 1) // 2,
+                     "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return rows
+
+def import_report(module: str, top: int = 10) -> Dict[str, Any]:
+    """Import time of a module in a fresh interpreter, broken down by top-level package"""
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, env=env)
+    rows = parse_importtime(completed.stderr)
+    packages: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        packages[row["module"].split(".")[0]] += row["self_us"]
+    return {
+        "module": module,
+        "ok": completed.returncode == 0,
+        "total_ms": sum(row["self_us"] for row in rows) / 1000,
+        "modules": len(rows),
+        "packages": [{"package": name, "ms": us / 1000}
+                     for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]]
+    }
+
+def print_import_report(reports: List[Dict[str, Any]]):
+    for report in reports:
+        status = "" if report["ok"] else "  (import failed)"
+        print(f"{report['module']}: {report['total_ms']:.0f} ms, {report['modules']} modules{status}")
+        for package in report["packages"]:
+            print(f"    {package['ms']:>8.1f} ms  {package['package']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the import time of the app's entry points")
+    parser.add_argument("modules", nargs="*", default=ENTRY_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level packages to list per module")
+    args = parser.parse_args()
+    print_import_report([import_report(module, args.top) for module in args.modules])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""Offline latency and throughput benchmark for the agent pipeline
+
+Runs the real workflow against the fake LLM server and canned search tools at
+several concurrency levels and reports latency percentiles, throughput, and
+LLM calls and prompt tokens per query. Every level starts with empty caches,
+knowledge store and router log, so levels are comparable (--keep-caches
+measures warm runs instead).
+
+    python -m benchmarks.run_benchmark --concurrency 1,4,8 --queries 20
+    python -m benchmarks.run_benchmark --target graph --json results.json
+    python -m benchmarks.run_benchmark --target graph-serial
+    python -m benchmarks.run_benchmark --speculative-search
+    python -m benchmarks.run_benchmark --import-report
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.cache_config import CacheConfig
+from src.config.llm_config import LLMConfig
+from src.config.memory_config import MemoryConfig
+from src.config.research_config import ResearchConfig
+from src.config.router_config import RouterConfig
+from src.agents.agent_pool import AgentPool
+from src.agents.answer_cache import SemanticAnswerCache
+from src.agents.crew_agents import CrewAgentFactory
+from src.agents.crew_workflow import CrewWorkflow
+from src.agents.engine import QueryEngine
+from src.agents.speculative_search import get_speculation_stats
+from src.llm.response_cache import LLMResponseCache
+from src.memory.knowledge_store import KnowledgeStore
+from src.tools.search_cache import get_search_cache
+from .fake_llm_server import FakeLLMServer
+from .fake_search import QUERIES, get_fake_search_tools
+from .import_time import ENTRY_MODULES, import_report, print_import_report
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile (p in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def crew_target(tools: List, stream: bool, concurrency: int) -> Callable[[str, Dict[str, Any]], Any]:
+    """Answer queries with CrewWorkflow through the query engine, using the fake search tools"""
+    class BenchmarkAgentPool(AgentPool):
+        ROLES = {**AgentPool.ROLES, "researcher": lambda: CrewAgentFactory.create_research_agent(tools=tools)}
+
+    pool = BenchmarkAgentPool()
+    engine = QueryEngine(max_workers=concurrency,
+                         workflow_factory=lambda on_event: CrewWorkflow(on_event=on_event, agent_pool=pool))
+
+    async def run(query: str, config: Dict[str, Any]):
+        if stream:
+            return "".join([chunk async for chunk in engine.stream(query, config=config)])
+        return (await engine.answer(query, config=config)).answer
+    return run
+
+def graph_target(tools: List, stream: bool, concurrency: int,
+                 parallel: Optional[bool] = None) -> Callable[[str, Dict[str, Any]], Any]:
+    """Answer queries with the LangGraph AgentWorkflow, using the fake search tools"""
+    from src.agents.workflow import AgentWorkflow
+
+    async def run(query: str, config: Dict[str, Any]):
+        def invoke():
+            with LLMConfig.use_settings(config):
+                graph = AgentWorkflow(tools=tools).create_graph(parallel=parallel)
+                return graph.invoke({"user_q": query, "chat_history": [], "lst_res": [], "output": {}})
+        return await asyncio.to_thread(invoke)
+    return run
+
+def reset_shared_stores():
+    """Empty the process-wide caches and stores, so every level starts from the same cold state
+
+    Each level reruns the same queries; without this, later levels would be
+    answered from what earlier ones cached, learned or researched.
+    """
+    for store in (get_search_cache(), LLMResponseCache.shared(), SemanticAnswerCache.shared(), KnowledgeStore.shared()):
+        if store is not None:
+            store.clear()
+    if os.path.exists(RouterConfig.router_log_path):
+        os.remove(RouterConfig.router_log_path)
+
+TARGETS = {"crew": crew_target, "graph": graph_target,
+           "graph-serial": functools.partial(graph_target, parallel=False)}
+
+async def run_level(run: Callable, queries: List[str], concurrency: int, config: Dict[str, Any],
+                    server: FakeLLMServer, tools: List, keep_caches: bool = False) -> Dict[str, Any]:
+    if not keep_caches:
+        reset_shared_stores()
+    server.reset()
+    for tool in tools:
+        tool.calls = 0
+    speculation = get_speculation_stats()
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one(query: str):
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await run(query, config)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(q) for q in queries])
+    wall = time.perf_counter() - started
+    llm = server.stats()
+    speculation = {key: get_speculation_stats()[key] - speculation[key] for key in ("used", "wasted")}
+    count = len(queries)
+    return {
+        "concurrency": concurrency,
+        "queries": count,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "llm_calls_per_query": llm["calls"] / count,
+        "prompt_tokens_per_query": llm["prompt_tokens"] / count,
+        "completion_tokens_per_query": llm["completion_tokens"] / count,
+        "search_calls_per_query": sum(tool.calls for tool in tools) / count,
+        "speculation_used": speculation["used"],
+        "speculation_wasted": speculation["wasted"]
+    }
+
+def print_report(results: List[Dict[str, Any]]):
+    header = f"{'conc':>4} {'ok':>4} {'err':>4} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'q/s':>6} {'llm/q':>6} {'prompt tok/q':>12} {'search/q':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['concurrency']:>4} {r['queries'] - r['errors']:>4} {r['errors']:>4} {r['p50']:>7.2f} {r['p95']:>7.2f} "
+              f"{r['p99']:>7.2f} {r['throughput']:>6.2f} {r['llm_calls_per_query']:>6.1f} "
+              f"{r['prompt_tokens_per_query']:>12.0f} {r['search_calls_per_query']:>8.1f}")
+        if r["speculation_used"] or r["speculation_wasted"]:
+            print(f"     speculative searches: {r['speculation_used']} used, {r['speculation_wasted']} wasted")
+        if r["first_error"]:
+            print(f"     first error: {r['first_error'][:200]}")
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    server = FakeLLMServer(latency_ms=args.llm_latency_ms, tokens_per_sec=args.tokens_per_sec,
+                           answer_tokens=args.answer_tokens).start()
+    config = {"LLM_PROVIDER": "ollama", "LLM_MODEL": "fake", "OLLAMA_BASE_URL": server.url,
+              "STREAM_RESPONSES": "true" if args.stream else "false"}
+    tools = get_fake_search_tools(args.search_latency_ms)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+    results = []
+    try:
+        for concurrency in levels:
+            run = TARGETS[args.target](tools, args.stream, concurrency)
+            # Warm-up builds agents and clients so levels compare steady-state latency; caches and
+            # stores are emptied again before the measured run (unless --keep-caches)
+            await run_level(run, queries[:args.warmup], concurrency, config, server, tools, args.keep_caches)
+            results.append(await run_level(run, queries, concurrency, config, server, tools, args.keep_caches))
+    finally:
+        server.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline against a fake LLM and fake search")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="crew")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated concurrency levels")
+    parser.add_argument("--queries", type=int, default=10, help="Queries per concurrency level")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured queries run before each level")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="Fake LLM time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="Fake LLM generation speed; 0 for instant")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="Length of fake final answers in words")
+    parser.add_argument("--search-latency-ms", type=float, default=100, help="Fake search tool latency")
+    parser.add_argument("--stream", action="store_true", help="Stream answers as the Streamlit app does")
+    parser.add_argument("--plan-and-answer", action="store_true", help="Plan with one combined planner call (PLAN_AND_ANSWER)")
+    parser.add_argument("--speculative-search", action="store_true",
+                        help="Search while the planner decides (SPECULATIVE_SEARCH)")
+    parser.add_argument("--keep-caches", action="store_true",
+                        help="Keep search, LLM, answer and knowledge caches across levels instead of starting each cold")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the agents' own output")
+    parser.add_argument("--import-report", action="store_true",
+                        help="Also report the cold import time of the app's entry points (-X importtime)")
+    args = parser.parse_args()
+
+    # Keep the benchmark from reading or extending the real router log, caches and knowledge store
+    workdir = tempfile.mkdtemp(prefix="agi-bench-")
+    RouterConfig.router_log_path = os.path.join(workdir, "router_decisions.jsonl")
+    CacheConfig.search_cache_path = os.path.join(workdir, "search_cache.db")
+    CacheConfig.llm_cache_path = os.path.join(workdir, "llm_cache.db")
+    MemoryConfig.knowledge_store_path = ""
+    RouterConfig.plan_and_answer = RouterConfig.plan_and_answer or args.plan_and_answer
+    ResearchConfig.speculative_search = ResearchConfig.speculative_search or args.speculative_search
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with output:
+            results = asyncio.run(main_async(args))
+    except ImportError as e:
+        sys.exit(f"The {args.target} target cannot be loaded: {e}")
+
+    print(f"target={args.target} queries={args.queries} llm_latency={args.llm_latency_ms:g}ms "
+          f"tokens/s={args.tokens_per_sec:g} search_latency={args.search_latency_ms:g}ms stream={args.stream} "
+          f"plan_and_answer={RouterConfig.plan_and_answer} speculative_search={ResearchConfig.speculative_search}")
+    print_report(results)
+    imports = None
+    if args.import_report:
+        imports = [import_report(module, top=5) for module in ENTRY_MODULES]
+        print("\nImport time (fresh interpreter):")
+        print_import_report(imports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results, "imports": imports}, f, indent=2)
+    if any(r["errors"] == r["queries"] for r in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,17 @@
-from .models import AgentRes, State
-from .crew_workflow import CrewWorkflow
+import importlib
 
-__all__ = ['AgentRes', 'State', 'CrewWorkflow']
\ No newline at end of file
+from .models import AgentRes, QueryPlan, State, ParallelState
+from .events import WorkflowEvent
+from .engine import EngineAnswer, QueryEngine
+
+# Modules that import CrewAI load on first access, so importing the package stays cheap
+_LAZY = {'CrewWorkflow': '.crew_workflow'}
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['AgentRes', 'QueryPlan', 'State', 'ParallelState', 'WorkflowEvent', 'CrewWorkflow', 'EngineAnswer', 'QueryEngine']
\ No newline at end of file
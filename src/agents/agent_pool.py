@@ -0,0 +1,71 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from crewai import Agent
+from src.llm.crew_llm import create_llm, llm_config_key, register_invalidation_listener
+from .crew_agents import CrewAgentFactory
+
+class AgentPool:
+    """Pool of pre-built CrewAI agents keyed by role and LLM configuration
+
+    Agents keep per-execution state (executor, tool results), so each one is
+    checked out by a single query at a time and returned to the pool afterwards.
+    """
+
+    ROLES = {
+        "planner": CrewAgentFactory.create_planner_agent,
+        "researcher": CrewAgentFactory.create_research_agent,
+        "synthesizer": CrewAgentFactory.create_synthesizer_agent,
+        # Each streaming synthesizer owns its LLM so its chunks can be told apart from other queries
+        "streaming_synthesizer": lambda: CrewAgentFactory.create_synthesizer_agent(llm=create_llm(stream=True))
+    }
+
+    _shared: Optional["AgentPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_idle_per_key: int = 4):
+        self.max_idle_per_key = max_idle_per_key
+        self._idle: Dict[Tuple, List[Agent]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._generation = 0
+        register_invalidation_listener(self.clear)
+
+    @classmethod
+    def shared(cls) -> "AgentPool":
+        """Get the process-wide agent pool"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @contextmanager
+    def acquire(self, role: str):
+        """Check out an agent for the given role, building one if none is idle"""
+        if role not in self.ROLES:
+            raise ValueError(f"Unknown agent role: {role} # Options: {', '.join(self.ROLES)}")
+
+        key = (role, llm_config_key())
+        with self._lock:
+            generation = self._generation
+            idle = self._idle[key]
+            agent = idle.pop() if idle else None
+        if agent is None:
+            agent = self.ROLES[role]()
+
+        try:
+            yield agent
+        finally:
+            with self._lock:
+                # Agents built before an invalidation are dropped instead of returned
+                if generation == self._generation and len(self._idle[key]) < self.max_idle_per_key:
+                    self._idle[key].append(agent)
+
+    def clear(self):
+        """Drop all idle agents, e.g. after the LLM configuration changes"""
+        with self._lock:
+            self._generation += 1
+            self._idle.clear()
+
+__all__ = ['AgentPool']
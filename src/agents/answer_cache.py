@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+from src.config.cache_config import CacheConfig
+from src.llm.crew_llm import llm_config_key, register_invalidation_listener
+from src.memory.embedding_service import EmbeddingService
+from .models import AgentRes
+
+# Follow-up questions like "what about him?" depend on the conversation, not just their wording
+CONTEXT_REFERENCES = re.compile(r"\b(he|she|him|her|his|hers|it|its|they|them|their|this|that|these|those|there|above|previous)\b", re.I)
+
+class CachedAnswer(BaseModel):
+    answer: AgentRes
+    query: str
+    similarity: float
+
+class SemanticAnswerCache:
+    """Final answers of earlier queries, looked up by embedding similarity
+
+    Entries are scoped to the provider and model that produced them, expire after
+    ttl seconds and are evicted least-recently-used beyond max_entries.
+    """
+
+    _shared: Optional["SemanticAnswerCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, embedder=None, threshold: float = 0.92, ttl: int = 3600, max_entries: int = 1000):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # entry id -> (scope, query, vector, answer, created_at)
+        self._entries: "OrderedDict[int, Tuple[Tuple, str, np.ndarray, AgentRes, float]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        register_invalidation_listener(self.clear)
+
+    @classmethod
+    def shared(cls) -> Optional["SemanticAnswerCache"]:
+        """Process-wide answer cache, or None when disabled"""
+        if not CacheConfig.answer_cache_enabled:
+            return None
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    EmbeddingService.shared(),
+                    threshold=CacheConfig.answer_cache_threshold,
+                    ttl=CacheConfig.answer_cache_ttl,
+                    max_entries=CacheConfig.answer_cache_max_entries
+                )
+            return cls._shared
+
+    @staticmethod
+    def scope() -> Tuple:
+        """Provider and model of the current LLM configuration"""
+        return llm_config_key()[:2]
+
+    @staticmethod
+    def is_cacheable(query: str, has_history: bool) -> bool:
+        """Whether a query can be answered without looking at the conversation"""
+        return bool(query.strip()) and not (has_history and CONTEXT_REFERENCES.search(query))
+
+    def get(self, query: str) -> Optional[CachedAnswer]:
+        vector = self.embedder.embed_one(query)
+        scope = self.scope()
+        now = time.time()
+        with self._lock:
+            for entry_id in [i for i, e in self._entries.items() if now - e[4] > self.ttl]:
+                del self._entries[entry_id]
+            candidates = [(i, e) for i, e in self._entries.items() if e[0] == scope]
+            if not candidates:
+                self.misses += 1
+                return None
+            # Vectors are L2-normalized, so dot products are cosine similarities
+            similarities = np.stack([e[2] for _, e in candidates]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            entry_id, (_, cached_query, _, answer, _) = candidates[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return CachedAnswer(answer=answer, query=cached_query, similarity=float(similarities[best]))
+
+    def set(self, query: str, answer: AgentRes):
+        vector = self.embedder.embed_one(query)
+        with self._lock:
+            self._entries[self._next_id] = (self.scope(), query, vector, answer, time.time())
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+__all__ = ['CachedAnswer', 'SemanticAnswerCache']
\ No newline at end of file
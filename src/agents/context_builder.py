@@ -0,0 +1,184 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from src.config.context_config import ContextConfig
+from src.memory.conversation_store import ConversationWindow
+
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) that needs no tokenizer"""
+    return len(text) // 4 + 1
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    max_chars = max(max_tokens, 1) * 4
+    if len(text) <= max_chars:
+        return text
+    return "..." + text[-max_chars:].lstrip() if keep_end else text[:max_chars].rstrip() + "..."
+
+def format_turn(message: Dict[str, str]) -> str:
+    return f"{message['role']}: {message['content']}"
+
+def extractive_summary(previous: str, messages: List[Dict[str, str]]) -> str:
+    """Summarize without an LLM by keeping the start of every message"""
+    lines = [previous] if previous else []
+    lines += [format_turn({"role": m["role"], "content": truncate_to_tokens(m["content"], 50)}) for m in messages]
+    return "\n".join(lines)
+
+def llm_summary(previous: str, messages: List[Dict[str, str]]) -> str:
+    """Fold messages into the running summary with a short LLM call"""
+    from src.llm.crew_llm import get_llm
+
+    transcript = "\n".join(format_turn(m) for m in messages)
+    prompt = f"""Current summary of the conversation:
+{previous or "(empty)"}
+
+New messages:
+{transcript}
+
+Update the summary to include the new messages. Keep names, facts, numbers and open questions.
+Reply with the updated summary only, in at most 150 words."""
+    return str(get_llm().call([{"role": "user", "content": prompt}])).strip()
+
+class ContextBuilder:
+    """Builds a token-bounded context string from the chat history
+
+    Progress and system messages are dropped, the most recent turns are kept
+    verbatim and older turns are folded into a running summary in batches.
+    Summaries are cached by the exact messages they cover, so each batch is
+    summarized once no matter how many times the history is rebuilt. For a
+    ConversationWindow the summary is kept on its store instead, so only the
+    window is ever read.
+    """
+
+    _summaries: "OrderedDict[str, str]" = OrderedDict()
+    _summaries_lock = threading.Lock()
+    _max_cached_summaries = 512
+
+    def __init__(self, token_budget: Optional[int] = None, recent_turns: Optional[int] = None,
+                 summary_batch: Optional[int] = None, summarizer: Optional[Summarizer] = None):
+        self.token_budget = token_budget or ContextConfig.context_token_budget
+        self.recent_turns = recent_turns or ContextConfig.context_recent_turns
+        self.summary_batch = summary_batch or ContextConfig.context_summary_batch
+        if summarizer is None:
+            summarizer = llm_summary if ContextConfig.context_summarize_with_llm else extractive_summary
+        self.summarizer = summarizer
+
+    @staticmethod
+    def turn_indices(messages: List[Dict[str, str]], query: Optional[str] = None) -> List[int]:
+        """Positions of the user/assistant messages, without progress updates or the pending query"""
+        indices = [
+            i for i, m in enumerate(messages)
+            if m.get("role") in ("user", "assistant") and not m.get("progress")
+        ]
+        if query is not None and indices:
+            last = messages[indices[-1]]
+            if last["role"] == "user" and str(last["content"]) == query:
+                indices.pop()
+        return indices
+
+    @classmethod
+    def conversation_turns(cls, messages: List[Dict[str, str]], query: Optional[str] = None) -> List[Dict[str, str]]:
+        """Keep only user/assistant messages, without progress updates or the pending query"""
+        return [{"role": messages[i]["role"], "content": str(messages[i]["content"])}
+                for i in cls.turn_indices(messages, query)]
+
+    def has_history(self, messages: List[Dict[str, str]], query: Optional[str] = None) -> bool:
+        """Whether there are earlier turns besides the pending query"""
+        return bool(getattr(messages, "summary", "")) or bool(self.turn_indices(messages, query))
+
+    def build(self, messages: List[Dict[str, str]], query: Optional[str] = None) -> str:
+        if isinstance(messages, ConversationWindow):
+            return self.build_window(messages, query)
+        turns = self.conversation_turns(messages, query)
+        keep = self.recent_turns * 2
+        older, recent = turns[:-keep] if len(turns) > keep else [], turns[-keep:]
+
+        # Only whole batches are summarized; the remainder stays verbatim until its batch fills up
+        summarized = len(older) - len(older) % self.summary_batch
+        summary = self.summary_for(older, summarized)
+        return self.compose(summary, older[summarized:] + recent)
+
+    def build_window(self, window: ConversationWindow, query: Optional[str] = None) -> str:
+        """Like build, folding whole batches that left the recent turns into the store's summary"""
+        indices = self.turn_indices(window, query)
+        keep = self.recent_turns * 2
+        older = indices[:-keep] if len(indices) > keep else []
+        summarized = len(older) - len(older) % self.summary_batch
+        summary = window.summary
+        if summarized:
+            pending = self.conversation_turns([window[i] for i in older[:summarized]])
+            # Only the end of the summary is ever shown, so the store keeps no more than that
+            summary = truncate_to_tokens(self.summarize(summary, pending), self.token_budget // 3, keep_end=True)
+            window.fold(summary, older[summarized - 1] + 1)
+        return self.compose(summary, self.conversation_turns([window[i] for i in indices[summarized:]]))
+
+    def compose(self, summary: str, verbatim: List[Dict[str, str]]) -> str:
+        """Context string of the summary and the verbatim turns, within the token budget"""
+        summary_budget = self.token_budget // 3
+        summary_text = f"Summary of earlier conversation:\n{truncate_to_tokens(summary, summary_budget, keep_end=True)}" if summary else ""
+        lines = [format_turn(m) for m in verbatim]
+
+        # Drop the oldest verbatim turns until everything fits, always keeping the latest one
+        budget = self.token_budget - (estimate_tokens(summary_text) if summary_text else 0)
+        while len(lines) > 1 and sum(estimate_tokens(line) for line in lines) > budget:
+            lines.pop(0)
+        if lines:
+            lines[-1] = truncate_to_tokens(lines[-1], max(budget, 1))
+
+        return "\n\n".join(part for part in [summary_text, "\n".join(lines)] if part)
+
+    def summary_for(self, older: List[Dict[str, str]], count: int) -> str:
+        """Summary of older[:count], reusing the cached summary of the previous batch"""
+        if count <= 0:
+            return ""
+        key = self._key(older[:count])
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        previous_count = count - self.summary_batch
+        previous = self._get_cached(self._key(older[:previous_count])) if previous_count > 0 else ""
+        if previous is None:
+            # Nothing cached for this conversation yet: summarize everything in one call
+            previous, pending = "", older[:count]
+        else:
+            pending = older[previous_count:count] if previous_count > 0 else older[:count]
+
+        summary = self.summarize(previous, pending)
+        self._set_cached(key, summary)
+        return summary
+
+    def summarize(self, previous: str, pending: List[Dict[str, str]]) -> str:
+        try:
+            return self.summarizer(previous, pending)
+        except Exception:
+            # Summarizing is an optimization; fall back to the extractive form if the LLM fails
+            return extractive_summary(previous, pending)
+
+    @staticmethod
+    def _key(messages: List[Dict[str, str]]) -> str:
+        digest = hashlib.sha1()
+        for m in messages:
+            digest.update(m["role"].encode("utf-8") + b"\0" + m["content"].encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def _get_cached(cls, key: str) -> Optional[str]:
+        with cls._summaries_lock:
+            summary = cls._summaries.get(key)
+            if summary is not None:
+                cls._summaries.move_to_end(key)
+            return summary
+
+    @classmethod
+    def _set_cached(cls, key: str, summary: str):
+        with cls._summaries_lock:
+            cls._summaries[key] = summary
+            cls._summaries.move_to_end(key)
+            while len(cls._summaries) > cls._max_cached_summaries:
+                cls._summaries.popitem(last=False)
+
+__all__ = ['ContextBuilder', 'estimate_tokens', 'extractive_summary', 'llm_summary']
@@ -1,5 +1,5 @@
 from crewai import Agent
-from src.llm.crew_llm import create_llm
+from src.llm.crew_llm import get_llm
 from src.tools.crew_tools import get_search_tools
 
 class CrewAgentFactory:
@@ -14,13 +14,13 @@ class CrewAgentFactory:
                         Can determine if a query is a basic greeting, question, or complex research need.
                         Optimizes the agent workflow to avoid unnecessary tool usage.''',
             allow_delegation=True,
-            llm=create_llm(),
+            llm=get_llm(),
             tools=[],  # Planner doesn't need tools, just decision-making capability
             verbose=True
         )
         
     @staticmethod
-    def create_research_agent():
+    def create_research_agent(tools=None):
         return Agent(
             role='Research Agent',
             goal='Find accurate and up-to-date information from multiple sources',
@@ -28,13 +28,13 @@ class CrewAgentFactory:
                         Skilled at formulating effective search queries and extracting key information.
                         Always verifies information from multiple sources when possible.''',
             allow_delegation=False,
-            llm=create_llm(),
-            tools=get_search_tools(),  # Use our Langchain-based search tools
+            llm=get_llm(),
+            tools=tools if tools is not None else get_search_tools(),  # Use our Langchain-based search tools
             verbose=True
         )
 
     @staticmethod
-    def create_synthesizer_agent():
+    def create_synthesizer_agent(llm=None):
         return Agent(
             role='Information Synthesizer',
             goal='Combine and present information in a clear, comprehensive, and well-structured way',
@@ -43,7 +43,7 @@ class CrewAgentFactory:
                         Ensures all information is properly attributed and organized.
                         Highlights any contradictions or uncertainties in the information.''',
             allow_delegation=False,
-            llm=create_llm(),
+            llm=llm or get_llm(),
             tools=[],  # Synthesizer doesn't need tools, just synthesis capability
             verbose=True
         )
\ No newline at end of file
@@ -1,26 +1,56 @@
-from typing import List, Dict
+import contextvars
+import logging
+import queue
+import threading
+from contextlib import ExitStack
+from typing import Any, Dict, Iterator, List, Optional
 from crewai import Task, Crew
-from src.utils.ui_helper import StreamlitUI
-from .crew_agents import CrewAgentFactory
-from .models import AgentRes
+from src.config.router_config import RouterConfig
+from src.config.research_config import ResearchConfig
+from src.config.memory_config import MemoryConfig
+from src.memory import KnowledgeHit, KnowledgeStore, SimpleMemory
+from src.tools.parallel_search import parallel_search, search_sources
+from src.tools.passage_ranker import rank_passages
+from src.llm.response_cache import cache_responses
+from src.llm.streaming import subscribe_stream_chunks
+from src.telemetry import span, set_attribute
+from .agent_pool import AgentPool
+from .answer_cache import SemanticAnswerCache
+from .models import AgentRes, QueryPlan
+from .query_router import QueryRouter
+from .query_planner import QueryPlanner
+from .speculative_search import SpeculativeSearch
+from .context_builder import ContextBuilder
+from .tool_usage import TaskToolUsage
+from .events import EventCallback, emit_event
+
+logger = logging.getLogger(__name__)
 
 class CrewWorkflow:
-    def __init__(self, memory=None):
-        self.ui = StreamlitUI()
-        self.agent_factory = CrewAgentFactory()
+    def __init__(self, memory=None, on_event: Optional[EventCallback] = None, agent_pool: Optional[AgentPool] = None):
+        # Progress is reported through on_event, so the workflow runs with or without a UI
+        self.on_event = on_event
+        # Vector memory of past answers, only when a vector store is configured
+        self.memory = memory if memory is not None else (SimpleMemory() if MemoryConfig.vector_store else None)
+        self.agent_pool = agent_pool or AgentPool.shared()
+        self.router = QueryRouter() if RouterConfig.router_enabled else None
+        self.planner = QueryPlanner() if RouterConfig.plan_and_answer else None
+        self.context_builder = ContextBuilder()
+        self.answer_cache = SemanticAnswerCache.shared()
+        # Research findings shared with every other session
+        self.knowledge = KnowledgeStore.shared()
+        self.research_task: Optional[Task] = None
+        # Whether the research task's searches found anything, and its own tool calls
+        self.research_found = False
+        self.research_usage: Optional[TaskToolUsage] = None
+        # Search of the raw query running while the planner decides
+        self.speculation: Optional[SpeculativeSearch] = None
 
-    def process_query(self, query: str, chat_history: List[Dict[str, str]], lst_res: List) -> str:
-        # Initialize all agents
-        planner = self.agent_factory.create_planner_agent()
-        researcher = self.agent_factory.create_research_agent()
-        synthesizer = self.agent_factory.create_synthesizer_agent()
-        
-        # Create context string from chat history
-        context_str = "\n".join([msg["content"] for msg in chat_history])
-        
-        # First, create a planning task to determine how to handle the query
-        planning_task = Task(
-            description=f"""Analyze this user query and determine the best approach:
+    def plan_query(self, query: str, context_str: str) -> str:
+        """Ask the planner agent whether the query needs an internet search"""
+        with self.agent_pool.acquire("planner") as planner:
+            planning_task = Task(
+                description=f"""Analyze this user query and determine the best approach:
 Query: "{query}"
 
 Context from previous interactions:
@@ -34,26 +64,135 @@ Return ONLY ONE of these exact responses:
 - "SIMPLE_RESPONSE" - For greetings and basic conversation
 - "INTERNET_SEARCH" - When we need to search online for information
 """,
-            agent=planner,
-            expected_output="A single decision about how to handle the query"
-        )
-        
-        # Run the planning task independently
-        planning_crew = Crew(
-            agents=[planner],
-            tasks=[planning_task],
-            verbose=True,
-            process="sequential"
-        )
-        
-        planning_result = planning_crew.kickoff()
-        planning_decision = str(planning_result).strip() if hasattr(planning_result, 'raw') else str(planning_result).strip()
+                agent=planner,
+                expected_output="A single decision about how to handle the query"
+            )
         
-        # Log the planning decision
-        self.ui.add_chat_message("system", f"Planning decision: {planning_decision}", is_progress=True)
+            # Run the planning task independently
+            planning_crew = Crew(
+                agents=[planner],
+                tasks=[planning_task],
+                verbose=True,
+                process="sequential"
+            )
         
+            # The planner prompt only depends on the query and context, so repeats are served from cache
+            with span("planner.kickoff"), cache_responses():
+                planning_result = planning_crew.kickoff()
+            planning_decision = str(planning_result).strip() if hasattr(planning_result, 'raw') else str(planning_result).strip()
+        return QueryRouter.normalize_decision(planning_decision)
+
+    def gather_search_results(self, query: str, tools: List, queries: Optional[List[str]] = None) -> str:
+        """Query all search tools at once and format the merged results for the research task
+
+        With queries suggested by the planner, every tool runs each of them instead of the raw query.
+        A speculative search of the raw query started during planning is used when there are none.
+        """
+        if not ResearchConfig.parallel_search_enabled or not tools:
+            return ""
+        if queries:
+            # The planner's queries replace the raw query searched while it was deciding
+            self.discard_speculation("planner_queries")
+        speculation, self.speculation = self.speculation, None
+
+        sources = search_sources(tools)
+        if queries:
+            sources = {f"{name}: {q}": (lambda _, fn=fn, q=q: fn(q)) for q in queries for name, fn in sources.items()}
+        with span("search.parallel", sources=len(sources)) as search_span:
+            results = speculation.take() if speculation is not None else parallel_search(query, sources)
+            results.snippets = rank_passages(query, results.snippets)
+            self.research_found = bool(results.snippets)
+            if search_span is not None:
+                search_span.set_attribute("results", len(results.snippets))
+                search_span.set_attribute("errors", len(results.errors))
+        detail = ", started while planning" if speculation is not None else ""
+        emit_event(
+            self.on_event,
+            f"Searched {len(sources)} sources in parallel in {results.elapsed:.1f}s ({len(results.snippets)} unique results{detail})"
+        )
+        for source, error in results.errors.items():
+            emit_event(self.on_event, f"{source}: {error}")
+        if not results.snippets:
+            return ""
+
+        return f"""
+Search results already gathered from all sources:
+{results.to_prompt()}
+
+Base your analysis on these results and only use your tools if they are insufficient.
+"""
+
+    def start_speculative_search(self, query: str):
+        """Start searching for the raw query before the planner has decided that research is needed"""
+        if not ResearchConfig.speculative_search or not ResearchConfig.parallel_search_enabled:
+            return
+        # The researcher's tools are only borrowed; search tools keep no per-query state
+        with self.agent_pool.acquire("researcher") as researcher:
+            tools = list(researcher.tools)
+        if tools:
+            self.speculation = SpeculativeSearch(query, search_sources(tools))
+
+    def discard_speculation(self, reason: str):
+        """Cancel the speculative search, if any, recording why it was not needed"""
+        speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            speculation.cancel(reason)
+            emit_event(self.on_event, f"Discarded the search started while planning ({reason.replace('_', ' ')})")
+
+    def recall_findings(self, query: str) -> str:
+        """Format relevant findings from earlier queries for the research task"""
+        if self.memory is None:
+            return ""
+        with span("memory.recall"):
+            hits = self.memory.get_past_findings(query)
+            set_attribute("hits", len(hits))
+        if not hits:
+            return ""
+        return f"""
+Relevant findings from earlier research:
+{SimpleMemory.format_findings(hits)}
+"""
+
+    def consult_knowledge(self, query: str) -> List[KnowledgeHit]:
+        """Findings of earlier research, in any session, that cover the query"""
+        if self.knowledge is None:
+            return []
+        with span("knowledge.lookup"):
+            hits = self.knowledge.lookup(query)
+            set_attribute("hits", len(hits))
+            set_attribute("fresh", any(hit.fresh for hit in hits))
+        return hits
+
+    def record_findings(self, query: str):
+        """Share the output of this query's research task with later queries, if its searches found anything"""
+        task, self.research_task = self.research_task, None
+        usage, self.research_usage = self.research_usage, None
+        if usage is not None:
+            usage.stop()
+        if self.knowledge is None or task is None or task.output is None:
+            return
+        if not self.research_found and (usage is None or not usage.succeeded):
+            # An answer written around failed searches would be served to every session as fresh research
+            logger.info("Not recording research findings: no search returned results")
+            return
+        try:
+            self.knowledge.add(query, str(task.output.raw))
+        except Exception as e:
+            logger.warning("Error recording research findings: %s", e)
+
+    def build_crew(self, query: str, context_str: str, plan: QueryPlan, agents: ExitStack,
+                   stream: bool = False) -> Crew:
+        """Build the crew for a query plan, checking its agents out of the pool"""
+        self.research_task, self.research_found, self.research_usage = None, False, None
+        # A speculative search nothing claimed is cancelled once the query is done
+        agents.callback(self.discard_speculation, "unused")
+        known = self.consult_knowledge(query) if plan.decision != "SIMPLE_RESPONSE" else []
+        fresh = [hit for hit in known if hit.fresh]
         # Different workflows based on the planning decision
-        if planning_decision == "SIMPLE_RESPONSE":
+        synthesizer = agents.enter_context(
+            self.agent_pool.acquire("streaming_synthesizer" if stream else "synthesizer")
+        )
+        if plan.decision == "SIMPLE_RESPONSE":
             # For basic conversations, use only the synthesizer
             simple_task = Task(
                 description=f"""Respond to this simple greeting or conversation:
@@ -68,6 +207,7 @@ Provide a friendly, conversational response without using any search tools.
                 expected_output="A friendly conversational response"
             )
             
+            self.discard_speculation("simple_response")
             crew = Crew(
                 agents=[synthesizer],
                 tasks=[simple_task],
@@ -75,20 +215,58 @@ Provide a friendly, conversational response without using any search tools.
                 process="sequential"
             )
             
+        elif fresh:
+            # Earlier research already covers the query: answer from it without searching again
+            emit_event(self.on_event, f"Answering from {len(fresh)} recent research finding(s) of earlier queries")
+            self.discard_speculation("knowledge")
+            knowledge_task = Task(
+                description=f"""Answer the following query using findings from recent research:
+Query: "{query}"
+
+Context from previous interactions:
+{context_str}
+
+Findings:
+{KnowledgeStore.format_hits(fresh)}
+""",
+                agent=synthesizer,
+                expected_output="A clear, well-structured response"
+            )
+
+            crew = Crew(
+                agents=[synthesizer],
+                tasks=[knowledge_task],
+                verbose=True,
+                process="sequential"
+            )
+
         else:  # "INTERNET_SEARCH" or any other response
             # For internet searches
+            researcher = agents.enter_context(self.agent_pool.acquire("researcher"))
+            suggested = "".join(f"\n- {q}" for q in plan.queries)
+            if suggested:
+                suggested = f"\nSearch queries suggested by the planner:{suggested}\n"
+            if known:
+                suggested += f"\nFindings from earlier research (may be outdated):\n{KnowledgeStore.format_hits(known)}\n"
+            # Searching blocks and reports progress, so it runs before the task is built
+            search_results = self.gather_search_results(query, researcher.tools, plan.queries)
+            past_findings = self.recall_findings(query)
             research_task = Task(
                 description=f"""Research the following query:
 Query: "{query}"
 
 Context from previous interactions:
 {context_str}
-
+{suggested}{search_results}{past_findings}
 Focus on finding information from online sources.
 """,
                 agent=researcher,
                 expected_output="A detailed analysis with information from online sources"
             )
+            self.research_task = research_task
+            self.research_usage = TaskToolUsage.watch(research_task)
+            # Stop watching even if the crew fails before its findings are recorded
+            agents.callback(self.research_usage.stop)
             
             synthesis_task = Task(
                 description="Synthesize findings into a comprehensive response",
@@ -103,10 +281,73 @@ Focus on finding information from online sources.
                 verbose=True,
                 process="sequential"
             )
-            
-        # Execute the chosen workflow and get result
-        result = crew.kickoff()
-        
+
+        return crew
+
+    def decide(self, query: str, context_str: str) -> QueryPlan:
+        """Decide between SIMPLE_RESPONSE and INTERNET_SEARCH for a query
+
+        In plan-and-answer mode the planner may also answer the query outright or suggest search queries.
+        """
+        # Decide obvious queries locally and only ask the planner agent about the rest
+        with span("plan"):
+            route = self.router.route(query) if self.router else None
+            if route is not None:
+                plan = QueryPlan(decision=route.decision)
+                set_attribute("route", route.source)
+                emit_event(self.on_event, f"Planning decision: {plan.decision} (fast path: {route.source})")
+            else:
+                # Most queries need research, so it can start while the planner decides
+                self.start_speculative_search(query)
+                try:
+                    if self.planner is not None:
+                        plan = self.planner.plan(query, context_str)
+                        set_attribute("route", "plan_and_answer")
+                    else:
+                        plan = QueryPlan(decision=self.plan_query(query, context_str))
+                        set_attribute("route", "planner")
+                except Exception:
+                    self.discard_speculation("error")
+                    raise
+                if self.router:
+                    self.router.record_decision(query, plan.decision)
+                # Log the planning decision
+                detail = " (answered by the planner)" if plan.answer is not None else ""
+                if plan.queries:
+                    detail = f" (queries: {'; '.join(plan.queries)})"
+                emit_event(self.on_event, f"Planning decision: {plan.decision}{detail}")
+            set_attribute("decision", plan.decision)
+        return plan
+
+    def use_answer_cache(self, query: str, chat_history: List[Dict[str, str]]) -> bool:
+        """Whether the query's answer can be looked up in and stored to the answer cache"""
+        if self.answer_cache is None:
+            return False
+        has_history = self.context_builder.has_history(chat_history, query)
+        return SemanticAnswerCache.is_cacheable(query, has_history)
+
+    def cached_answer(self, query: str, lst_res: List) -> Optional[str]:
+        """Final answer of a near-identical earlier query, skipping all agents"""
+        try:
+            with span("answer_cache.lookup"):
+                hit = self.answer_cache.get(query)
+                set_attribute("hit", hit is not None)
+        except Exception as e:
+            # Typically the embedding model is not installed; carry on without the cache
+            emit_event(self.on_event, f"Answer cache disabled: {e}")
+            self.answer_cache = None
+            return None
+        if hit is None:
+            return None
+        emit_event(
+            self.on_event,
+            f"Answered from cache (similar to \"{hit.query}\", similarity {hit.similarity:.2f})"
+        )
+        lst_res.append(hit.answer)
+        return hit.answer.tool_output
+
+    def finish(self, result, lst_res: List, query: str, cache_answer: bool = False) -> str:
+        """Convert the crew output to a string and record it as the final answer"""
         # Convert CrewOutput to string
         if hasattr(result, 'raw'):
             result_str = str(result.raw)
@@ -120,9 +361,116 @@ Focus on finding information from online sources.
             tool_output=result_str
         )
         
-        # Add to list of results
-        if 'lst_res' not in globals():
-            lst_res = []
+        # Add to the caller's list of results
         lst_res.append(final_result)
         
-        return result_str
\ No newline at end of file
+        if self.memory is not None:
+            self.memory.add_memory([final_result], query)
+
+        if cache_answer and self.answer_cache is not None:
+            try:
+                self.answer_cache.set(query, final_result)
+            except Exception:
+                self.answer_cache = None
+        
+        return result_str
+
+    def process_query(self, query: str, chat_history: List[Dict[str, str]], lst_res: List) -> str:
+        cache_answer = self.use_answer_cache(query, chat_history)
+        if cache_answer and (answer := self.cached_answer(query, lst_res)) is not None:
+            return answer
+
+        # Create a token-bounded context string from chat history
+        with span("context.build"):
+            context_str = self.context_builder.build(chat_history, query)
+        plan = self.decide(query, context_str)
+        if plan.answer is not None:
+            self.discard_speculation("answered_by_planner")
+            return self.finish(plan.answer, lst_res, query, cache_answer)
+        
+        # Pooled agents are checked out until the crew has finished
+        with ExitStack() as agents:
+            crew = self.build_crew(query, context_str, plan, agents)
+            # Execute the chosen workflow and get result
+            with span("crew.kickoff", decision=plan.decision):
+                result = crew.kickoff()
+        self.record_findings(query)
+        
+        return self.finish(result, lst_res, query, cache_answer)
+
+    def stream_query(self, query: str, chat_history: List[Dict[str, str]], lst_res: List) -> Iterator[str]:
+        """Process a query and return an iterator over the final answer as it is generated
+
+        Planning and crew setup happen before this returns, so progress messages are
+        rendered outside the streamed answer. The crew then runs in a background thread
+        while the synthesizer's tokens are forwarded to the returned iterator.
+        """
+        cache_answer = self.use_answer_cache(query, chat_history)
+        if cache_answer and (answer := self.cached_answer(query, lst_res)) is not None:
+            return iter([answer])
+
+        with span("context.build"):
+            context_str = self.context_builder.build(chat_history, query)
+        plan = self.decide(query, context_str)
+        if plan.answer is not None:
+            self.discard_speculation("answered_by_planner")
+            return iter([self.finish(plan.answer, lst_res, query, cache_answer)])
+
+        agents = ExitStack()
+        try:
+            crew = self.build_crew(query, context_str, plan, agents, stream=True)
+        except Exception:
+            agents.close()
+            raise
+
+        chunks: "queue.Queue[Optional[str]]" = queue.Queue()
+        outcome: Dict[str, Any] = {}
+        unsubscribe = subscribe_stream_chunks(crew.tasks[-1].agent.llm, chunks.put)
+
+        def run():
+            try:
+                with span("crew.kickoff", decision=plan.decision, stream=True):
+                    result = crew.kickoff()
+                self.record_findings(query)
+                outcome["result"] = self.finish(result, lst_res, query, cache_answer)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                unsubscribe()
+                agents.close()
+                chunks.put(None)
+
+        # Run with a copy of the caller's context so per-query LLM settings still apply
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), name="crew-stream", daemon=True).start()
+        return self.iter_answer(chunks, outcome)
+
+    @staticmethod
+    def iter_answer(chunks: "queue.Queue[Optional[str]]", outcome: Dict[str, Any]) -> Iterator[str]:
+        """Yield the answer part of the synthesizer's streamed output
+
+        Agents reply in the "Thought: ... Final Answer: ..." format, so tokens are
+        held back until the final answer marker has been seen.
+        """
+        marker = "Final Answer:"
+        buffer = ""
+        answering = False
+        streamed = False
+        while (chunk := chunks.get()) is not None:
+            if answering:
+                streamed = True
+                yield chunk
+                continue
+            buffer += chunk
+            if marker in buffer:
+                answering = True
+                answer = buffer.split(marker, 1)[1].lstrip()
+                if answer:
+                    streamed = True
+                    yield answer
+
+        if "error" in outcome:
+            raise outcome["error"]
+        if not streamed:
+            # Nothing recognisable was streamed (e.g. the provider ignored stream=True)
+            yield outcome["result"]
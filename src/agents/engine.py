@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+from src.config.engine_config import EngineConfig
+from src.config.llm_config import LLMConfig
+from src.memory.conversation_store import ConversationStore
+from src.telemetry import span
+from .events import EventCallback, WorkflowEvent, emit_event
+from .models import AgentRes
+
+if TYPE_CHECKING:
+    from .crew_workflow import CrewWorkflow
+
+class EngineAnswer(BaseModel):
+    query: str
+    answer: str
+    results: List[AgentRes] = []
+    events: List[WorkflowEvent] = []
+    elapsed: float
+    trace_id: Optional[str] = None
+
+class QueryEngine:
+    """UI-free, asyncio entry point to the crew workflow
+
+    Each query gets its own CrewWorkflow (agents, LLM clients and caches are
+    shared process-wide underneath) and runs on the engine's worker threads, so
+    many queries can be answered concurrently. Events are delivered to on_event
+    on the calling event loop; the callback may be a plain function or a coroutine
+    function. config holds per-query settings keyed like .env (LLM_PROVIDER,
+    LLM_MODEL, ...); without it settings come from the environment.
+    """
+
+    _shared: Optional["QueryEngine"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 workflow_factory: Optional[Callable[..., "CrewWorkflow"]] = None):
+        self._workflow_factory = workflow_factory
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or EngineConfig.engine_max_workers,
+                                           thread_name_prefix="query-engine")
+
+    @classmethod
+    def shared(cls) -> "QueryEngine":
+        """Get the process-wide query engine"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def workflow_factory(self) -> Callable[..., "CrewWorkflow"]:
+        """CrewWorkflow unless another factory was given; CrewAI is imported on the first query (or by warm_up)"""
+        if self._workflow_factory is None:
+            from .crew_workflow import CrewWorkflow
+            self._workflow_factory = CrewWorkflow
+        return self._workflow_factory
+
+    @staticmethod
+    def _event_sink(loop: asyncio.AbstractEventLoop, events: List[WorkflowEvent],
+                    on_event: Optional[EventCallback]) -> EventCallback:
+        """Collect events from worker threads and hand them to on_event on the event loop"""
+        def dispatch(event: WorkflowEvent):
+            result = on_event(event)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+
+        def sink(event: WorkflowEvent):
+            events.append(event)
+            if on_event is not None:
+                loop.call_soon_threadsafe(dispatch, event)
+        return sink
+
+    async def _run(self, fn: Callable[[], Any], config: Optional[Dict[str, Any]],
+                   on_event: Optional[EventCallback] = None, **attributes) -> Any:
+        def run():
+            # Every stage of the query is recorded under one root span; its trace_id is sent as a "trace" event
+            with LLMConfig.use_settings(config), span("query", **attributes) as root:
+                try:
+                    return fn()
+                finally:
+                    if root is not None:
+                        emit_event(on_event, "Trace recorded", type="trace", trace_id=root.trace_id)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, contextvars.copy_context().run, run)
+
+    @staticmethod
+    def _history_view(history) -> List[Dict[str, str]]:
+        """Snapshot of the history; a ConversationStore only gives its window, never the spilled messages"""
+        if isinstance(history, ConversationStore):
+            return history.window()
+        return list(history or [])
+
+    async def answer(self, query: str, history: Optional[List[Dict[str, str]]] = None,
+                     config: Optional[Dict[str, Any]] = None,
+                     on_event: Optional[EventCallback] = None) -> EngineAnswer:
+        """Answer a query given the chat history so far"""
+        started = time.perf_counter()
+        events: List[WorkflowEvent] = []
+        results: List[AgentRes] = []
+        history = self._history_view(history)
+        sink = self._event_sink(asyncio.get_running_loop(), events, on_event)
+        workflow = self.workflow_factory(on_event=sink)
+        # Events are scheduled on the loop before the result, so on_event has seen them all on return
+        answer = await self._run(lambda: workflow.process_query(query, history, results), config, sink, query=query)
+        trace_id = next((event.data["trace_id"] for event in events if event.type == "trace"), None)
+        return EngineAnswer(query=query, answer=answer, results=results, events=events,
+                            elapsed=time.perf_counter() - started, trace_id=trace_id)
+
+    async def stream(self, query: str, history: Optional[List[Dict[str, str]]] = None,
+                     config: Optional[Dict[str, Any]] = None,
+                     on_event: Optional[EventCallback] = None) -> AsyncIterator[str]:
+        """Answer a query, yielding the final answer in chunks as it is generated
+
+        Progress events are all delivered before the first chunk. When the consumer
+        stops early, the worker is told to stop and awaited, so it never posts to a
+        loop that has since been closed.
+        """
+        loop = asyncio.get_running_loop()
+        history = self._history_view(history)
+        chunks: "asyncio.Queue[Any]" = asyncio.Queue()
+        done = object()
+        sink = self._event_sink(loop, [], on_event)
+        workflow = self.workflow_factory(on_event=sink)
+        stopped = threading.Event()
+
+        def post(item: Any):
+            if not stopped.is_set():
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+
+        def pump():
+            try:
+                for chunk in workflow.stream_query(query, history, []):
+                    if stopped.is_set():
+                        break
+                    post(chunk)
+            except Exception as e:
+                post(e)
+            finally:
+                post(done)
+
+        pumping = asyncio.ensure_future(self._run(pump, config, sink, query=query, stream=True))
+        try:
+            while (item := await chunks.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            await pumping
+
+async def answer(query: str, history: Optional[List[Dict[str, str]]] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 on_event: Optional[EventCallback] = None) -> EngineAnswer:
+    """Answer a query with the shared query engine"""
+    return await QueryEngine.shared().answer(query, history, config, on_event)
+
+__all__ = ['EngineAnswer', 'QueryEngine', 'answer']
@@ -0,0 +1,23 @@
+from typing import Any, Callable, Dict, Optional
+from pydantic import BaseModel
+
+class WorkflowEvent(BaseModel):
+    """Progress reported by a workflow while it processes a query
+
+    type is "progress" for messages worth showing to the user, "step" for
+    updates of the current step indicator and "trace" for the trace_id of the
+    finished query's spans.
+    """
+    type: str = "progress"
+    message: str
+    role: str = "system"
+    data: Dict[str, Any] = {}
+
+EventCallback = Callable[[WorkflowEvent], Any]
+
+def emit_event(on_event: Optional[EventCallback], message: str, type: str = "progress", role: str = "system", **data):
+    """Send an event to the callback, if there is one"""
+    if on_event is not None:
+        on_event(WorkflowEvent(type=type, message=message, role=role, data=data))
+
+__all__ = ['WorkflowEvent', 'EventCallback', 'emit_event']
@@ -1,7 +1,8 @@
 import json
+import operator
 from pydantic import BaseModel
 import typing
-from typing import List, Dict, Optional
+from typing import Annotated, List, Dict, Optional
 
 class AgentRes(BaseModel):
     tool_name: str
@@ -35,8 +36,22 @@ class AgentRes(BaseModel):
         except Exception as e:
             raise ValueError(f"Error processing LLM response: {str(e)}") from e
 
+class QueryPlan(BaseModel):
+    decision: str  # SIMPLE_RESPONSE or INTERNET_SEARCH
+    answer: Optional[str] = None  # Set when the planner already answered the query
+    queries: List[str] = []  # Search queries suggested by the planner
+
 class State(typing.TypedDict):
     user_q: str
     chat_history: List[Dict[str, str]]
     lst_res: List[AgentRes]
-    output: Dict
\ No newline at end of file
+    output: Dict
+
+class ParallelState(typing.TypedDict, total=False):
+    user_q: str
+    chat_history: List[Dict[str, str]]
+    lst_res: Annotated[List[AgentRes], operator.add]  # Results of every tool call so far
+    pending: List[AgentRes]  # Tool calls chosen in the last agent turn
+    output: Dict
+    iterations: int
+    deadline: float
\ No newline at end of file
@@ -0,0 +1,64 @@
+import json
+import re
+from typing import Optional
+
+from src.config.router_config import RouterConfig
+from src.llm.crew_llm import get_llm
+from src.llm.response_cache import cache_responses
+from .models import QueryPlan
+from .query_router import SIMPLE_RESPONSE, INTERNET_SEARCH
+
+JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+
+class QueryPlanner:
+    """Plans a query with a single structured LLM call
+
+    The model either answers the query itself or asks for research and
+    suggests the search queries to run, so simple queries need one model
+    call instead of a planner and a synthesizer call.
+    """
+
+    def __init__(self, max_queries: Optional[int] = None):
+        self.max_queries = max_queries or RouterConfig.plan_max_queries
+
+    def prompt(self, query: str, context_str: str) -> str:
+        return f"""You are the planner of a research assistant. Decide whether you can answer the user's query yourself or it needs an internet search.
+Query: "{query}"
+
+Context from previous interactions:
+{context_str}
+
+Answer directly only for greetings, conversation and questions you can answer reliably without current or external information.
+
+Reply with ONLY one JSON object, in one of these forms:
+{{"action": "answer", "answer": "<your complete, friendly answer>"}}
+{{"action": "research", "queries": ["<search query>", ...]}}
+
+For research, suggest up to {self.max_queries} short, specific web search queries that together cover the question.
+"""
+
+    def parse(self, text: str) -> QueryPlan:
+        """Read the model's reply; anything unreadable falls back to a plain internet search"""
+        match = JSON_OBJECT.search(str(text or ""))
+        try:
+            data = json.loads(match.group(0)) if match else None
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return QueryPlan(decision=INTERNET_SEARCH)
+
+        answer = str(data.get("answer") or "").strip()
+        if str(data.get("action", "")).lower() == "answer" and answer:
+            return QueryPlan(decision=SIMPLE_RESPONSE, answer=answer)
+
+        queries = data.get("queries") if isinstance(data.get("queries"), list) else []
+        unique = list(dict.fromkeys(str(q).strip() for q in queries if str(q).strip()))
+        return QueryPlan(decision=INTERNET_SEARCH, queries=unique[:self.max_queries])
+
+    def plan(self, query: str, context_str: str) -> QueryPlan:
+        # The prompt is fully determined by the query and context, so repeats are served from cache
+        with cache_responses():
+            reply = get_llm().call([{"role": "user", "content": self.prompt(query, context_str)}])
+        return self.parse(reply)
+
+__all__ = ['QueryPlanner']
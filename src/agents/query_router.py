@@ -0,0 +1,181 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from src.config.router_config import RouterConfig
+
+SIMPLE_RESPONSE = "SIMPLE_RESPONSE"
+INTERNET_SEARCH = "INTERNET_SEARCH"
+
+class RouteDecision(BaseModel):
+    decision: str
+    source: str  # "rules" or "model"
+    confidence: float = 1.0
+
+class QueryRouter:
+    """Decides obvious queries locally so only ambiguous ones reach the planner agent"""
+
+    # Phrases that make up greetings and small talk; a query made only of these is SIMPLE_RESPONSE
+    SIMPLE_PHRASES = re.compile(r"""^(?:
+        hi|hello|hey|hiya|howdy|yo|greetings|sup|what'?s\s+up|
+        good\s+(?:morning|afternoon|evening|night|day)|
+        how\s+are\s+(?:you|u)(?:\s+doing)?(?:\s+today)?|how'?s\s+it\s+going|how\s+do\s+you\s+do|
+        (?:thanks|thank\s+you)(?:\s+(?:so|very)\s+much)?(?:\s+for\s+(?:the|your)\s+help)?|thx|ty|cheers|
+        bye|goodbye|good\s*bye|see\s+(?:you|ya)(?:\s+later)?|take\s+care|
+        ok|okay|cool|nice|great|awesome|perfect|got\s+it|sounds\s+good|
+        who\s+are\s+you|what\s+can\s+you\s+do|what\s+is\s+your\s+name|what'?s\s+your\s+name
+    )(?:\s+(?:there|friend|buddy|again|everyone|all|bot))?$""", re.IGNORECASE | re.VERBOSE)
+
+    # Signals that the query needs fresh or external information
+    SEARCH_SIGNALS = re.compile(r"""\b(?:
+        latest|news|today|tonight|yesterday|tomorrow|current(?:ly)?|recent(?:ly)?|
+        price|prices|cost|weather|forecast|stock|score|release(?:d)?|
+        search|look\s+up|compare|versus|vs|
+        (?:19|20)\d{2}
+    )\b""", re.IGNORECASE | re.VERBOSE)
+
+    # Words that are common in small talk ("thanks, I get it now") and only signal a search in a question
+    WEAK_SEARCH_SIGNALS = re.compile(r"\b(?:now|find|results?)\b", re.IGNORECASE)
+
+    QUESTION_START = re.compile(
+        r"^(?:who|what|when|where|which|why|how|is|are|was|were|does|do|did|can|could|should)\b",
+        re.IGNORECASE
+    )
+
+    # Trained models shared across instances, keyed by log path: (log mtime/size signature, model)
+    _models_lock = threading.Lock()
+    _models: Dict[str, Tuple[Tuple[float, int], Optional[Dict]]] = {}
+
+    def __init__(self, log_path: Optional[str] = None, confidence: Optional[float] = None,
+                 min_samples: Optional[int] = None):
+        self.log_path = log_path or RouterConfig.router_log_path
+        self.confidence = confidence if confidence is not None else RouterConfig.router_confidence
+        self.min_samples = min_samples if min_samples is not None else RouterConfig.router_min_samples
+
+    @staticmethod
+    def normalize_decision(decision: str) -> str:
+        """Map a free-form planner reply onto one of the two decisions"""
+        return SIMPLE_RESPONSE if SIMPLE_RESPONSE in str(decision).upper() else INTERNET_SEARCH
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"[a-z0-9']+", text.lower())
+
+    def route(self, query: str) -> Optional[RouteDecision]:
+        """Return a decision for obvious queries, or None if the planner should decide"""
+        decision = self.route_by_rules(query)
+        if decision is not None:
+            return RouteDecision(decision=decision, source="rules")
+        return self.route_by_model(query)
+
+    def route_by_rules(self, query: str) -> Optional[str]:
+        text = query.strip()
+        if not text:
+            return SIMPLE_RESPONSE
+
+        # "hi, how are you?" -> every clause must be small talk
+        clauses = [c.strip() for c in re.split(r"[,.!?;:]+", text) if c.strip()]
+        if clauses and all(self.SIMPLE_PHRASES.match(re.sub(r"\s+", " ", c)) for c in clauses):
+            return SIMPLE_RESPONSE
+
+        words = self.tokenize(text)
+        if self.SEARCH_SIGNALS.search(text) and len(words) >= 2:
+            return INTERNET_SEARCH
+        is_question = bool(self.QUESTION_START.match(text)) or text.endswith("?")
+        if is_question and self.WEAK_SEARCH_SIGNALS.search(text) and len(words) >= 3:
+            return INTERNET_SEARCH
+        # Questions about the assistant itself ("can you help me?") are conversation, not research
+        if self.QUESTION_START.match(text) and len(words) >= 4 and not {"you", "your", "u"} & set(words):
+            return INTERNET_SEARCH
+        return None
+
+    def route_by_model(self, query: str) -> Optional[RouteDecision]:
+        model = self._load_model()
+        if model is None:
+            return None
+        decision, confidence = self._predict(model, query)
+        if confidence < self.confidence:
+            return None
+        return RouteDecision(decision=decision, source="model", confidence=confidence)
+
+    def record_decision(self, query: str, decision: str):
+        """Append a planner decision to the log the local model is trained from"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "query": query,
+                    "decision": self.normalize_decision(decision),
+                    "timestamp": time.time()
+                }) + "\n")
+        except OSError:
+            # Logging decisions is best effort and must never break a query
+            pass
+
+    def _load_model(self) -> Optional[Dict]:
+        """Load the naive Bayes model, retraining only when the decision log has changed"""
+        try:
+            stat = os.stat(self.log_path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime, stat.st_size)
+
+        with QueryRouter._models_lock:
+            cached = QueryRouter._models.get(self.log_path)
+            if cached is None or cached[0] != signature:
+                cached = (signature, self._train(self._read_log()))
+                QueryRouter._models[self.log_path] = cached
+            return cached[1]
+
+    def _read_log(self) -> List[Tuple[str, str]]:
+        samples = []
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    samples.append((entry["query"], self.normalize_decision(entry["decision"])))
+                except (ValueError, KeyError):
+                    continue
+        return samples
+
+    def _train(self, samples: List[Tuple[str, str]]) -> Optional[Dict]:
+        docs = Counter(label for _, label in samples)
+        if any(docs[label] < self.min_samples for label in (SIMPLE_RESPONSE, INTERNET_SEARCH)):
+            return None
+
+        word_counts = {SIMPLE_RESPONSE: Counter(), INTERNET_SEARCH: Counter()}
+        for query, label in samples:
+            word_counts[label].update(self.tokenize(query))
+        vocab = set(word_counts[SIMPLE_RESPONSE]) | set(word_counts[INTERNET_SEARCH])
+        return {
+            "priors": {label: math.log(docs[label] / len(samples)) for label in word_counts},
+            "word_counts": word_counts,
+            "totals": {label: sum(counts.values()) for label, counts in word_counts.items()},
+            "vocab": vocab
+        }
+
+    def _predict(self, model: Dict, query: str) -> Tuple[str, float]:
+        tokens = [token for token in self.tokenize(query) if token in model["vocab"]]
+        if not tokens:
+            # Nothing the model has seen before, so only the priors would speak
+            return INTERNET_SEARCH, 0.0
+
+        scores = {}
+        for label, prior in model["priors"].items():
+            denominator = model["totals"][label] + len(model["vocab"]) + 1
+            scores[label] = prior + sum(
+                math.log((model["word_counts"][label][token] + 1) / denominator)
+                for token in tokens
+            )
+        best = max(scores, key=scores.get)
+        norm = max(scores.values())
+        total = sum(math.exp(score - norm) for score in scores.values())
+        return best, math.exp(scores[best] - norm) / total
+
+__all__ = ['QueryRouter', 'RouteDecision', 'SIMPLE_RESPONSE', 'INTERNET_SEARCH']
@@ -0,0 +1,82 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+from src.telemetry import span, set_attribute
+from src.tools.parallel_search import SearchResults, parallel_search
+
+_stats: Dict[str, float] = {"started": 0, "used": 0, "wasted": 0, "overlap_seconds": 0.0}
+_wasted_by: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+def get_speculation_stats() -> Dict[str, object]:
+    """Process-wide counts of speculative searches used and wasted, with the reasons they were wasted"""
+    with _stats_lock:
+        stats: Dict[str, object] = dict(_stats)
+        stats["wasted_by"] = dict(_wasted_by)
+    settled = stats["used"] + stats["wasted"]
+    stats["wasted_ratio"] = stats["wasted"] / settled if settled else 0.0
+    return stats
+
+class SpeculativeSearch:
+    """Search of the raw query started while the planner decides whether research is needed
+
+    The search runs on a background thread. take() returns its results when
+    the query does need research; cancel() discards them otherwise, and sources
+    that have not started by then are never run.
+    """
+
+    def __init__(self, query: str, sources: Dict[str, Callable[[str], str]]):
+        self.query = query
+        self.sources = sources
+        self.started_at = time.monotonic()
+        self._future: "Future[SearchResults]" = Future()
+        self._stop: "Future[None]" = Future()
+        self._settled = False
+        self._lock = threading.Lock()
+        with _stats_lock:
+            _stats["started"] += 1
+        # The search runs with a copy of the caller's context, so its span joins the query's trace
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._run,), name="search-speculative", daemon=True).start()
+
+    def _run(self):
+        try:
+            with span("search.speculative", sources=len(self.sources)):
+                results = parallel_search(self.query, self.sources, stop=self._stop)
+            self._future.set_result(results)
+        except Exception as e:
+            self._future.set_exception(e)
+
+    def _settle(self) -> bool:
+        """Mark the speculation as used or discarded; False if it already was"""
+        with self._lock:
+            if self._settled:
+                return False
+            self._settled = True
+        return True
+
+    def take(self) -> SearchResults:
+        """Wait for the speculative results, to use them for the research task"""
+        if self._settle():
+            with _stats_lock:
+                _stats["used"] += 1
+                _stats["overlap_seconds"] += time.monotonic() - self.started_at
+            set_attribute("speculation", "used")
+        return self._future.result()
+
+    def cancel(self, reason: str):
+        """Discard the speculative results, stopping sources that have not started yet"""
+        if not self._settle():
+            return
+        if not self._stop.done():
+            self._stop.set_result(None)
+        with _stats_lock:
+            _stats["wasted"] += 1
+            _wasted_by[reason] = _wasted_by.get(reason, 0) + 1
+        set_attribute("speculation", "wasted")
+        set_attribute("speculation_wasted_by", reason)
+
+__all__ = ['SpeculativeSearch', 'get_speculation_stats']
@@ -0,0 +1,63 @@
+import threading
+from typing import Dict, Optional
+
+from crewai.events import crewai_event_bus, ToolUsageErrorEvent, ToolUsageFinishedEvent
+from src.tools.search_cache import is_failed_search
+
+_watched: Dict[str, "TaskToolUsage"] = {}
+_watched_lock = threading.Lock()
+_handlers_registered = False
+
+def _usage(event) -> Optional["TaskToolUsage"]:
+    with _watched_lock:
+        return _watched.get(str(getattr(event, "task_id", None)))
+
+def _on_tool_finished(source, event):
+    usage = _usage(event)
+    if usage is not None:
+        usage.count(not is_failed_search(str(event.output)))
+
+def _on_tool_error(source, event):
+    usage = _usage(event)
+    if usage is not None:
+        usage.count(False)
+
+class TaskToolUsage:
+    """Counts of one task's tool calls that found something and that failed
+
+    Calls are observed through CrewAI's event bus between watch() and stop().
+    Tools that return an error or "no result" text count as failed.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.succeeded = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def watch(cls, task) -> "TaskToolUsage":
+        global _handlers_registered
+        usage = cls(str(task.id))
+        with _watched_lock:
+            if not _handlers_registered:
+                _handlers_registered = True
+                crewai_event_bus.on(ToolUsageFinishedEvent)(_on_tool_finished)
+                crewai_event_bus.on(ToolUsageErrorEvent)(_on_tool_error)
+            _watched[usage.task_id] = usage
+        return usage
+
+    def count(self, succeeded: bool):
+        with self._lock:
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def stop(self):
+        """Stop watching, once the handlers of calls already made have run"""
+        crewai_event_bus.flush(timeout=2)
+        with _watched_lock:
+            _watched.pop(self.task_id, None)
+
+__all__ = ['TaskToolUsage']
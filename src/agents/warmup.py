@@ -0,0 +1,95 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config.cache_config import CacheConfig
+from src.config.engine_config import EngineConfig
+from src.config.llm_config import LLMConfig
+from src.config.memory_config import MemoryConfig
+from src.config.ollama_config import OllamaConfig
+from src.config.research_config import ResearchConfig
+
+logger = logging.getLogger(__name__)
+
+_started = False
+_lock = threading.Lock()
+# Seconds taken by each step of the last warm-up
+timings: Dict[str, float] = {}
+
+def import_workflow():
+    # Imports CrewAI and the agent modules
+    from .crew_workflow import CrewWorkflow  # noqa: F401
+
+def load_llm():
+    from src.llm.crew_llm import get_llm
+    get_llm()
+
+def preload_model():
+    """Load the local model into Ollama's memory before the first query needs it"""
+    from src.llm.ollama_llm import preload_ollama
+    preload_ollama()
+
+def uses_embeddings() -> bool:
+    """Whether any enabled feature embeds text"""
+    return (bool(MemoryConfig.vector_store) or CacheConfig.answer_cache_enabled
+            or MemoryConfig.knowledge_use_embeddings or ResearchConfig.passage_embedding_weight > 0)
+
+def load_embeddings():
+    from src.memory.embedding_service import EmbeddingService
+    EmbeddingService.shared().embedder
+
+def load_tools():
+    from src.tools.crew_tools import get_search_tools
+    for tool in get_search_tools():
+        if hasattr(tool, "wrapper"):
+            tool.wrapper()
+
+def build_agents():
+    """Put one agent per role in the shared pool"""
+    from .agent_pool import AgentPool
+    pool = AgentPool.shared()
+    for role in ("planner", "researcher", "synthesizer"):
+        with pool.acquire(role):
+            pass
+
+def warm_up_steps() -> List[Tuple[str, Callable[[], None]]]:
+    steps = [("import", import_workflow), ("llm", load_llm)]
+    if LLMConfig.get_provider().split("#")[0].strip() == "ollama" and OllamaConfig.ollama_native and OllamaConfig.ollama_preload:
+        steps.append(("ollama_preload", preload_model))
+    if uses_embeddings():
+        steps.append(("embeddings", load_embeddings))
+    steps += [("tools", load_tools), ("agents", build_agents)]
+    return steps
+
+def run_warm_up() -> Dict[str, float]:
+    """Run every warm-up step, returning the seconds each took; failures are reported and skipped"""
+    for name, step in warm_up_steps():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Preload CrewAI, the configured LLM client, embedding model, search tools and agents
+
+    Runs once per process (later calls return None), on a daemon thread unless
+    background is False, so the first query does not pay for these imports.
+    Does nothing when WARMUP_ENABLED is false.
+    """
+    global _started
+    with _lock:
+        if _started or not EngineConfig.warmup_enabled:
+            return None
+        _started = True
+    if not background:
+        run_warm_up()
+        return None
+    thread = threading.Thread(target=run_warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+__all__ = ['warm_up', 'run_warm_up', 'timings']
\ No newline at end of file
@@ -1,97 +1,149 @@
-import streamlit as st
-from typing import Dict, List, Any
+import contextvars
+import json
+import logging
+import re
+import time
+from concurrent.futures import wait
+from typing import Dict, List, Any, Optional
 from langgraph.graph import StateGraph, END
 
-from .models import AgentRes, State
+from .models import AgentRes, State, ParallelState
 from src.llm.crew_llm import create_llm
-from src.tools import ToolFactory
-from src.memory import SimpleMemory
-from src.utils.ui_helper import StreamlitUI
+from src.llm.response_cache import cache_responses
+from src.tools import FinalAnswerTool, get_search_tools
+from src.tools.parallel_search import parallel_search, get_search_executor, search_sources
+from src.tools.passage_ranker import rank_passages
+from src.tools.search_cache import is_failed_search
+from src.config.research_config import ResearchConfig
+from src.memory import KnowledgeStore, SimpleMemory
+from src.telemetry import traced, set_attribute
+from .events import EventCallback, emit_event
+
+logger = logging.getLogger(__name__)
+
+# Graph node names of the search tools the prompts refer to
+GRAPH_TOOL_NAMES = {"DuckDuckGo Search": "tool_browser", "Wikipedia Research": "tool_wikipedia"}
+# The general web search node, whose queries are fanned out to every search tool
+GENERIC_SEARCH_NODE = "tool_browser"
+JSON_IN_REPLY = re.compile(r"[\[{].*[\]}]", re.S)
+
+def graph_tool_name(tool) -> str:
+    return GRAPH_TOOL_NAMES.get(tool.name) or re.sub(r"\W+", "_", tool.name.lower()).strip("_")
 
 class AgentWorkflow:
-    def __init__(self, memory=None):
+    def __init__(self, memory=None, on_event: Optional[EventCallback] = None, tools: Optional[List] = None,
+                 max_iterations: Optional[int] = None, max_tool_calls: Optional[int] = None,
+                 time_budget: Optional[float] = None):
         self.llm = create_llm()
         self.memory = memory if memory is not None else SimpleMemory()
-        self.tools = ToolFactory.get_tools()
-        self.ui = StreamlitUI()
-    
+        self.knowledge = KnowledgeStore.shared()
+        tools = tools if tools is not None else get_search_tools()
+        self.tools = {graph_tool_name(tool): tool for tool in tools}
+        self.tools["final_answer"] = FinalAnswerTool()
+        self.on_event = on_event
+        self.max_iterations = max_iterations or ResearchConfig.graph_max_iterations
+        self.max_tool_calls = max_tool_calls or ResearchConfig.graph_max_tool_calls
+        self.time_budget = time_budget or ResearchConfig.graph_time_budget
+
     def save_memory(self, lst_res: List[AgentRes], user_q: str) -> List[Dict[str, str]]:
         # Add to memory and get context
         self.memory.add_memory(lst_res, user_q)
-        return self.memory.get_relevant_context(user_q)
+        context = self.memory.get_relevant_context(user_q)
+        # Findings researched by other sessions may already answer the query
+        hits = self.knowledge.lookup(user_q) if self.knowledge is not None else []
+        if hits:
+            context.append({"role": "system",
+                            "content": f"Findings from earlier research:\n{KnowledgeStore.format_hits(hits)}"})
+        return context
+
+    def record_findings(self, res: AgentRes):
+        """Share a search result with later queries of any session; errors and empty results are not shared"""
+        if is_failed_search(res.tool_output):
+            return
+        if self.knowledge is not None and "query" in res.tool_input and res.tool_name != "final_answer":
+            try:
+                self.knowledge.add(str(res.tool_input["query"]), res.tool_output)
+            except Exception as e:
+                logger.warning("Error recording research findings: %s", e)
+
+    def prompt_tools(self) -> str:
+        str_tools = "\n".join([f"{i+1}. `{name}`: {tool.description}"
+                              for i, (name, tool) in enumerate(self.tools.items())])
+        return f"You can use the following tools:\n{str_tools}"
+
+    def ask(self, system_prompt: str, user_query: str, context: List[Dict[str, str]]) -> str:
+        """Send the prompt to the LLM and return the JSON in its reply"""
+        messages = [{"role": "system", "content": system_prompt},
+                    *[{"role": m["role"], "content": m["content"]} for m in context],
+                    {"role": "user", "content": user_query}]
+        # Tool selection is fully determined by the query and the results so far
+        with cache_responses():
+            reply = str(self.llm.call(messages))
+        match = JSON_IN_REPLY.search(reply)
+        return match.group(0) if match else reply
 
     def node_agent(self, state: State) -> Dict[str, List[AgentRes]]:
-        self.ui.update_current_step("Agent thinking...")
-        str_tools = "\n".join([f"{i+1}. `{tool.name}`: {tool.description}" 
-                              for i, tool in enumerate(self.tools.values())])
-        prompt_tools = f"You can use the following tools:\n{str_tools}"
-        
+        emit_event(self.on_event, "Agent thinking...", type="step")
         # Get context from memory
         context = state["chat_history"] + self.save_memory(state["lst_res"], state["user_q"])
-        
-        messages = self.llm.prepare_prompt(
-            system_prompt=self.get_agent_prompt() + "\n" + prompt_tools,
-            user_query=state["user_q"],
-            context=context
-        )
-        
-        llm_res = self.llm.chat(messages=messages, format="json")
-        agent_res = AgentRes.from_llm(llm_res)
+        content = self.ask(self.get_agent_prompt() + "\n" + self.prompt_tools(), state["user_q"], context)
+        agent_res = AgentRes.from_llm({"message": {"content": content}})
         return {"lst_res":[agent_res]}
 
     def node_agent_2(self, state: State) -> Dict[str, List[AgentRes]]:
-        self.ui.update_current_step("Second agent thinking...")
-        str_tools = "\n".join([f"{i+1}. `{tool.name}`: {tool.description}" 
-                              for i, tool in enumerate(self.tools.values())])
-        prompt_tools = f"You can use the following tools:\n{str_tools}"
-        
+        emit_event(self.on_event, "Second agent thinking...", type="step")
         output_text = state["output"].get("tool_output", "") if isinstance(state["output"], dict) else state["output"].tool_output
-        
+
         # Get context from memory
         context = state["chat_history"] + self.save_memory(state["lst_res"], state["user_q"])
-        
-        messages = self.llm.prepare_prompt(
-            system_prompt=self.get_agent_2_prompt() + "\n" + prompt_tools,
-            user_query=output_text,
-            context=context
-        )
-        
-        llm_res = self.llm.chat(messages=messages, format="json")
-        agent_res = AgentRes.from_llm(llm_res)
+        content = self.ask(self.get_agent_2_prompt() + "\n" + self.prompt_tools(), output_text, context)
+        agent_res = AgentRes.from_llm({"message": {"content": content}})
         return {"lst_res":[agent_res]}
 
     def node_tool(self, state: State) -> Dict:
         res = state["lst_res"][-1]
-        self.ui.update_current_step(f"Using {res.tool_name}...")
-        
+        emit_event(self.on_event, f"Using {res.tool_name}...", type="step")
+
         # Add tool execution message to progress
-        self.ui.add_chat_message("system", f"Using tool: {res.tool_name}", is_progress=True)
-        self.ui.add_chat_message("assistant", f"Input: {res.tool_input}", is_progress=True)
-        
+        emit_event(self.on_event, f"Using tool: {res.tool_name}", role="system")
+        emit_event(self.on_event, f"Input: {res.tool_input}", role="assistant")
+
         tool = self.tools[res.tool_name]
+        if res.tool_name == GENERIC_SEARCH_NODE and "query" in res.tool_input and ResearchConfig.parallel_search_enabled:
+            # Fan a general search out to every search tool at once instead of one serial agent loop per tool
+            sources = search_sources([tool for name, tool in self.tools.items() if name != "final_answer"])
+            results = parallel_search(res.tool_input["query"], sources)
+            results.snippets = rank_passages(res.tool_input["query"], results.snippets)
+            tool_output = results.to_prompt()
+        else:
+            tool_output = str(tool.run(**res.tool_input))
         agent_res = AgentRes(
             tool_name=res.tool_name,
             tool_input=res.tool_input,
-            tool_output=str(tool.invoke(**res.tool_input))
+            tool_output=tool_output
         )
-        
+
         # Add tool result to progress
-        self.ui.add_chat_message("system", f"Result from {res.tool_name}:", is_progress=True)
-        self.ui.add_chat_message("assistant", agent_res.tool_output[:200] + "..." if len(agent_res.tool_output) > 200 else agent_res.tool_output, is_progress=True)
-        
+        self.emit_result(agent_res)
+        self.record_findings(agent_res)
+
         return {"output": agent_res} if res.tool_name == "final_answer" else {"lst_res": [agent_res]}
 
+    def emit_result(self, res: AgentRes):
+        emit_event(self.on_event, f"Result from {res.tool_name}:", role="system")
+        emit_event(self.on_event, res.tool_output[:200] + "..." if len(res.tool_output) > 200 else res.tool_output, role="assistant")
+
     def conditional_edges(self, state: State) -> str:
         last_res = state["lst_res"][-1]
         next_node = last_res.tool_name if isinstance(state["lst_res"], list) else "final_answer"
-        self.ui.update_current_step(f"Moving to {next_node}...")
+        emit_event(self.on_event, f"Moving to {next_node}...", type="step")
         return next_node
 
     def should_use_agent2(self, state: State) -> bool:
         """Determine if Agent2 should be used based on the response"""
         if not state.get("output"):
             return False
-            
+
         output = state["output"].tool_output if hasattr(state["output"], "tool_output") else state["output"].get("tool_output", "")
         # If the answer seems uncertain or incomplete, use Agent2
         uncertainty_indicators = [
@@ -106,32 +158,154 @@ class AgentWorkflow:
         ]
         return any(indicator.lower() in output.lower() for indicator in uncertainty_indicators)
 
-    def create_graph(self) -> StateGraph:
+    @staticmethod
+    def call_key(res: AgentRes) -> str:
+        """Identity of a tool call, ignoring case and spacing of its arguments"""
+        params = {key: " ".join(str(value).lower().split()) for key, value in res.tool_input.items()}
+        return json.dumps([res.tool_name, params], sort_keys=True)
+
+    @staticmethod
+    def parse_tool_calls(content: str) -> List[AgentRes]:
+        """Tool calls in a parallel agent reply; a reply that is not JSON is taken as the answer"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return [AgentRes(tool_name="final_answer", tool_input={"text": content.strip()})]
+        if isinstance(data, dict):
+            data = data.get("tool_calls", [data])
+        calls = data if isinstance(data, list) else []
+        return [AgentRes(tool_name=str(call["name"]), tool_input=call.get("parameters") or {})
+                for call in calls if isinstance(call, dict) and call.get("name")]
+
+    def gathered_answer(self, lst_res: List[AgentRes]) -> str:
+        """Answer from the raw tool results, used when the budget runs out before the agent answers"""
+        found = "\n\n".join(res.tool_output for res in lst_res if res.tool_output)
+        if not found:
+            return "I apologize, but I couldn't find an answer within the time available. Please try again."
+        return f"I ran out of research time before writing a full answer. Here is what I found:\n\n{found}"
+
+    def node_parallel_agent(self, state: ParallelState) -> Dict[str, Any]:
+        emit_event(self.on_event, "Agent thinking...", type="step")
+        deadline = state.get("deadline") or time.monotonic() + self.time_budget
+        iterations = state.get("iterations", 0)
+        lst_res = state.get("lst_res", [])
+        # Out of tool rounds or time: this turn must answer
+        final_turn = iterations >= self.max_iterations or time.monotonic() >= deadline
+
+        context = state["chat_history"] + self.save_memory(lst_res, state["user_q"])
+        system_prompt = self.get_parallel_agent_prompt(self.max_tool_calls) + "\n" + self.prompt_tools()
+        if final_turn:
+            system_prompt += "\nYou have no tool calls left. You MUST answer now with the `final_answer` tool."
+        calls = self.parse_tool_calls(self.ask(system_prompt, state["user_q"], context))
+        set_attribute("iteration", iterations)
+
+        final = next((call for call in calls if call.tool_name == "final_answer"), None)
+        if final is None and final_turn:
+            final = AgentRes(tool_name="final_answer", tool_input={"text": self.gathered_answer(lst_res)})
+        if final is not None:
+            text = str(final.tool_input.get("text", ""))
+            output = AgentRes(tool_name="final_answer", tool_input=final.tool_input, tool_output=text)
+            self.emit_result(output)
+            return {"output": output, "pending": [], "deadline": deadline}
+
+        # Drop calls already made for this query and unknown tools, then cap the batch
+        seen = {self.call_key(res) for res in lst_res}
+        pending = []
+        for call in calls:
+            key = self.call_key(call)
+            if call.tool_name in self.tools and key not in seen:
+                seen.add(key)
+                pending.append(call)
+        pending = pending[:self.max_tool_calls]
+        set_attribute("tool_calls", len(pending))
+        if not pending:
+            # Nothing new to run: go straight to the final turn
+            return {"pending": [], "iterations": self.max_iterations, "deadline": deadline}
+        return {"pending": pending, "deadline": deadline}
+
+    def run_tool(self, call: AgentRes) -> str:
+        # Search tools rank their own output
+        try:
+            return str(self.tools[call.tool_name].run(**call.tool_input))
+        except Exception as e:
+            return f"Error using {call.tool_name}: {str(e)}"
+
+    def node_parallel_tools(self, state: ParallelState) -> Dict[str, Any]:
+        calls = state["pending"]
+        emit_event(self.on_event, f"Running {len(calls)} tool calls in parallel...", type="step")
+        for call in calls:
+            emit_event(self.on_event, f"Using tool: {call.tool_name}", role="system")
+            emit_event(self.on_event, f"Input: {call.tool_input}", role="assistant")
+
+        # Each call keeps the query's LLM settings and trace
+        executor = get_search_executor()
+        futures = [executor.submit(contextvars.copy_context().run, self.run_tool, call) for call in calls]
+        done, _ = wait(futures, timeout=max(state["deadline"] - time.monotonic(), 1))
+
+        results = []
+        for call, future in zip(calls, futures):
+            finished = future in done
+            if finished:
+                output = future.result()
+            else:
+                future.cancel()
+                output = f"{call.tool_name} did not finish within the time budget."
+            res = AgentRes(tool_name=call.tool_name, tool_input=call.tool_input, tool_output=output)
+            self.emit_result(res)
+            if finished and not output.startswith(f"Error using {call.tool_name}"):
+                self.record_findings(res)
+            results.append(res)
+        return {"lst_res": results, "pending": [], "iterations": state.get("iterations", 0) + 1}
+
+    def parallel_edges(self, state: ParallelState) -> str:
+        if state.get("output"):
+            return END
+        next_node = "tools" if state.get("pending") else "agent"
+        emit_event(self.on_event, f"Moving to {next_node}...", type="step")
+        return next_node
+
+    def create_parallel_graph(self) -> StateGraph:
+        """Agent turns that each pick several tool calls, run concurrently, until an answer or the budget ends"""
+        workflow = StateGraph(ParallelState)
+        workflow.add_node("agent", action=traced("graph.agent")(self.node_parallel_agent))
+        workflow.add_node("tools", action=traced("graph.tools")(self.node_parallel_tools))
+        workflow.set_entry_point("agent")
+        workflow.add_conditional_edges(source="agent", path=self.parallel_edges)
+        workflow.add_edge(start_key="tools", end_key="agent")
+        return workflow.compile()
+
+    def create_graph(self, parallel: Optional[bool] = None) -> StateGraph:
+        if parallel is None:
+            parallel = ResearchConfig.graph_parallel_tools
+        if parallel:
+            return self.create_parallel_graph()
+
         workflow = StateGraph(State)
-        
+        # Each node is timed as its own span of the current query
+
         # Agent 1
-        workflow.add_node("Agent1", action=self.node_agent)
+        workflow.add_node("Agent1", action=traced("graph.Agent1")(self.node_agent))
         workflow.set_entry_point("Agent1")
-        workflow.add_node("tool_browser", action=self.node_tool)
-        workflow.add_node("final_answer", action=self.node_tool)
+        workflow.add_node("tool_browser", action=traced("graph.tool_browser")(self.node_tool))
+        workflow.add_node("final_answer", action=traced("graph.final_answer")(self.node_tool))
         workflow.add_edge(start_key="tool_browser", end_key="Agent1")
         workflow.add_conditional_edges(source="Agent1", path=self.conditional_edges)
-        
+
         # Agent 2
-        workflow.add_node("Agent2", action=self.node_agent_2)
-        workflow.add_node("tool_wikipedia", action=self.node_tool)
+        workflow.add_node("Agent2", action=traced("graph.Agent2")(self.node_agent_2))
+        workflow.add_node("tool_wikipedia", action=traced("graph.tool_wikipedia")(self.node_tool))
         workflow.add_edge(start_key="tool_wikipedia", end_key="Agent2")
         workflow.add_conditional_edges(source="Agent2", path=self.conditional_edges)
-        
+
         # Add automatic decision edge from final_answer
         def final_answer_edges(state: State) -> str:
             return "Agent2" if self.should_use_agent2(state) else END
-        
+
         workflow.add_conditional_edges(
             source="final_answer",
             path=final_answer_edges
         )
-        
+
         return workflow.compile()
 
     @staticmethod
@@ -140,7 +314,7 @@ class AgentWorkflow:
         You know everything, you must answer every question from the user, you can use the list of tools provided to you.
         Your goal is to provide the user with the best possible answer, including key information about the sources and tools used.
 
-        Note, when using a tool, you provide the tool name and the arguments to use in JSON format. 
+        Note, when using a tool, you provide the tool name and the arguments to use in JSON format.
         For each call, you MUST ONLY use one tool AND the response format must ALWAYS be in the pattern:
         {"name":"<tool_name>", "parameters": {"<tool_input_key>":<tool_input_value>}}
 
@@ -160,10 +334,29 @@ class AgentWorkflow:
     def get_agent_2_prompt() -> str:
         return """
         Your goal is to use the `tool_wikipedia` ONLY ONCE to enrich the information already available.
-        Note, when using a tool, you provide the tool name and the arguments to use in JSON format. 
+        Note, when using a tool, you provide the tool name and the arguments to use in JSON format.
         For each call, you MUST ONLY use one tool AND the response format must ALWAYS be in the json response pattern given below:
-        
+
         {"name":"<tool_name>", "parameters": {"<tool_input_key>":<tool_input_value>}}
-        
+
         First you must use the `tool_wikipedia`, then elaborate the information to answer the user's question with `final_answer` tool.
+        """
+
+    @staticmethod
+    def get_parallel_agent_prompt(max_tool_calls: int) -> str:
+        return f"""
+        You know everything, you must answer every question from the user, you can use the list of tools provided to you.
+        Your goal is to provide the user with the best possible answer, including key information about the sources and tools used.
+
+        To research, request up to {max_tool_calls} tool calls at once; they run in parallel. Cover every part of
+        a multi-part question in the same step, e.g. one web search and one Wikipedia lookup per sub-question.
+        The response format must ALWAYS be JSON in the pattern:
+        {{"tool_calls": [{{"name":"<tool_name>", "parameters": {{"<tool_input_key>":<tool_input_value>}}}}, ...]}}
+
+        When you have enough information, or the user doesn't ask a specific question, answer with:
+        {{"name":"final_answer", "parameters": {{"text":"<complete answer>"}}}}
+
+        Remember, calls already made for this query are skipped, so never repeat one.
+        Remember, parameters are case-sensitive, and must be written exactly as in the tool description.
+        Be explicit about any limitations or uncertainties in your answer.
         """
\ No newline at end of file
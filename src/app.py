@@ -1,8 +1,10 @@
+import asyncio
 import streamlit as st
-from agents.crew_workflow import CrewWorkflow
-from agents.models import AgentRes
+from src.agents.engine import QueryEngine
+from src.agents.warmup import warm_up
 from utils.ui_helper import StreamlitUI
 from utils.env_config import EnvConfig
+from config.llm_config import LLMConfig
 
 # Initialize UI and environment
 ui = StreamlitUI()
@@ -16,9 +18,11 @@ EnvConfig.setup_env_ui()
 st.title("Multi-Agent Search Assistant")
 st.write("Ask a question and our crew of AI agents will work together to find the answer.")
 
-# Initialize workflow without memory dependency
+# The query engine runs the agents; this script only renders its events and answers
 try:
-    workflow = CrewWorkflow()
+    engine = QueryEngine.shared()
+    # Heavy imports and clients load in the background while the page renders (once per process)
+    warm_up()
 except ValueError as e:
     st.error(f"Configuration error: {str(e)}")
     st.stop()
@@ -30,27 +34,32 @@ ui.show_chat_messages()
 if question := st.chat_input("Ask your question"):
     # Add user message to chat
     ui.add_chat_message("user", question)
+    ui.start_progress()
     
     try:
-        # Process the query using CrewAI workflow
-        result = workflow.process_query(
-            query=question,
-            chat_history=st.session_state.messages,
-            lst_res=st.session_state.get('lst_res', [])
-        )
-        
-        # Update chat with the result
-        ui.add_chat_message("assistant", result)
-        
-        # Save new agent result
-        if 'lst_res' not in st.session_state:
-            st.session_state.lst_res = []
-        st.session_state.lst_res.append(AgentRes(
-            tool_name="final_answer",
-            tool_input={"text": result},
-            tool_output=result
-        ))
+        if LLMConfig.get_stream_responses():
+            # Stream the final answer into the chat as it is generated
+            result = ui.stream_chat_message("assistant", ui.iter_async(engine.stream(
+                question,
+                history=st.session_state.messages,
+                config=st.session_state.env_vars,
+                on_event=ui.handle_event
+            )))
+        else:
+            # Process the query using the query engine
+            result = asyncio.run(engine.answer(
+                question,
+                history=st.session_state.messages,
+                config=st.session_state.env_vars,
+                on_event=ui.handle_event
+            )).answer
+            
+            # Update chat with the result
+            ui.add_chat_message("assistant", result)
         
     except Exception as e:
         st.error(f"Error processing query: {str(e)}")
         ui.add_chat_message("assistant", "I apologize, but I encountered an error while processing your request.")
+
+    # Show where the time of this query went
+    ui.show_trace_panel()
@@ -1,5 +1,14 @@
 from .llm_config import LLMConfig
 from .memory_config import MemoryConfig
+from .cache_config import CacheConfig
+from .router_config import RouterConfig
+from .research_config import ResearchConfig
+from .context_config import ContextConfig
+from .engine_config import EngineConfig
+from .telemetry_config import TelemetryConfig
+from .gateway_config import GatewayConfig
+from .ui_config import UIConfig
+from .ollama_config import OllamaConfig
 
 class Config:
     @staticmethod
@@ -7,13 +16,31 @@ class Config:
         """Get all configuration settings"""
         return {
             "llm": LLMConfig.get_config(),
-            "memory": MemoryConfig.get_config()
+            "memory": MemoryConfig.get_config(),
+            "cache": CacheConfig.get_config(),
+            "router": RouterConfig.get_config(),
+            "research": ResearchConfig.get_config(),
+            "context": ContextConfig.get_config(),
+            "engine": EngineConfig.get_config(),
+            "telemetry": TelemetryConfig.get_config(),
+            "gateway": GatewayConfig.get_config(),
+            "ui": UIConfig.get_config(),
+            "ollama": OllamaConfig.get_config()
         }
-    
+
     @staticmethod
     def validate_all():
         """Validate all configurations"""
         # Will raise ValueError if validation fails
         MemoryConfig.validate_config()
+        CacheConfig.validate_config()
+        RouterConfig.validate_config()
+        ResearchConfig.validate_config()
+        ContextConfig.validate_config()
+        EngineConfig.validate_config()
+        TelemetryConfig.validate_config()
+        GatewayConfig.validate_config()
+        UIConfig.validate_config()
+        OllamaConfig.validate_config()
 
-__all__ = ['LLMConfig', 'MemoryConfig', 'Config']
\ No newline at end of file
+__all__ = ['LLMConfig', 'MemoryConfig', 'CacheConfig', 'RouterConfig', 'ResearchConfig', 'ContextConfig', 'EngineConfig', 'TelemetryConfig', 'GatewayConfig', 'UIConfig', 'OllamaConfig', 'Config']
@@ -0,0 +1,66 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class CacheConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Search result cache settings
+    search_cache_enabled: bool = clean_env_value(os.getenv("SEARCH_CACHE_ENABLED", "true")).lower() in ("1", "true", "yes")
+    search_cache_path: str = clean_env_value(os.getenv("SEARCH_CACHE_PATH", "./.cache/search_cache.db"))
+    search_cache_ttl: int = int(clean_env_value(os.getenv("SEARCH_CACHE_TTL", "21600")) or 21600)
+    search_cache_max_entries: int = int(clean_env_value(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000")) or 5000)
+
+    # Semantic answer cache settings (needs an embedding model, so it is opt-in)
+    answer_cache_enabled: bool = clean_env_value(os.getenv("ANSWER_CACHE_ENABLED", "false")).lower() in ("1", "true", "yes")
+    answer_cache_threshold: float = float(clean_env_value(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92")) or 0.92)
+    answer_cache_ttl: int = int(clean_env_value(os.getenv("ANSWER_CACHE_TTL", "3600")) or 3600)
+    answer_cache_max_entries: int = int(clean_env_value(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")) or 1000)
+
+    # Exact-match LLM response cache, used by call sites with deterministic prompts (e.g. the planner)
+    llm_cache_enabled: bool = clean_env_value(os.getenv("LLM_CACHE_ENABLED", "true")).lower() in ("1", "true", "yes")
+    llm_cache_backend: str = clean_env_value(os.getenv("LLM_CACHE_BACKEND", "memory")).lower()
+    llm_cache_path: str = clean_env_value(os.getenv("LLM_CACHE_PATH", "./.cache/llm_cache.db"))
+    llm_cache_ttl: int = int(clean_env_value(os.getenv("LLM_CACHE_TTL", "3600")) or 3600)
+    llm_cache_max_entries: int = int(clean_env_value(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")) or 2000)
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "search_cache_enabled": cls.search_cache_enabled,
+            "search_cache_path": cls.search_cache_path,
+            "search_cache_ttl": cls.search_cache_ttl,
+            "search_cache_max_entries": cls.search_cache_max_entries,
+            "answer_cache_enabled": cls.answer_cache_enabled,
+            "answer_cache_threshold": cls.answer_cache_threshold,
+            "answer_cache_ttl": cls.answer_cache_ttl,
+            "answer_cache_max_entries": cls.answer_cache_max_entries,
+            "llm_cache_enabled": cls.llm_cache_enabled,
+            "llm_cache_backend": cls.llm_cache_backend,
+            "llm_cache_path": cls.llm_cache_path,
+            "llm_cache_ttl": cls.llm_cache_ttl,
+            "llm_cache_max_entries": cls.llm_cache_max_entries
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the cache configuration"""
+        if cls.search_cache_ttl <= 0:
+            raise ValueError("SEARCH_CACHE_TTL must be a positive number of seconds")
+        if cls.search_cache_max_entries <= 0:
+            raise ValueError("SEARCH_CACHE_MAX_ENTRIES must be a positive integer")
+        if not 0.0 < cls.answer_cache_threshold <= 1.0:
+            raise ValueError("ANSWER_CACHE_THRESHOLD must be between 0 and 1")
+        if cls.answer_cache_ttl <= 0 or cls.answer_cache_max_entries <= 0:
+            raise ValueError("ANSWER_CACHE_TTL and ANSWER_CACHE_MAX_ENTRIES must be positive")
+        if cls.llm_cache_backend not in ("memory", "sqlite"):
+            raise ValueError("LLM_CACHE_BACKEND must be memory or sqlite")
+        if cls.llm_cache_ttl <= 0 or cls.llm_cache_max_entries <= 0:
+            raise ValueError("LLM_CACHE_TTL and LLM_CACHE_MAX_ENTRIES must be positive")
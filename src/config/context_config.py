@@ -0,0 +1,38 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class ContextConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Chat history context settings
+    context_token_budget: int = int(clean_env_value(os.getenv("CONTEXT_TOKEN_BUDGET", "1500")) or 1500)
+    context_recent_turns: int = int(clean_env_value(os.getenv("CONTEXT_RECENT_TURNS", "3")) or 3)
+    context_summary_batch: int = int(clean_env_value(os.getenv("CONTEXT_SUMMARY_BATCH", "4")) or 4)
+    context_summarize_with_llm: bool = clean_env_value(os.getenv("CONTEXT_SUMMARIZE_WITH_LLM", "true")).lower() in ("1", "true", "yes")
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "context_token_budget": cls.context_token_budget,
+            "context_recent_turns": cls.context_recent_turns,
+            "context_summary_batch": cls.context_summary_batch,
+            "context_summarize_with_llm": cls.context_summarize_with_llm
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the context configuration"""
+        if cls.context_token_budget < 100:
+            raise ValueError("CONTEXT_TOKEN_BUDGET must be at least 100 tokens")
+        if cls.context_recent_turns < 1:
+            raise ValueError("CONTEXT_RECENT_TURNS must be at least 1")
+        if cls.context_summary_batch < 1:
+            raise ValueError("CONTEXT_SUMMARY_BATCH must be at least 1")
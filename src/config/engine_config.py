@@ -0,0 +1,65 @@
+import os
+from typing import Dict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class EngineConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Headless query engine settings
+    engine_max_workers: int = int(clean_env_value(os.getenv("ENGINE_MAX_WORKERS", "8")) or 8)
+    # Preload CrewAI, the LLM client, embeddings, tools and agents in the background at startup
+    warmup_enabled: bool = clean_env_value(os.getenv("WARMUP_ENABLED", "true")).lower() in ("1", "true", "yes")
+
+    # Serving settings (HTTP service and batch CLI)
+    serve_host: str = clean_env_value(os.getenv("SERVE_HOST", "127.0.0.1"))
+    serve_port: int = int(clean_env_value(os.getenv("SERVE_PORT", "8000")) or 8000)
+    serve_queue_size: int = int(clean_env_value(os.getenv("SERVE_QUEUE_SIZE", "64")) or 64)
+    serve_request_timeout: float = float(clean_env_value(os.getenv("SERVE_REQUEST_TIMEOUT", "180")) or 180)
+    # Comma-separated provider=limit pairs, e.g. "ollama=1,groq=4,gemini=4"
+    provider_concurrency: str = clean_env_value(os.getenv("PROVIDER_CONCURRENCY", "ollama=2,groq=4,gemini=4"))
+
+    @classmethod
+    def get_provider_limits(cls) -> Dict[str, int]:
+        """Concurrent queries allowed per LLM provider"""
+        limits = {}
+        for pair in cls.provider_concurrency.split(","):
+            if "=" in pair:
+                provider, limit = pair.split("=", 1)
+                limits[provider.strip()] = int(limit)
+        return limits
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "engine_max_workers": cls.engine_max_workers,
+            "warmup_enabled": cls.warmup_enabled,
+            "serve_host": cls.serve_host,
+            "serve_port": cls.serve_port,
+            "serve_queue_size": cls.serve_queue_size,
+            "serve_request_timeout": cls.serve_request_timeout,
+            "provider_concurrency": cls.provider_concurrency
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the engine configuration"""
+        if cls.engine_max_workers < 1:
+            raise ValueError("ENGINE_MAX_WORKERS must be at least 1")
+        if cls.serve_queue_size < 1:
+            raise ValueError("SERVE_QUEUE_SIZE must be at least 1")
+        if cls.serve_request_timeout <= 0:
+            raise ValueError("SERVE_REQUEST_TIMEOUT must be a positive number of seconds")
+        try:
+            limits = cls.get_provider_limits()
+        except ValueError:
+            raise ValueError("PROVIDER_CONCURRENCY must look like: ollama=2,groq=4,gemini=4")
+        if any(limit < 1 for limit in limits.values()):
+            raise ValueError("PROVIDER_CONCURRENCY limits must be at least 1")
\ No newline at end of file
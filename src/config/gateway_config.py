@@ -0,0 +1,68 @@
+import os
+from typing import Dict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class GatewayConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # LLM gateway settings (rate limits, retries, hedging and failover)
+    gateway_enabled: bool = clean_env_value(os.getenv("LLM_GATEWAY_ENABLED", "true")).lower() in ("1", "true", "yes")
+    # Comma-separated provider=requests per minute pairs, applied per API key
+    rate_limits: str = clean_env_value(os.getenv("LLM_RATE_LIMITS", "groq=30,gemini=15"))
+    rate_limit_max_wait: float = float(clean_env_value(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "10")) or 10)
+    max_retries: int = int(clean_env_value(os.getenv("LLM_MAX_RETRIES", "2")) or 0)
+    retry_base_delay: float = float(clean_env_value(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")) or 0.5)
+    retry_max_delay: float = float(clean_env_value(os.getenv("LLM_RETRY_MAX_DELAY", "8")) or 8)
+    hedge_after_ms: int = int(clean_env_value(os.getenv("LLM_HEDGE_AFTER_MS", "0")) or 0)
+    unhealthy_after: int = int(clean_env_value(os.getenv("LLM_UNHEALTHY_AFTER", "3")) or 3)
+    cooldown: float = float(clean_env_value(os.getenv("LLM_COOLDOWN", "30")) or 30)
+
+    @classmethod
+    def get_rate_limits(cls) -> Dict[str, float]:
+        """Requests per minute allowed per provider API key"""
+        limits = {}
+        for pair in cls.rate_limits.split(","):
+            if "=" in pair:
+                provider, limit = pair.split("=", 1)
+                limits[provider.strip()] = float(limit)
+        return limits
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "gateway_enabled": cls.gateway_enabled,
+            "rate_limits": cls.rate_limits,
+            "rate_limit_max_wait": cls.rate_limit_max_wait,
+            "max_retries": cls.max_retries,
+            "retry_base_delay": cls.retry_base_delay,
+            "retry_max_delay": cls.retry_max_delay,
+            "hedge_after_ms": cls.hedge_after_ms,
+            "unhealthy_after": cls.unhealthy_after,
+            "cooldown": cls.cooldown
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the LLM gateway configuration"""
+        if cls.max_retries < 0:
+            raise ValueError("LLM_MAX_RETRIES cannot be negative")
+        if cls.retry_base_delay < 0 or cls.retry_max_delay < cls.retry_base_delay:
+            raise ValueError("LLM_RETRY_MAX_DELAY must be at least LLM_RETRY_BASE_DELAY, and neither negative")
+        if cls.hedge_after_ms < 0:
+            raise ValueError("LLM_HEDGE_AFTER_MS cannot be negative")
+        if cls.unhealthy_after < 1:
+            raise ValueError("LLM_UNHEALTHY_AFTER must be at least 1")
+        try:
+            limits = cls.get_rate_limits()
+        except ValueError:
+            raise ValueError("LLM_RATE_LIMITS must look like: groq=30,gemini=15")
+        if any(limit <= 0 for limit in limits.values()):
+            raise ValueError("LLM_RATE_LIMITS must be positive requests per minute")
\ No newline at end of file
@@ -1,42 +1,93 @@
-from typing import Literal
+from typing import Any, Dict, Iterator, Literal, Optional
 import os
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
-import streamlit as st
 
 # Load environment variables
 load_dotenv()
 
+# Settings of the query being processed, set by callers outside a Streamlit script run
+_settings: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_settings", default=None)
+
 class LLMConfig:
+    @staticmethod
+    def _session_env_vars() -> Dict[str, Any]:
+        """Settings saved in the Streamlit session, when called from a Streamlit script run"""
+        st = sys.modules.get("streamlit")
+        if st is None:
+            return {}
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return {}
+        return st.session_state.get("env_vars", {})
+
+    @classmethod
+    def get_setting(cls, key: str, default: str = "") -> Any:
+        # First check the active settings (or session state), then environment variables, then default
+        settings = _settings.get()
+        if settings is None:
+            settings = cls._session_env_vars()
+        if key in settings:
+            return settings[key]
+        return os.getenv(key, default)
+
+    @staticmethod
+    @contextmanager
+    def use_settings(settings: Optional[Dict[str, Any]]) -> Iterator[None]:
+        """Read settings from the given dict (keyed like .env) in the current context
+
+        The settings follow the context into asyncio tasks and into threads started
+        with a copied context, so concurrent queries can each use their own provider.
+        """
+        if settings is None:
+            yield
+            return
+        token = _settings.set(dict(settings))
+        try:
+            yield
+        finally:
+            _settings.reset(token)
+
     @classmethod
     def get_provider(cls):
-        # First check session state, then environment variables, then default
-        if 'env_vars' in st.session_state and 'LLM_PROVIDER' in st.session_state.env_vars:
-            return st.session_state.env_vars['LLM_PROVIDER']
-        return os.getenv("LLM_PROVIDER", "ollama")
+        return cls.get_setting("LLM_PROVIDER", "ollama")
     
     @classmethod
     def get_model_name(cls):
-        if 'env_vars' in st.session_state and 'LLM_MODEL' in st.session_state.env_vars:
-            return st.session_state.env_vars['LLM_MODEL']
-        return os.getenv("LLM_MODEL", "gemma3:4b")
+        return cls.get_setting("LLM_MODEL", "gemma3:4b")
+    
+    @classmethod
+    def get_ollama_base_url(cls):
+        return cls.get_setting("OLLAMA_BASE_URL", "http://localhost:11434")
     
     @classmethod
     def get_groq_api_key(cls):
-        if 'env_vars' in st.session_state and 'GROQ_API_KEY' in st.session_state.env_vars:
-            return st.session_state.env_vars['GROQ_API_KEY']
-        return os.getenv("GROQ_API_KEY", "")
+        return cls.get_setting("GROQ_API_KEY", "")
     
     @classmethod
     def get_gemini_api_key(cls):
-        if 'env_vars' in st.session_state and 'GEMINI_API_KEY' in st.session_state.env_vars:
-            return st.session_state.env_vars['GEMINI_API_KEY']
-        return os.getenv("GEMINI_API_KEY", "")
+        return cls.get_setting("GEMINI_API_KEY", "")
+    
+    @classmethod
+    def get_fallbacks(cls):
+        # Comma-separated provider:model pairs tried in order when the configured provider fails
+        return cls.get_setting("LLM_FALLBACKS", "")
+    
+    @classmethod
+    def get_stream_responses(cls) -> bool:
+        value = cls.get_setting("STREAM_RESPONSES", "true")
+        return str(value).split("#")[0].strip().lower() in ("1", "true", "yes")
     
     @classmethod
     def get_config(cls):
         return {
             "provider": cls.get_provider(),
             "model_name": cls.get_model_name(),
+            "ollama_base_url": cls.get_ollama_base_url(),
             "groq_api_key": cls.get_groq_api_key(),
-            "gemini_api_key": cls.get_gemini_api_key()
+            "gemini_api_key": cls.get_gemini_api_key(),
+            "fallbacks": cls.get_fallbacks(),
+            "stream_responses": cls.get_stream_responses()
         }
\ No newline at end of file
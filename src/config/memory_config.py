@@ -18,7 +18,37 @@ class MemoryConfig:
     chroma_persist_dir: str = clean_env_value(os.getenv("CHROMA_PERSIST_DIR", "./chroma_db"))
     qdrant_url: str = clean_env_value(os.getenv("QDRANT_URL", ""))
     qdrant_api_key: str = clean_env_value(os.getenv("QDRANT_API_KEY", ""))
+    qdrant_path: str = clean_env_value(os.getenv("QDRANT_PATH", ""))  # Local on-disk mode; in-memory when empty
+    faiss_index_type: Literal["flat", "ivf", "hnsw"] = clean_env_value(os.getenv("FAISS_INDEX_TYPE", "flat"))
+    faiss_persist_dir: str = clean_env_value(os.getenv("FAISS_PERSIST_DIR", ""))
+    faiss_nlist: int = int(clean_env_value(os.getenv("FAISS_NLIST", "64")) or 64)
+    faiss_hnsw_m: int = int(clean_env_value(os.getenv("FAISS_HNSW_M", "32")) or 32)
     
+    # Embedding service settings
+    embedding_cache_dir: str = clean_env_value(os.getenv("EMBEDDING_CACHE_DIR", "./.cache/embeddings"))
+    embedding_batch_size: int = int(clean_env_value(os.getenv("EMBEDDING_BATCH_SIZE", "64")) or 64)
+    embedding_batch_wait_ms: int = int(clean_env_value(os.getenv("EMBEDDING_BATCH_WAIT_MS", "10")) or 10)
+    
+    # Retrieval settings
+    memory_collection: str = clean_env_value(os.getenv("MEMORY_COLLECTION", "agent_memory"))
+    memory_top_k: int = int(clean_env_value(os.getenv("MEMORY_TOP_K", "4")) or 4)
+    
+    # Research findings shared by all sessions; fresh ones that cover a query replace a new search
+    knowledge_store_enabled: bool = clean_env_value(os.getenv("KNOWLEDGE_STORE_ENABLED", "true")).lower() in ("1", "true", "yes")
+    knowledge_store_path: str = clean_env_value(os.getenv("KNOWLEDGE_STORE_PATH", ""))  # In memory only when empty
+    knowledge_fresh_seconds: int = int(clean_env_value(os.getenv("KNOWLEDGE_FRESH_SECONDS", "21600")) or 21600)
+    knowledge_ttl: int = int(clean_env_value(os.getenv("KNOWLEDGE_TTL", "604800")) or 604800)
+    knowledge_max_entries: int = int(clean_env_value(os.getenv("KNOWLEDGE_MAX_ENTRIES", "5000")) or 5000)
+    knowledge_min_score: float = float(clean_env_value(os.getenv("KNOWLEDGE_MIN_SCORE", "0.8")) or 0.8)
+    knowledge_use_embeddings: bool = clean_env_value(os.getenv("KNOWLEDGE_USE_EMBEDDINGS", "false")).lower() in ("1", "true", "yes")
+
+    # Chat session storage: recent messages as text, older ones compressed, the oldest spilled to disk
+    session_hot_messages: int = int(clean_env_value(os.getenv("SESSION_HOT_MESSAGES", "20")) or 20)
+    session_max_messages: int = int(clean_env_value(os.getenv("SESSION_MAX_MESSAGES", "200")) or 200)
+    session_memory_budget_kb: int = int(clean_env_value(os.getenv("SESSION_MEMORY_BUDGET_KB", "256")) or 256)
+    session_spill_path: str = clean_env_value(os.getenv("SESSION_SPILL_PATH", "./.cache/sessions.db"))
+    session_spill_ttl: int = int(clean_env_value(os.getenv("SESSION_SPILL_TTL", "604800")) or 604800)
+
     # Embedding API keys
     openai_api_key: str = clean_env_value(os.getenv("OPENAI_API_KEY", ""))
     hf_api_key: str = clean_env_value(os.getenv("HF_API_KEY", ""))
@@ -32,6 +62,28 @@ class MemoryConfig:
             "chroma_persist_dir": cls.chroma_persist_dir,
             "qdrant_url": cls.qdrant_url,
             "qdrant_api_key": cls.qdrant_api_key,
+            "qdrant_path": cls.qdrant_path,
+            "faiss_index_type": cls.faiss_index_type,
+            "faiss_persist_dir": cls.faiss_persist_dir,
+            "faiss_nlist": cls.faiss_nlist,
+            "faiss_hnsw_m": cls.faiss_hnsw_m,
+            "embedding_cache_dir": cls.embedding_cache_dir,
+            "embedding_batch_size": cls.embedding_batch_size,
+            "embedding_batch_wait_ms": cls.embedding_batch_wait_ms,
+            "memory_collection": cls.memory_collection,
+            "memory_top_k": cls.memory_top_k,
+            "knowledge_store_enabled": cls.knowledge_store_enabled,
+            "knowledge_store_path": cls.knowledge_store_path,
+            "knowledge_fresh_seconds": cls.knowledge_fresh_seconds,
+            "knowledge_ttl": cls.knowledge_ttl,
+            "knowledge_max_entries": cls.knowledge_max_entries,
+            "knowledge_min_score": cls.knowledge_min_score,
+            "knowledge_use_embeddings": cls.knowledge_use_embeddings,
+            "session_hot_messages": cls.session_hot_messages,
+            "session_max_messages": cls.session_max_messages,
+            "session_memory_budget_kb": cls.session_memory_budget_kb,
+            "session_spill_path": cls.session_spill_path,
+            "session_spill_ttl": cls.session_spill_ttl,
             "openai_api_key": cls.openai_api_key,
             "hf_api_key": cls.hf_api_key
         }
@@ -43,8 +95,18 @@ class MemoryConfig:
         
         # Only validate vector store settings if a vector store is selected
         if config["vector_store"]:
-            if config["vector_store"] == "qdrant" and not (config["qdrant_url"] and config["qdrant_api_key"]):
-                raise ValueError("Qdrant URL and API key are required when using Qdrant vector store")
+            # Without a URL Qdrant runs locally (on disk at QDRANT_PATH, or in memory)
+            if config["vector_store"] == "qdrant" and config["qdrant_api_key"] and not config["qdrant_url"]:
+                raise ValueError("Qdrant URL is required when a Qdrant API key is set")
+            if config["vector_store"] == "faiss" and config["faiss_index_type"] not in ("flat", "ivf", "hnsw"):
+                raise ValueError(f"Unsupported FAISS index type: {config['faiss_index_type']} # Options: flat, ivf, hnsw")
+        
+        if config["memory_top_k"] < 1:
+            raise ValueError("MEMORY_TOP_K must be at least 1")
+        if not 0 < config["knowledge_min_score"] <= 1:
+            raise ValueError("KNOWLEDGE_MIN_SCORE must be between 0 and 1")
+        if config["session_hot_messages"] < 1 or config["session_memory_budget_kb"] < 1:
+            raise ValueError("SESSION_HOT_MESSAGES and SESSION_MEMORY_BUDGET_KB must be at least 1")
         
         # Only validate embedding model settings if using API-based models
         if config["embedding_model"] == "openai" and not config["openai_api_key"]:
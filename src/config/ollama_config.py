@@ -0,0 +1,82 @@
+import os
+from typing import List
+from dotenv import load_dotenv
+from .context_config import ContextConfig
+from .research_config import ResearchConfig
+
+# Load environment variables
+load_dotenv()
+
+# Tokens of agent instructions, tool descriptions and task text around the history and search results
+PROMPT_OVERHEAD_TOKENS = 1500
+
+class OllamaConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Native Ollama backend (/api/chat) instead of the OpenAI-compatible endpoint
+    ollama_native: bool = clean_env_value(os.getenv("OLLAMA_NATIVE", "true")).lower() in ("1", "true", "yes")
+    # How long the model stays loaded after a request ("30m", "1h", "-1" for ever)
+    ollama_keep_alive: str = clean_env_value(os.getenv("OLLAMA_KEEP_ALIVE", "30m"))
+    ollama_preload: bool = clean_env_value(os.getenv("OLLAMA_PRELOAD", "true")).lower() in ("1", "true", "yes")
+    # Comma-separated extra Ollama servers sharing the load with OLLAMA_BASE_URL
+    ollama_base_urls: str = clean_env_value(os.getenv("OLLAMA_BASE_URLS", ""))
+    # Context window; 0 derives it from the prompt budget (see get_num_ctx)
+    ollama_num_ctx: int = int(clean_env_value(os.getenv("OLLAMA_NUM_CTX", "0")) or 0)
+    ollama_num_predict: int = int(clean_env_value(os.getenv("OLLAMA_NUM_PREDICT", "1024")) or 1024)
+    ollama_max_connections: int = int(clean_env_value(os.getenv("OLLAMA_MAX_CONNECTIONS", "8")) or 8)
+    ollama_timeout: float = float(clean_env_value(os.getenv("OLLAMA_TIMEOUT", "300")) or 300)
+
+    @classmethod
+    def get_num_ctx(cls) -> int:
+        """Context window requested from Ollama
+
+        Derived from the prompt budget (chat history, search passages and prompt
+        overhead) plus the answer length, rounded up to a multiple of 1024. It is
+        the same for every request, since Ollama reloads the model whenever
+        num_ctx changes.
+        """
+        if cls.ollama_num_ctx:
+            return cls.ollama_num_ctx
+        tokens = (ContextConfig.context_token_budget + ResearchConfig.passage_token_budget
+                  + PROMPT_OVERHEAD_TOKENS + max(cls.ollama_num_predict, 0))
+        return -(-tokens // 1024) * 1024
+
+    @classmethod
+    def get_endpoints(cls, base_url: str) -> List[str]:
+        """Ollama servers to spread requests over, starting with base_url"""
+        endpoints = []
+        for url in [base_url] + cls.ollama_base_urls.split(","):
+            url = url.strip().rstrip("/")
+            if url and url not in endpoints:
+                endpoints.append(url)
+        return endpoints
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "ollama_native": cls.ollama_native,
+            "ollama_keep_alive": cls.ollama_keep_alive,
+            "ollama_preload": cls.ollama_preload,
+            "ollama_base_urls": cls.ollama_base_urls,
+            "ollama_num_ctx": cls.get_num_ctx(),
+            "ollama_num_predict": cls.ollama_num_predict,
+            "ollama_max_connections": cls.ollama_max_connections,
+            "ollama_timeout": cls.ollama_timeout
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the Ollama configuration"""
+        if cls.ollama_num_ctx < 0:
+            raise ValueError("OLLAMA_NUM_CTX cannot be negative (0 derives it from the prompt budget)")
+        if cls.ollama_num_predict == 0 or cls.ollama_num_predict < -2:
+            raise ValueError("OLLAMA_NUM_PREDICT must be positive, -1 (no limit) or -2 (fill the context)")
+        if cls.ollama_max_connections < 1:
+            raise ValueError("OLLAMA_MAX_CONNECTIONS must be at least 1")
+        if cls.ollama_timeout <= 0:
+            raise ValueError("OLLAMA_TIMEOUT must be a positive number of seconds")
\ No newline at end of file
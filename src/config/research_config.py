@@ -0,0 +1,79 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class ResearchConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Parallel retrieval settings
+    parallel_search_enabled: bool = clean_env_value(os.getenv("PARALLEL_SEARCH_ENABLED", "true")).lower() in ("1", "true", "yes")
+    search_timeout: float = float(clean_env_value(os.getenv("SEARCH_TIMEOUT", "15")) or 15)
+    search_max_workers: int = int(clean_env_value(os.getenv("SEARCH_MAX_WORKERS", "8")) or 8)
+    # Search the raw query while the planner decides, discarding the results if no research is needed
+    speculative_search: bool = clean_env_value(os.getenv("SPECULATIVE_SEARCH", "false")).lower() in ("1", "true", "yes")
+
+    # Wikipedia backend: "api" (online) or "local" (offline FTS5 index built with python -m src.tools.local_wiki)
+    wikipedia_backend: str = clean_env_value(os.getenv("WIKIPEDIA_BACKEND", "api")).lower()
+    local_wiki_index_path: str = clean_env_value(os.getenv("LOCAL_WIKI_INDEX_PATH", "./.cache/wiki_index.db"))
+    local_wiki_top_k: int = int(clean_env_value(os.getenv("LOCAL_WIKI_TOP_K", "3")) or 3)
+    local_wiki_mmap_mb: int = int(clean_env_value(os.getenv("LOCAL_WIKI_MMAP_MB", "1024")) or 0)
+
+    # Search result post-processing: keep the passages most relevant to the query within a token budget
+    passage_ranking_enabled: bool = clean_env_value(os.getenv("PASSAGE_RANKING_ENABLED", "true")).lower() in ("1", "true", "yes")
+    passage_token_budget: int = int(clean_env_value(os.getenv("PASSAGE_TOKEN_BUDGET", "1000")) or 1000)
+    passage_chunk_tokens: int = int(clean_env_value(os.getenv("PASSAGE_CHUNK_TOKENS", "120")) or 120)
+    passage_embedding_weight: float = float(clean_env_value(os.getenv("PASSAGE_EMBEDDING_WEIGHT", "0")) or 0)
+    passage_dedupe_distance: int = int(clean_env_value(os.getenv("PASSAGE_DEDUPE_DISTANCE", "3")) or 0)
+
+    # LangGraph workflow: several tool calls per agent turn, run concurrently, within these budgets
+    graph_parallel_tools: bool = clean_env_value(os.getenv("GRAPH_PARALLEL_TOOLS", "true")).lower() in ("1", "true", "yes")
+    graph_max_iterations: int = int(clean_env_value(os.getenv("GRAPH_MAX_ITERATIONS", "3")) or 3)
+    graph_max_tool_calls: int = int(clean_env_value(os.getenv("GRAPH_MAX_TOOL_CALLS", "4")) or 4)
+    graph_time_budget: float = float(clean_env_value(os.getenv("GRAPH_TIME_BUDGET", "60")) or 60)
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "parallel_search_enabled": cls.parallel_search_enabled,
+            "search_timeout": cls.search_timeout,
+            "search_max_workers": cls.search_max_workers,
+            "speculative_search": cls.speculative_search,
+            "wikipedia_backend": cls.wikipedia_backend,
+            "local_wiki_index_path": cls.local_wiki_index_path,
+            "local_wiki_top_k": cls.local_wiki_top_k,
+            "local_wiki_mmap_mb": cls.local_wiki_mmap_mb,
+            "passage_ranking_enabled": cls.passage_ranking_enabled,
+            "passage_token_budget": cls.passage_token_budget,
+            "passage_chunk_tokens": cls.passage_chunk_tokens,
+            "passage_embedding_weight": cls.passage_embedding_weight,
+            "passage_dedupe_distance": cls.passage_dedupe_distance,
+            "graph_parallel_tools": cls.graph_parallel_tools,
+            "graph_max_iterations": cls.graph_max_iterations,
+            "graph_max_tool_calls": cls.graph_max_tool_calls,
+            "graph_time_budget": cls.graph_time_budget
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the research configuration"""
+        if cls.search_timeout <= 0:
+            raise ValueError("SEARCH_TIMEOUT must be a positive number of seconds")
+        if cls.search_max_workers < 1:
+            raise ValueError("SEARCH_MAX_WORKERS must be at least 1")
+        if cls.wikipedia_backend not in ("api", "local"):
+            raise ValueError("WIKIPEDIA_BACKEND must be 'api' or 'local'")
+        if cls.passage_token_budget < 50 or cls.passage_chunk_tokens < 10:
+            raise ValueError("PASSAGE_TOKEN_BUDGET must be at least 50 and PASSAGE_CHUNK_TOKENS at least 10")
+        if not 0 <= cls.passage_embedding_weight <= 1:
+            raise ValueError("PASSAGE_EMBEDDING_WEIGHT must be between 0 and 1")
+        if cls.graph_max_iterations < 1 or cls.graph_max_tool_calls < 1:
+            raise ValueError("GRAPH_MAX_ITERATIONS and GRAPH_MAX_TOOL_CALLS must be at least 1")
+        if cls.graph_time_budget <= 0:
+            raise ValueError("GRAPH_TIME_BUDGET must be a positive number of seconds")
@@ -0,0 +1,44 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class RouterConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Fast-path query router settings
+    router_enabled: bool = clean_env_value(os.getenv("ROUTER_ENABLED", "true")).lower() in ("1", "true", "yes")
+    router_log_path: str = clean_env_value(os.getenv("ROUTER_LOG_PATH", "./.cache/router_decisions.jsonl"))
+    router_confidence: float = float(clean_env_value(os.getenv("ROUTER_CONFIDENCE", "0.9")) or 0.9)
+    router_min_samples: int = int(clean_env_value(os.getenv("ROUTER_MIN_SAMPLES", "20")) or 20)
+
+    # Combined plan-and-answer mode: one planner call answers simple queries or suggests search queries
+    plan_and_answer: bool = clean_env_value(os.getenv("PLAN_AND_ANSWER", "false")).lower() in ("1", "true", "yes")
+    plan_max_queries: int = int(clean_env_value(os.getenv("PLAN_MAX_QUERIES", "3")) or 3)
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "router_enabled": cls.router_enabled,
+            "router_log_path": cls.router_log_path,
+            "router_confidence": cls.router_confidence,
+            "router_min_samples": cls.router_min_samples,
+            "plan_and_answer": cls.plan_and_answer,
+            "plan_max_queries": cls.plan_max_queries
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the router configuration"""
+        if not 0.5 <= cls.router_confidence <= 1.0:
+            raise ValueError("ROUTER_CONFIDENCE must be between 0.5 and 1.0")
+        if cls.router_min_samples < 1:
+            raise ValueError("ROUTER_MIN_SAMPLES must be at least 1")
+        if cls.plan_max_queries < 1:
+            raise ValueError("PLAN_MAX_QUERIES must be at least 1")
@@ -0,0 +1,34 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class TelemetryConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Span tracing settings
+    tracing_enabled: bool = clean_env_value(os.getenv("TRACING_ENABLED", "true")).lower() in ("1", "true", "yes")
+    trace_export_path: str = clean_env_value(os.getenv("TRACE_EXPORT_PATH", ""))
+    trace_max_traces: int = int(clean_env_value(os.getenv("TRACE_MAX_TRACES", "50")) or 50)
+    trace_service_name: str = clean_env_value(os.getenv("TRACE_SERVICE_NAME", "agi-search-assistant"))
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "tracing_enabled": cls.tracing_enabled,
+            "trace_export_path": cls.trace_export_path,
+            "trace_max_traces": cls.trace_max_traces,
+            "trace_service_name": cls.trace_service_name
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the telemetry configuration"""
+        if cls.trace_max_traces < 1:
+            raise ValueError("TRACE_MAX_TRACES must be at least 1")
\ No newline at end of file
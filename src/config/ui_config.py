@@ -0,0 +1,32 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class UIConfig:
+    @staticmethod
+    def clean_env_value(value: str) -> str:
+        """Clean environment variable value by removing comments and whitespace"""
+        if value:
+            return value.split('#')[0].strip()
+        return value or ""
+
+    # Chat rendering settings
+    chat_page_size: int = int(clean_env_value(os.getenv("CHAT_PAGE_SIZE", "20")) or 20)
+    progress_max_visible: int = int(clean_env_value(os.getenv("PROGRESS_MAX_VISIBLE", "30")) or 30)
+
+    @classmethod
+    def get_config(cls):
+        return {
+            "chat_page_size": cls.chat_page_size,
+            "progress_max_visible": cls.progress_max_visible
+        }
+
+    @classmethod
+    def validate_config(cls):
+        """Validate the UI configuration"""
+        if cls.chat_page_size < 1:
+            raise ValueError("CHAT_PAGE_SIZE must be at least 1")
+        if cls.progress_max_visible < 1:
+            raise ValueError("PROGRESS_MAX_VISIBLE must be at least 1")
\ No newline at end of file
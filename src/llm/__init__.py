@@ -1,3 +1,13 @@
-from .crew_llm import create_llm
+import importlib
 
-__all__ = ['create_llm']
\ No newline at end of file
+# crew_llm imports CrewAI, so it loads on first access
+_LAZY = {'create_llm': '.crew_llm', 'get_llm': '.crew_llm', 'invalidate_llm_cache': '.crew_llm'}
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['create_llm', 'get_llm', 'invalidate_llm_cache']
\ No newline at end of file
@@ -1,35 +1,141 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Tuple
 from crewai import LLM
 from src.config.llm_config import LLMConfig
+from src.config.gateway_config import GatewayConfig
+from src.config.ollama_config import OllamaConfig
+from .gateway import GatewayLLM, create_member
+from .instrumentation import instrument_llm_calls
 
-def create_llm():
-    """Create a CrewAI LLM instance based on configuration"""
-    config = LLMConfig.get_config()
-    provider = config["provider"]
-    model_name = config["model_name"]
-    
+logger = logging.getLogger(__name__)
+
+_llm_cache: Dict[Tuple, LLM] = {}
+_llm_cache_lock = threading.Lock()
+_invalidation_listeners: List[Callable[[], None]] = []
+
+def llm_config_key(config: Dict = None) -> Tuple:
+    """Key identifying an LLM client configuration (provider, model and credentials)"""
+    config = config or LLMConfig.get_config()
+    return (
+        clean_provider(config["provider"]),
+        config["model_name"],
+        config.get("ollama_base_url", ""),
+        config.get("groq_api_key", ""),
+        config.get("gemini_api_key", ""),
+        config.get("fallbacks", "")
+    )
+
+def clean_provider(provider: str) -> str:
     # Clean up provider string in case it has comments
     if "#" in provider:
         provider = provider.split("#")[0].strip()
-    
-    if provider == "ollama":
+    return provider
+
+def parse_fallbacks(value: str) -> List[Tuple[str, str]]:
+    """Parse LLM_FALLBACKS ("groq:llama-3.1-8b-instant,ollama:gemma3:4b") into (provider, model) pairs"""
+    fallbacks = []
+    for item in clean_provider(value or "").split(","):
+        if ":" in item:
+            provider, model_name = item.split(":", 1)
+            fallbacks.append((provider.strip(), model_name.strip()))
+    return fallbacks
+
+def create_provider_llm(provider: str, model_name: str, config: Dict, options: Dict) -> LLM:
+    """Create the CrewAI client of one provider and model"""
+    if provider == "ollama" and OllamaConfig.ollama_native:
+        # Native API: keep_alive, num_ctx/num_predict, pooled connections and several servers
+        from .ollama_llm import OllamaLLM
+        return OllamaLLM(
+            model=model_name,
+            base_url=config.get("ollama_base_url") or "http://localhost:11434",
+            **options
+        )
+    elif provider == "ollama":
         return LLM(
             model=f"ollama/{model_name}",
-            base_url="http://localhost:11434"
+            base_url=config.get("ollama_base_url") or "http://localhost:11434",
+            **options
         )
     elif provider == "groq":
         return LLM(
             model=f"groq/{model_name}",
-            api_key=config.get("groq_api_key")
+            api_key=config.get("groq_api_key"),
+            **options
         )
     elif provider == "gemini":
         # Use the gemini_api_key directly instead of vertex_credentials
         return LLM(
             model=f"gemini/{model_name}",
             temperature=0.7,
-            api_key=config.get("gemini_api_key")
+            api_key=config.get("gemini_api_key"),
+            **options
         )
     else:
         raise ValueError(f"Unsupported LLM provider: {provider} # Options: ollama, groq, gemini")
 
+def create_llm(stream: bool = False):
+    """Create a CrewAI LLM instance based on configuration
+
+    Unless LLM_GATEWAY_ENABLED is false, the client is wrapped in a GatewayLLM
+    that applies rate limits, retries and hedging, and fails over to the
+    LLM_FALLBACKS providers in order.
+
+    Args:
+        stream: Request token streaming; chunks are emitted as LLMStreamChunkEvent
+    """
+    instrument_llm_calls()
+    config = LLMConfig.get_config()
+    # Only pass the flag when set so non-streaming clients are built exactly as before
+    options = {"stream": True} if stream else {}
+    provider = clean_provider(config["provider"])
+    if not GatewayConfig.gateway_enabled:
+        return create_provider_llm(provider, config["model_name"], config, options)
+
+    credentials = {
+        "ollama": config.get("ollama_base_url", ""),
+        "groq": config.get("groq_api_key", ""),
+        "gemini": config.get("gemini_api_key", "")
+    }
+    members = []
+    error = None
+    for member_provider, model_name in [(provider, config["model_name"])] + parse_fallbacks(config.get("fallbacks", "")):
+        if any(member.name == f"{member_provider}/{model_name}" for member in members):
+            continue
+        try:
+            llm = create_provider_llm(member_provider, model_name, config, options)
+        except Exception as e:
+            # A provider that cannot be set up here (e.g. a missing SDK) is left out of the failover order
+            logger.warning("Skipping LLM provider %s:%s: %s", member_provider, model_name, e)
+            error = error or e
+            continue
+        members.append(create_member(member_provider, model_name, llm, credentials.get(member_provider, "")))
+    if not members:
+        raise error
+    return GatewayLLM(members)
+
+def get_llm():
+    """Get a shared LLM instance for the current configuration, creating it on first use"""
+    key = llm_config_key()
+    with _llm_cache_lock:
+        llm = _llm_cache.get(key)
+        if llm is None:
+            llm = create_llm()
+            _llm_cache[key] = llm
+        return llm
+
+def register_invalidation_listener(listener: Callable[[], None]):
+    """Register a callback run whenever cached LLM clients are invalidated"""
+    with _llm_cache_lock:
+        _invalidation_listeners.append(listener)
+
+def invalidate_llm_cache():
+    """Drop cached LLM clients and notify listeners, e.g. after the configuration changes"""
+    with _llm_cache_lock:
+        _llm_cache.clear()
+        listeners = list(_invalidation_listeners)
+    for listener in listeners:
+        listener()
+
 # Export the create_llm function as the main interface
-__all__ = ['create_llm']
\ No newline at end of file
+__all__ = ['create_llm', 'get_llm', 'llm_config_key', 'register_invalidation_listener', 'invalidate_llm_cache']
@@ -0,0 +1,364 @@
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from pydantic import PrivateAttr
+from src.config.gateway_config import GatewayConfig
+from src.telemetry import add_to_attribute
+from .response_cache import LLMResponseCache, caching_responses
+
+try:
+    # CrewAI retries rate limits inside each client; the gateway retries and fails over itself
+    from crewai.llms.retry import _active_llm_rate_limit_retry
+except ImportError:
+    _active_llm_rate_limit_retry = None
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_NAMES = ("ratelimit", "timeout", "connection", "serviceunavailable", "internalserver", "overloaded")
+RETRYABLE_MESSAGES = ("rate limit", "too many requests", "overloaded", "temporarily unavailable", "timed out")
+
+class LocalRateLimitError(RuntimeError):
+    """The provider's local request budget has no capacity within the allowed wait"""
+
+class TokenBucket:
+    """Thread-safe token bucket; a process-wide bucket is shared per provider API key"""
+
+    _shared: Dict[str, "TokenBucket"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key: str, per_minute: float) -> "TokenBucket":
+        """Bucket allowing per_minute requests, in bursts of up to half of them"""
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(per_minute / 60, max(1.0, per_minute / 2))
+            return cls._shared[key]
+
+    def acquire(self, timeout: float) -> bool:
+        """Take a token, waiting up to timeout seconds for one; False if that is not enough"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait_time = max(0.0, (1 - self.tokens) / self.rate)
+            if wait_time > timeout:
+                return False
+            # Reserve the token now so later callers queue up behind this one
+            self.tokens -= 1
+        if wait_time:
+            time.sleep(wait_time)
+        return True
+
+class ProviderHealth:
+    """Consecutive failure count of one provider and model, shared process-wide
+
+    After unhealthy_after transient failures in a row the provider is skipped for
+    cooldown seconds; the next call after that is a trial, and one more failure
+    takes it out again.
+    """
+
+    _shared: Dict[str, "ProviderHealth"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, unhealthy_after: int, cooldown: float):
+        self.unhealthy_after = unhealthy_after
+        self.cooldown = cooldown
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key: str) -> "ProviderHealth":
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(GatewayConfig.unhealthy_after, GatewayConfig.cooldown)
+            return cls._shared[key]
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.unhealthy_until = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.unhealthy_after:
+                self.unhealthy_until = time.monotonic() + self.cooldown
+
+@dataclass
+class GatewayMember:
+    name: str
+    llm: BaseLLM
+    health: ProviderHealth
+    bucket: Optional[TokenBucket] = None
+
+class MemberClaims:
+    """Members taken by the calls racing to answer one request, so a hedge never duplicates the primary"""
+
+    def __init__(self):
+        self._names: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, candidates: List[GatewayMember]) -> Optional[GatewayMember]:
+        """Take the first candidate no other call of the request has used"""
+        with self._lock:
+            for member in candidates:
+                if member.name not in self._names:
+                    self._names.add(member.name)
+                    return member
+        return None
+
+def error_chain(error: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+def status_code(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient: a rate limit, a 5xx response, a timeout or a dropped connection"""
+    for e in error_chain(error):
+        code = status_code(e)
+        if code is not None and (code == 429 or code >= 500):
+            return True
+        if isinstance(e, (TimeoutError, ConnectionError)):
+            return True
+        name = type(e).__name__.lower()
+        if any(marker in name for marker in RETRYABLE_NAMES):
+            return True
+        if any(marker in str(e).lower() for marker in RETRYABLE_MESSAGES):
+            return True
+    return False
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Delay requested by the provider through a Retry-After header, if any"""
+    for e in error_chain(error):
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        value = headers.get("retry-after") if headers is not None else None
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+def backoff_delay(attempt: int, requested: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter for a zero-based retry attempt"""
+    if requested is not None:
+        return min(requested, GatewayConfig.retry_max_delay)
+    return random.uniform(0, min(GatewayConfig.retry_max_delay, GatewayConfig.retry_base_delay * 2 ** attempt))
+
+@contextmanager
+def gateway_retries_only() -> Iterator[None]:
+    if _active_llm_rate_limit_retry is None:
+        yield
+        return
+    token = _active_llm_rate_limit_retry.set(True)
+    try:
+        yield
+    finally:
+        _active_llm_rate_limit_retry.reset(token)
+
+_stats: Dict[str, int] = {"calls": 0, "cache_hits": 0, "retries": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0, "rate_limited": 0}
+_stats_lock = threading.Lock()
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+    add_to_attribute(f"llm_{key}", 1)
+
+def get_gateway_stats() -> Dict[str, int]:
+    """Process-wide counters of gateway calls, retries, failovers and hedged requests"""
+    with _stats_lock:
+        return dict(_stats)
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _stats_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+        return _hedge_executor
+
+class GatewayLLM(BaseLLM):
+    """An LLM that spreads calls over an ordered list of provider clients
+
+    Each call goes to the first healthy member, waiting for its rate limit
+    bucket and retrying transient errors with jittered exponential backoff
+    before failing over to the next member. With LLM_HEDGE_AFTER_MS set, a call
+    without tool functions that has not finished in time is duplicated on the
+    next member and the first answer wins. Inside cache_responses(), text
+    completions are served from and stored to the LLM response cache.
+    """
+
+    llm_type: str = "gateway"
+    _members: List[GatewayMember] = PrivateAttr(default_factory=list)
+
+    def __init__(self, members: List[GatewayMember], **kwargs):
+        primary = members[0].llm
+        super().__init__(model=primary.model, provider=primary.provider, stream=primary.stream,
+                         temperature=primary.temperature, **kwargs)
+        self._members = list(members)
+
+    @property
+    def llms(self) -> List[BaseLLM]:
+        """The provider clients, in failover order"""
+        return [member.llm for member in self._members]
+
+    def candidates(self) -> List[GatewayMember]:
+        """Members to try in order: the healthy ones, or all of them if none is healthy"""
+        healthy = [member for member in self._members if member.health.available()]
+        return healthy or list(self._members)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> Any:
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        _count("calls")
+        # Calls executing tool functions have side effects, so they are never cached or hedged
+        cache = LLMResponseCache.shared() if caching_responses() and not available_functions else None
+        if cache is not None:
+            key = LLMResponseCache.key(
+                self.provider, self.model, messages, self.temperature, tools=tools, stop=self.stop_sequences,
+                response_model=f"{response_model.__module__}.{response_model.__qualname__}" if response_model else None
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                _count("cache_hits")
+                return cached
+
+        # Streamed calls would duplicate chunks if hedged
+        if GatewayConfig.hedge_after_ms and not available_functions and not self.stream:
+            result = self._call_hedged(messages, kwargs)
+        else:
+            result = self._call_with_failover(messages, kwargs)
+        if cache is not None and isinstance(result, str):
+            cache.set(key, result)
+        return result
+
+    # The gateway does its own retries, so CrewAI must not wrap it in its rate limit retry
+    call._crewai_rate_limit_wrapped = True
+
+    def _call_with_failover(self, messages, kwargs: Dict[str, Any], claims: Optional[MemberClaims] = None) -> Any:
+        claims = claims or MemberClaims()
+        error: Optional[Exception] = None
+        while (member := claims.claim(self.candidates())) is not None:
+            if error is not None:
+                _count("failovers")
+                logger.info("LLM gateway: %s from previous provider, failing over to %s", type(error).__name__, member.name)
+            try:
+                return self._call_member(member, messages, kwargs)
+            except Exception as e:
+                error = e
+        raise error or RuntimeError("Every LLM provider is already in use by this request")
+
+    def _call_member(self, member: GatewayMember, messages, kwargs: Dict[str, Any]) -> Any:
+        for attempt in range(GatewayConfig.max_retries + 1):
+            if member.bucket is not None and not member.bucket.acquire(GatewayConfig.rate_limit_max_wait):
+                _count("rate_limited")
+                raise LocalRateLimitError(f"{member.name} is over its LLM_RATE_LIMITS budget")
+            try:
+                # Agents set call-scoped stop words on the gateway; pass them on to the client
+                with call_stop_override(member.llm, self.stop_sequences), gateway_retries_only():
+                    result = member.llm.call(messages, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if attempt == GatewayConfig.max_retries:
+                    member.health.record_failure()
+                    raise
+                _count("retries")
+                time.sleep(backoff_delay(attempt, retry_after(e)))
+                continue
+            member.health.record_success()
+            return result
+
+    def _call_hedged(self, messages, kwargs: Dict[str, Any]) -> Any:
+        executor = get_hedge_executor()
+        claims = MemberClaims()
+        primary = executor.submit(contextvars.copy_context().run, self._call_with_failover, messages, kwargs, claims)
+        done, _ = wait([primary], timeout=GatewayConfig.hedge_after_ms / 1000)
+        if done:
+            return primary.result()
+
+        # The hedge goes to a member the primary has not tried; failover then skips it in turn
+        member = claims.claim(self.candidates())
+        if member is None:
+            return primary.result()
+        _count("hedges")
+        hedge = executor.submit(contextvars.copy_context().run, self._call_member, member, messages, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        _count("hedge_wins")
+                    return future.result()
+        return primary.result()
+
+    def supports_function_calling(self) -> bool:
+        primary = self._members[0].llm
+        return bool(getattr(primary, "supports_function_calling", lambda: False)())
+
+    def supports_stop_words(self) -> bool:
+        return self._members[0].llm.supports_stop_words()
+
+    def supports_multimodal(self) -> bool:
+        return self._members[0].llm.supports_multimodal()
+
+    def get_context_window_size(self) -> int:
+        # Prompts must fit whichever member ends up answering
+        return min(member.llm.get_context_window_size() for member in self._members)
+
+    def get_token_usage_summary(self):
+        summary = self._members[0].llm.get_token_usage_summary()
+        for member in self._members[1:]:
+            summary.add_usage_metrics(member.llm.get_token_usage_summary())
+        return summary
+
+def member_key(provider: str, model_name: str, credential: str) -> str:
+    """Health key of a provider client; the credential is only kept as a short hash"""
+    digest = hashlib.sha1(credential.encode("utf-8")).hexdigest()[:8] if credential else "-"
+    return f"{provider}/{model_name}@{digest}"
+
+def create_member(provider: str, model_name: str, llm: BaseLLM, credential: str = "") -> GatewayMember:
+    """Wrap a provider client with its shared health record and rate limit bucket"""
+    per_minute = GatewayConfig.get_rate_limits().get(provider)
+    bucket = TokenBucket.for_key(member_key(provider, "*", credential), per_minute) if per_minute else None
+    name = member_key(provider, model_name, credential)
+    return GatewayMember(name=name.split("@")[0], llm=llm, health=ProviderHealth.for_key(name), bucket=bucket)
+
+__all__ = [
+    'GatewayLLM',
+    'GatewayMember',
+    'TokenBucket',
+    'ProviderHealth',
+    'LocalRateLimitError',
+    'create_member',
+    'is_retryable',
+    'get_gateway_stats'
+]
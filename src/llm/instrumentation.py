@@ -0,0 +1,77 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from crewai.events import crewai_event_bus, LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+
+from src.telemetry import Span, current_span, get_tracer
+
+_spans: Dict[str, Span] = {}
+_spans_lock = threading.Lock()
+_handlers_registered = False
+
+def _timestamp(event) -> Optional[float]:
+    value = getattr(event, "timestamp", None)
+    return value.timestamp() if isinstance(value, datetime) else None
+
+def _call_span(event) -> Optional[Span]:
+    """The span of an LLM call, started by whichever of its events is handled first"""
+    call_id = getattr(event, "call_id", None)
+    parent = current_span()
+    if not call_id or parent is None:
+        return None
+    with _spans_lock:
+        span = _spans.get(call_id)
+        if span is None:
+            span = get_tracer().start_span("llm.call", kind="client", parent=parent, start_time=_timestamp(event))
+            _spans[call_id] = span
+        return span
+
+def _on_call_started(source, event):
+    span = _call_span(event)
+    if span is not None:
+        # Handlers may run out of order; the started event always has the true start time
+        span.start_time = _timestamp(event) or span.start_time
+        span.set_attribute("model", event.model or "")
+        if event.agent_role:
+            span.set_attribute("agent_role", event.agent_role)
+
+def _finish(event, attributes: Dict[str, Any], error: Optional[str] = None):
+    span = _call_span(event)
+    if span is None:
+        return
+    with _spans_lock:
+        _spans.pop(event.call_id, None)
+    for key, value in attributes.items():
+        span.set_attribute(key, value)
+    span.error = error
+    get_tracer().end_span(span, _timestamp(event))
+
+def _on_call_completed(source, event):
+    usage = event.usage or {}
+    _finish(event, {key: usage[key] for key in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens")
+                    if isinstance(usage.get(key), int)})
+
+def _on_call_failed(source, event):
+    _finish(event, {}, error=str(event.error))
+
+def instrument_llm_calls():
+    """Record every LLM call made inside a traced query as an llm.call span
+
+    Calls are observed through CrewAI's event bus, whose handlers run in a copy
+    of the caller's context, so each span nests under the stage that made the
+    call and carries the model, agent role and token usage. Safe to call
+    repeatedly; the handlers are registered once.
+    """
+    global _handlers_registered
+    with _spans_lock:
+        if _handlers_registered:
+            return
+        _handlers_registered = True
+    crewai_event_bus.on(LLMCallStartedEvent)(_on_call_started)
+    crewai_event_bus.on(LLMCallCompletedEvent)(_on_call_completed)
+    crewai_event_bus.on(LLMCallFailedEvent)(_on_call_failed)
+    # Token counts arrive asynchronously, so let pending handlers finish before a trace is exported
+    get_tracer().before_export.append(lambda: crewai_event_bus.flush(timeout=2))
+
+__all__ = ['instrument_llm_calls']
@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.hooks.dispatch import HookAborted
+from crewai.llms.base_llm import BaseLLM, LLMCallBlockedError, llm_call_context
+from pydantic import Field
+from src.config.llm_config import LLMConfig
+from src.config.ollama_config import OllamaConfig
+from .gateway import ProviderHealth
+
+logger = logging.getLogger(__name__)
+
+DENIED_ERRORS: Tuple[type, ...] = (HookAborted, LLMCallBlockedError)
+
+class OllamaEndpoint:
+    """One Ollama server with a pooled HTTP client and its count of requests in flight"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.health = ProviderHealth.for_key(f"ollama@{url}")
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """ollama.Client keeping up to OLLAMA_MAX_CONNECTIONS connections open, created on first use"""
+        with self._lock:
+            if self._client is None:
+                try:
+                    import httpx
+                    import ollama
+                except ImportError as e:
+                    raise ImportError("ollama is not installed. Install it with: pip install ollama") from e
+                connections = OllamaConfig.ollama_max_connections
+                self._client = ollama.Client(
+                    host=self.url, timeout=OllamaConfig.ollama_timeout,
+                    limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+                )
+            return self._client
+
+class OllamaEndpointPool:
+    """Ollama servers serving the same model; each request goes to the least busy healthy one"""
+
+    _shared: Dict[Tuple[str, ...], "OllamaEndpointPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, urls: List[str]):
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, urls: List[str]) -> "OllamaEndpointPool":
+        """Process-wide pool per list of servers, so every LLM instance shares its connections"""
+        key = tuple(urls)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(urls)
+            return cls._shared[key]
+
+    def candidates(self) -> List[OllamaEndpoint]:
+        """Endpoints in the order to try: healthy ones first, each group by requests in flight"""
+        with self._lock:
+            return sorted(self.endpoints, key=lambda e: (not e.health.available(), e.in_flight))
+
+    @contextmanager
+    def use(self, endpoint: OllamaEndpoint) -> Iterator[OllamaEndpoint]:
+        with self._lock:
+            endpoint.in_flight += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                endpoint.in_flight -= 1
+
+    def preload(self, model: str, keep_alive: str) -> Dict[str, float]:
+        """Load the model on every server; returns the seconds each took"""
+        timings = {}
+        for endpoint in self.endpoints:
+            started = time.perf_counter()
+            try:
+                # A generate request without a prompt only loads the model
+                endpoint.client.generate(model=model, keep_alive=keep_alive,
+                                         options={"num_ctx": OllamaConfig.get_num_ctx()})
+                endpoint.health.record_success()
+            except Exception as e:
+                logger.warning("Error preloading %s on %s: %s", model, endpoint.url, e)
+                continue
+            timings[endpoint.url] = time.perf_counter() - started
+        return timings
+
+def message_text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return "" if content is None else str(content)
+
+class OllamaLLM(BaseLLM):
+    """CrewAI client for Ollama's native /api/chat endpoint
+
+    Unlike the OpenAI-compatible endpoint, the native API honours keep_alive
+    and model options, so the model stays loaded between queries and runs with
+    a fixed num_ctx sized for the prompts (see OllamaConfig.get_num_ctx) and a
+    num_predict cap. Requests share pooled connections and are spread over the
+    servers of OLLAMA_BASE_URL and OLLAMA_BASE_URLS, moving on to the next one
+    when a server cannot be reached. Agents use text (ReAct) tool calling.
+    """
+
+    llm_type: str = "ollama"
+    provider: str = "ollama"
+    keep_alive: str = Field(default_factory=lambda: OllamaConfig.ollama_keep_alive)
+    num_ctx: int = Field(default_factory=OllamaConfig.get_num_ctx)
+    num_predict: int = Field(default_factory=lambda: OllamaConfig.ollama_num_predict)
+
+    @property
+    def pool(self) -> OllamaEndpointPool:
+        return OllamaEndpointPool.shared(OllamaConfig.get_endpoints(self.base_url or "http://localhost:11434"))
+
+    def options(self) -> Dict[str, Any]:
+        options = {"num_ctx": self.num_ctx, "num_predict": self.num_predict}
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        if self.stop_sequences:
+            options["stop"] = self.stop_sequences
+        return options
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None) -> Any:
+        with llm_call_context():
+            try:
+                self._emit_call_started_event(messages=messages, tools=tools, callbacks=callbacks,
+                                              available_functions=available_functions,
+                                              from_task=from_task, from_agent=from_agent)
+                formatted = self._format_messages(messages)
+                self._invoke_before_llm_call_hooks(formatted, from_agent)
+                content, usage = self._chat(formatted, response_model, from_task, from_agent)
+                self._track_token_usage_internal(usage)
+
+                if response_model is not None:
+                    try:
+                        result = self._validate_structured_output(content, response_model)
+                        self._emit_call_completed_event(response=result, call_type=LLMCallType.LLM_CALL,
+                                                        from_task=from_task, from_agent=from_agent,
+                                                        messages=formatted, usage=usage)
+                        return result
+                    except ValueError as e:
+                        logger.warning("Structured output validation failed: %s", e)
+
+                content = self._apply_stop_words(content)
+                self._emit_call_completed_event(response=content, call_type=LLMCallType.LLM_CALL,
+                                                from_task=from_task, from_agent=from_agent,
+                                                messages=formatted, usage=usage)
+                return self._invoke_after_llm_call_hooks(formatted, content, from_agent)
+            except DENIED_ERRORS as e:
+                self._emit_call_denied_event(e, from_task, from_agent)
+                raise
+            except Exception as e:
+                self._emit_call_failed_event(error=f"Ollama call failed: {e}", from_task=from_task, from_agent=from_agent)
+                raise
+
+    def _chat(self, messages: List[Dict[str, Any]], response_model, from_task, from_agent) -> Tuple[str, Dict[str, int]]:
+        """Send the chat to the least busy server, failing over when one cannot be reached"""
+        request = {
+            "model": self.model,
+            "messages": [{"role": m["role"], "content": message_text(m.get("content"))} for m in messages],
+            "options": self.options(),
+            "keep_alive": self.keep_alive,
+            "format": response_model.model_json_schema() if response_model is not None else None
+        }
+        error: Optional[Exception] = None
+        for endpoint in self.pool.candidates():
+            try:
+                with self.pool.use(endpoint):
+                    result = self._request(endpoint, request, from_task, from_agent)
+            except ConnectionError as e:
+                endpoint.health.record_failure()
+                error = e
+                continue
+            endpoint.health.record_success()
+            return result
+        raise error
+
+    def _request(self, endpoint: OllamaEndpoint, request: Dict[str, Any], from_task, from_agent) -> Tuple[str, Dict[str, int]]:
+        if not self._effective_stream():
+            response = endpoint.client.chat(**request, stream=False)
+            return response.message.content or "", self.usage(response)
+
+        parts = []
+        final = None
+        for chunk in endpoint.client.chat(**request, stream=True):
+            text = chunk.message.content if chunk.message else ""
+            if text:
+                parts.append(text)
+                self._emit_stream_chunk_event(text, from_task=from_task, from_agent=from_agent,
+                                              call_type=LLMCallType.LLM_CALL)
+            if chunk.done:
+                final = chunk
+        return "".join(parts), self.usage(final)
+
+    @staticmethod
+    def usage(response) -> Dict[str, int]:
+        if response is None:
+            return {}
+        prompt_tokens = response.prompt_eval_count or 0
+        completion_tokens = response.eval_count or 0
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return self.num_ctx
+
+def preload_ollama() -> Dict[str, float]:
+    """Load the configured Ollama model on every server so the first query does not wait for it"""
+    config = LLMConfig.get_config()
+    urls = OllamaConfig.get_endpoints(config.get("ollama_base_url") or "http://localhost:11434")
+    return OllamaEndpointPool.shared(urls).preload(config["model_name"], OllamaConfig.ollama_keep_alive)
+
+__all__ = ['OllamaLLM', 'OllamaEndpoint', 'OllamaEndpointPool', 'preload_ollama']
\ No newline at end of file
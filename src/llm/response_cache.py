@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.config.cache_config import CacheConfig
+
+# Call sites opt in with cache_responses(); everything else always reaches the model
+_caching: ContextVar[bool] = ContextVar("llm_response_caching", default=False)
+
+class ResponseStore(ABC):
+    """Storage of completions keyed by prompt hash, with TTL and LRU eviction"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+class MemoryResponseStore(ResponseStore):
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteResponseStore(ResponseStore):
+    """On-disk store shared by all app processes using the same file"""
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by all threads; access is serialized by self._lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_last_access ON llm_responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute("""
+                DELETE FROM llm_responses WHERE rowid IN (
+                    SELECT rowid FROM llm_responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+class LLMResponseCache:
+    """Exact-match cache of LLM completions for deterministic prompts
+
+    The key hashes everything that shapes a completion: provider, model,
+    messages, temperature and the requested output format (tools, response
+    model, stop words). Only calls made inside cache_responses() use it.
+    """
+
+    _shared: Optional["LLMResponseCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, store: ResponseStore):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls) -> Optional["LLMResponseCache"]:
+        """Process-wide response cache, or None when disabled"""
+        if not CacheConfig.llm_cache_enabled:
+            return None
+        with cls._shared_lock:
+            if cls._shared is None:
+                if CacheConfig.llm_cache_backend == "sqlite":
+                    store = SQLiteResponseStore(CacheConfig.llm_cache_path, CacheConfig.llm_cache_ttl,
+                                                CacheConfig.llm_cache_max_entries)
+                else:
+                    store = MemoryResponseStore(CacheConfig.llm_cache_ttl, CacheConfig.llm_cache_max_entries)
+                cls._shared = cls(store)
+            return cls._shared
+
+    @staticmethod
+    def key(provider: str, model: str, messages: Any, temperature: Optional[float] = None, **output_format) -> str:
+        payload = {"provider": provider, "model": model, "messages": messages,
+                   "temperature": temperature, "format": output_format}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        response = self.store.get(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def set(self, key: str, response: str):
+        self.store.set(key, response)
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.store)}
+
+@contextmanager
+def cache_responses(enabled: bool = True) -> Iterator[None]:
+    """Let LLM calls made in this block be answered from the response cache
+
+    Use it around calls whose prompt fully determines a useful answer, such as
+    routing decisions and tool selection. The setting follows the context into
+    threads started with a copied context. The cache is consulted by GatewayLLM,
+    so with LLM_GATEWAY_ENABLED=false every call reaches the model.
+    """
+    token = _caching.set(enabled)
+    try:
+        yield
+    finally:
+        _caching.reset(token)
+
+def caching_responses() -> bool:
+    """Whether the current call site opted in to the response cache"""
+    return _caching.get()
+
+__all__ = [
+    'ResponseStore',
+    'MemoryResponseStore',
+    'SQLiteResponseStore',
+    'LLMResponseCache',
+    'cache_responses',
+    'caching_responses'
+]
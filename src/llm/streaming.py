@@ -0,0 +1,41 @@
+import threading
+from typing import Callable, Dict
+
+from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+
+_listeners: Dict[int, Callable[[str], None]] = {}
+_listeners_lock = threading.Lock()
+_handler_registered = False
+
+def _on_stream_chunk(source, event):
+    with _listeners_lock:
+        listener = _listeners.get(id(source))
+    # Tool-call argument chunks are not part of the answer text
+    if listener is not None and event.chunk and not getattr(event, "tool_call", None):
+        listener(event.chunk)
+
+def subscribe_stream_chunks(llm, listener: Callable[[str], None]) -> Callable[[], None]:
+    """Forward streamed text chunks emitted by one LLM instance to listener
+
+    A single event bus handler is shared by all subscriptions, so concurrent
+    queries each receive only the chunks of their own LLM instance. For a
+    GatewayLLM the chunks come from whichever provider client answers.
+    Returns a function that removes the subscription.
+    """
+    global _handler_registered
+    sources = getattr(llm, "llms", None) or [llm]
+    with _listeners_lock:
+        if not _handler_registered:
+            crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+            _handler_registered = True
+        for source in sources:
+            _listeners[id(source)] = listener
+
+    def unsubscribe():
+        with _listeners_lock:
+            for source in sources:
+                if _listeners.get(id(source)) is listener:
+                    del _listeners[id(source)]
+    return unsubscribe
+
+__all__ = ['subscribe_stream_chunks']
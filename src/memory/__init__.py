@@ -0,0 +1,28 @@
+from .embeddings import Embedder, create_embedder
+from .embedding_service import EmbeddingCache, EmbeddingService
+from .vector_stores import MemoryHit, VectorStore, FaissStore, ChromaStore, QdrantStore, create_vector_store
+from .simple_memory import VectorMemory, SimpleMemory
+from .conversation_store import StoredMessage, SessionSpillStore, ConversationStore, ConversationWindow
+from .knowledge_store import Finding, KnowledgeHit, KnowledgeStore
+
+__all__ = [
+    'Embedder',
+    'create_embedder',
+    'EmbeddingCache',
+    'EmbeddingService',
+    'MemoryHit',
+    'VectorStore',
+    'FaissStore',
+    'ChromaStore',
+    'QdrantStore',
+    'create_vector_store',
+    'VectorMemory',
+    'SimpleMemory',
+    'StoredMessage',
+    'SessionSpillStore',
+    'ConversationStore',
+    'ConversationWindow',
+    'Finding',
+    'KnowledgeHit',
+    'KnowledgeStore'
+]
@@ -0,0 +1,233 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from typing import Dict, Iterator, List, Optional, Union
+
+from src.config.memory_config import MemoryConfig
+
+# Shorter messages are kept as text; zlib only pays off on longer ones
+COMPRESS_MIN_BYTES = 256
+
+class StoredMessage:
+    """One chat message; content is text, or zlib-compressed UTF-8 once the message is old"""
+    __slots__ = ("role", "data")
+
+    def __init__(self, role: str, data: Union[str, bytes]):
+        self.role = sys.intern(role)  # Every message shares one string per role
+        self.data = data
+
+    @property
+    def content(self) -> str:
+        return zlib.decompress(self.data).decode("utf-8") if isinstance(self.data, bytes) else self.data
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.data)
+
+    def compress(self) -> int:
+        """Compress the content if worthwhile; returns the bytes saved"""
+        if isinstance(self.data, bytes) or len(self.data) < COMPRESS_MIN_BYTES:
+            return 0
+        before = self.nbytes
+        self.data = zlib.compress(self.data.encode("utf-8"))
+        return before - self.nbytes
+
+class SessionSpillStore:
+    """SQLite file holding the oldest messages of sessions that outgrew their memory budget"""
+
+    _shared: Optional["SessionSpillStore"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, ttl: int):
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by all sessions; access is serialized by self._lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )
+        """)
+        # Sessions of earlier server processes are gone; drop their messages once they expire
+        self._conn.execute("DELETE FROM session_messages WHERE created_at < ?", (time.time() - ttl,))
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls) -> "SessionSpillStore":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(MemoryConfig.session_spill_path, MemoryConfig.session_spill_ttl)
+            return cls._shared
+
+    def write(self, session_id: str, start_seq: int, messages: List[StoredMessage]):
+        now = time.time()
+        rows = [(session_id, start_seq + i, m.role,
+                 m.data if isinstance(m.data, bytes) else zlib.compress(m.data.encode("utf-8")), now)
+                for i, m in enumerate(messages)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO session_messages (session_id, seq, role, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def read(self, session_id: str, start: int, end: int) -> List[StoredMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, data FROM session_messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, end)
+            ).fetchall()
+        return [StoredMessage(role, bytes(data)) for role, data in rows]
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+class ConversationStore:
+    """Message log of one chat session with a bounded memory footprint
+
+    The latest hot_messages messages are kept as plain text, older ones are
+    zlib-compressed, and once the session holds more than max_messages messages
+    or memory_budget_kb of content the oldest are moved to a shared SQLite file.
+    Iterating yields {"role", "content"} dicts in order, reading spilled
+    messages back from disk. Queries use window() instead, which holds only
+    the hot messages and the running summary of the ones before them.
+    """
+
+    def __init__(self, session_id: Optional[str] = None, hot_messages: Optional[int] = None,
+                 max_messages: Optional[int] = None, memory_budget_kb: Optional[int] = None,
+                 spill: Optional[SessionSpillStore] = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.hot_messages = hot_messages or MemoryConfig.session_hot_messages
+        self.max_messages = max(max_messages or MemoryConfig.session_max_messages, self.hot_messages)
+        self.memory_budget = (memory_budget_kb or MemoryConfig.session_memory_budget_kb) * 1024
+        self._spill = spill
+        self._messages: List[StoredMessage] = []
+        self._spilled = 0  # Messages [0, _spilled) are on disk
+        self._nbytes = 0
+        self._summary = ""
+        self._summarized = 0  # Messages [0, _summarized) are covered by _summary
+        self._lock = threading.Lock()
+
+    @property
+    def spill(self) -> SessionSpillStore:
+        if self._spill is None:
+            self._spill = SessionSpillStore.shared()
+        return self._spill
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by message contents"""
+        return self._nbytes
+
+    def append(self, role: str, content: str):
+        with self._lock:
+            message = StoredMessage(role, str(content))
+            self._messages.append(message)
+            self._nbytes += message.nbytes
+            # The message leaving the hot window is compressed
+            if len(self._messages) > self.hot_messages:
+                self._nbytes -= self._messages[-self.hot_messages - 1].compress()
+            self._evict()
+
+    def _evict(self):
+        """Move the oldest messages to disk while over the message cap or memory budget"""
+        count, nbytes = 0, self._nbytes
+        while len(self._messages) - count > self.hot_messages and (
+                len(self._messages) - count > self.max_messages or nbytes > self.memory_budget):
+            nbytes -= self._messages[count].nbytes
+            count += 1
+        if not count:
+            return
+        if self._spilled == 0:
+            # Spilled messages are removed when the session is garbage collected
+            weakref.finalize(self, self.spill.delete, self.session_id)
+        self.spill.write(self.session_id, self._spilled, self._messages[:count])
+        del self._messages[:count]
+        self._spilled += count
+        self._nbytes = nbytes
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self.slice(0, len(self)))
+
+    def slice(self, start: int, end: Optional[int] = None) -> List[Dict[str, str]]:
+        """Messages [start, end) as dicts"""
+        with self._lock:
+            total = self._spilled + len(self._messages)
+            end = total if end is None else min(end, total)
+            start = max(start, 0)
+            stored: List[StoredMessage] = []
+            if start < self._spilled:
+                stored += self.spill.read(self.session_id, start, min(end, self._spilled))
+            stored += self._messages[max(start - self._spilled, 0):max(end - self._spilled, 0)]
+        return [{"role": m.role, "content": m.content} for m in stored]
+
+    def recent(self, count: int) -> List[Dict[str, str]]:
+        """The last count messages"""
+        return self.slice(len(self) - count)
+
+    def window(self) -> "ConversationWindow":
+        """The hot messages not yet covered by the running summary, with that summary"""
+        with self._lock:
+            total = self._spilled + len(self._messages)
+            start = max(self._summarized, total - self.hot_messages)
+            summary = self._summary
+        return ConversationWindow(self, start, summary)
+
+    def set_summary(self, summary: str, end: int):
+        """Record summary as covering messages [0, end); ignored if it is older than the current one"""
+        with self._lock:
+            if self._summarized < end <= self._spilled + len(self._messages):
+                self._summary = summary
+                self._summarized = end
+
+    def clear(self):
+        with self._lock:
+            if self._spilled:
+                self.spill.delete(self.session_id)
+            self._messages = []
+            self._spilled = 0
+            self._nbytes = 0
+            self._summary = ""
+            self._summarized = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"messages": len(self), "in_memory": len(self._messages), "spilled": self._spilled,
+                "summarized": self._summarized, "bytes": self._nbytes}
+
+class ConversationWindow(list):
+    """Bounded tail of a ConversationStore, starting at message start of the store
+
+    A plain list of message dicts, so it can be passed wherever chat history is
+    expected; summary covers the messages before it. The context builder calls
+    fold() as turns leave the window, so older messages are never read again.
+    """
+
+    def __init__(self, store: ConversationStore, start: int, summary: str = ""):
+        super().__init__(store.slice(start))
+        self.store = store
+        self.start = start
+        self.summary = summary
+
+    def fold(self, summary: str, count: int):
+        """Record that summary now also covers the first count messages of the window"""
+        self.store.set_summary(summary, self.start + count)
+
+__all__ = ['StoredMessage', 'SessionSpillStore', 'ConversationStore', 'ConversationWindow']
\ No newline at end of file
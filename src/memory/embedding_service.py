@@ -0,0 +1,312 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from src.config.memory_config import MemoryConfig
+from src.telemetry import add_to_attribute
+from .embeddings import Embedder, create_embedder
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are then only serialized within one process
+    fcntl = None
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Embedding vectors keyed by content hash, in memory and on disk
+
+    On disk, vectors are appended as raw float32 rows to vectors.f32 (read back
+    through np.memmap) and their hashes to keys.txt, one per line, so adding a
+    vector never rewrites existing data. The directory may be shared by several
+    processes: appends are serialized by an OS lock on the lock file, a row's
+    number is its line in keys.txt, and keys other processes appended are read
+    before lookups.
+    """
+
+    def __init__(self, cache_dir: str = "", max_memory_items: int = 10000):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.dimension: Optional[int] = None
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._count = 0  # Complete lines read from keys.txt, which is also the number of rows
+        self._keys_offset = 0  # Byte offset in keys.txt after the last complete line read
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        if cache_dir and os.path.exists(self._meta_path):
+            with self._file_lock():
+                self._load_index()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.cache_dir, "vectors.f32")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.cache_dir, "keys.txt")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.cache_dir, "meta.json")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache directory across processes"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, "lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_index(self):
+        """Read the whole index, cutting back a batch a crashed writer left half-written
+
+        Must be called with the file lock held.
+        """
+        self._rows, self._count, self._keys_offset, self._mmap = {}, 0, 0, None
+        self._sync()
+        if self.dimension is None:
+            return
+        row_bytes = 4 * self.dimension
+        stored_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        if stored_rows < self._count:
+            # Keys without a vector: keep only the complete pairs
+            keys_size = 0
+            with open(self._keys_path, "rb") as f:
+                for _ in range(stored_rows):
+                    keys_size += len(f.readline())
+            self._rows = {key: row for key, row in self._rows.items() if row < stored_rows}
+            self._count, self._keys_offset = stored_rows, keys_size
+        # Rows appended later must line up with their keys
+        self._truncate(self._keys_offset, self._count * row_bytes)
+
+    def _sync(self):
+        """Read keys appended since the last call, by this or another process"""
+        if self.dimension is None:
+            if not os.path.exists(self._meta_path):
+                return
+            with open(self._meta_path, encoding="utf-8") as f:
+                self.dimension = json.load(f)["dimension"]
+        if not os.path.exists(self._keys_path) or os.path.getsize(self._keys_path) <= self._keys_offset:
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Still being written
+                self._rows.setdefault(line.decode("utf-8").strip(), self._count)
+                self._count += 1
+                self._keys_offset += len(line)
+
+    def _truncate(self, keys_size: int, vectors_size: int):
+        for path, size in ((self._keys_path, keys_size), (self._vectors_path, vectors_size)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+
+    def _read_row(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                   shape=(self._count, self.dimension))
+        return np.array(self._mmap[row])
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            if self.cache_dir and any(h not in self._memory and h not in self._rows for h in hashes):
+                # Vectors are written before their keys, so every complete key line has its row
+                self._sync()
+            for h in hashes:
+                vector = self._memory.get(h)
+                if vector is None and h in self._rows:
+                    vector = self._read_row(self._rows[h])
+                    self._remember(h, vector)
+                if vector is not None:
+                    self._memory.move_to_end(h)
+                    found[h] = vector
+        return found
+
+    def put_many(self, hashes: List[str], vectors: np.ndarray):
+        with self._lock:
+            for h, vector in zip(hashes, vectors):
+                self._remember(h, vector)
+            if not self.cache_dir or all(h in self._rows for h in hashes):
+                return
+            with self._file_lock():
+                self._sync()
+                if self.dimension is None:
+                    self.dimension = int(vectors.shape[1])
+                    with open(self._meta_path, "w", encoding="utf-8") as f:
+                        json.dump({"dimension": self.dimension}, f)
+                row_bytes = 4 * self.dimension
+                sizes = (self._keys_offset, self._count * row_bytes)
+                if any(os.path.exists(path) and os.path.getsize(path) != size
+                       for path, size in zip((self._keys_path, self._vectors_path), sizes)):
+                    # Another process died mid-append
+                    self._load_index()
+                    sizes = (self._keys_offset, self._count * row_bytes)
+                new = {h: v for h, v in zip(hashes, vectors) if h not in self._rows}
+                if not new:
+                    return
+                try:
+                    with open(self._vectors_path, "ab") as f:
+                        f.write(np.asarray(list(new.values()), dtype=np.float32).tobytes())
+                    with open(self._keys_path, "ab") as f:
+                        f.write("".join(h + "\n" for h in new).encode("utf-8"))
+                except OSError:
+                    # Undo the partial batch so both files keep one row per key
+                    self._truncate(*sizes)
+                    raise
+                self._sync()
+
+    def stored_count(self) -> int:
+        """Number of vectors persisted on disk"""
+        return self._count
+
+    def _remember(self, h: str, vector: np.ndarray):
+        self._memory[h] = vector
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+class EmbeddingService(Embedder):
+    """Shared front end to one embedding model
+
+    Texts already seen are served from the cache. Missing texts from concurrent
+    callers are collected by a background worker into batches of up to
+    batch_size (waiting at most batch_wait_ms for a batch to fill), and the
+    model itself is only created on the first cache miss.
+    """
+
+    _shared: Dict[Tuple[str, str], "EmbeddingService"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, embedder_factory: Callable[[], Embedder], cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 64, batch_wait_ms: int = 10, model_name: str = ""):
+        self.embedder_factory = embedder_factory
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.model_name = model_name
+        self.dimension = self.cache.dimension
+        self._embedder: Optional[Embedder] = None
+        self._embedder_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "EmbeddingService":
+        """Process-wide service for the configured embedding model"""
+        key = (MemoryConfig.embedding_model, MemoryConfig.embedding_model_name)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cache_dir = ""
+                if MemoryConfig.embedding_cache_dir:
+                    cache_dir = os.path.join(MemoryConfig.embedding_cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", "-".join(key)))
+                cls._shared[key] = cls(
+                    create_embedder,
+                    cache=EmbeddingCache(cache_dir),
+                    batch_size=MemoryConfig.embedding_batch_size,
+                    batch_wait_ms=MemoryConfig.embedding_batch_wait_ms,
+                    model_name=MemoryConfig.embedding_model_name
+                )
+            return cls._shared[key]
+
+    @property
+    def embedder(self) -> Embedder:
+        """The underlying model, loaded on first use"""
+        with self._embedder_lock:
+            if self._embedder is None:
+                self._embedder = self.embedder_factory()
+                self.dimension = self._embedder.dimension or self.dimension
+            return self._embedder
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        hashes = [content_hash(text) for text in texts]
+        found = self.cache.get_many(hashes)
+
+        futures: Dict[str, Future] = {}
+        for h, text in zip(hashes, texts):
+            if h not in found and h not in futures:
+                futures[h] = self._submit(h, text)
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(futures)
+        add_to_attribute("embedding_cache_hits", len(found))
+        add_to_attribute("embedding_cache_misses", len(futures))
+        for h, future in futures.items():
+            found[h] = future.result()
+
+        vectors = np.stack([found[h] for h in hashes]).astype(np.float32)
+        self.dimension = vectors.shape[1]
+        return vectors
+
+    def _embed_batch(self, texts: List[str]):
+        return self.embed(texts)
+
+    def _submit(self, h: str, text: str) -> Future:
+        with self._in_flight_lock:
+            # Identical texts requested concurrently share one computation
+            future = self._in_flight.get(h)
+            if future is not None:
+                return future
+            future = Future()
+            self._in_flight[h] = future
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+        self._queue.put((h, text, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.batch_wait))
+            except queue.Empty:
+                pass
+            self._embed_batch_and_resolve(batch)
+
+    def _embed_batch_and_resolve(self, batch: List[Tuple[str, str, Future]]):
+        hashes = [h for h, _, _ in batch]
+        try:
+            vectors = self.embedder.embed([text for _, text, _ in batch])
+            self.cache.put_many(hashes, vectors)
+            results = list(vectors)
+        except Exception as e:
+            results = [e] * len(batch)
+        with self._in_flight_lock:
+            for h in hashes:
+                self._in_flight.pop(h, None)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, "cached_on_disk": self.cache.stored_count()}
+
+__all__ = ['EmbeddingCache', 'EmbeddingService', 'content_hash']
@@ -0,0 +1,94 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import numpy as np
+from src.config.memory_config import MemoryConfig
+
+class Embedder(ABC):
+    """Turns batches of texts into L2-normalized float32 vectors"""
+
+    model_name: str = ""
+    dimension: Optional[int] = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into an array of shape (len(texts), dimension)"""
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        vectors = np.asarray(self._embed_batch(list(texts)), dtype=np.float32)
+        self.dimension = vectors.shape[1]
+        return normalize(vectors)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    @abstractmethod
+    def _embed_batch(self, texts: List[str]):
+        ...
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so inner product equals cosine similarity"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class SentenceTransformerEmbedder(Embedder):
+    def __init__(self, model_name: str, batch_size: int = 32):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("sentence-transformers is not installed. Install it with: pip install -r requirements-faiss.txt") from e
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def _embed_batch(self, texts: List[str]):
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+class OpenAIEmbedder(Embedder):
+    def __init__(self, model_name: str, api_key: str, batch_size: int = 256):
+        try:
+            from openai import OpenAI
+        except ImportError as e:
+            raise ImportError("openai is not installed. Install it with: pip install openai") from e
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.client = OpenAI(api_key=api_key)
+
+    def _embed_batch(self, texts: List[str]):
+        vectors = []
+        for i in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(model=self.model_name, input=texts[i:i + self.batch_size])
+            vectors.extend(item.embedding for item in response.data)
+        return vectors
+
+class HuggingFaceEmbedder(Embedder):
+    def __init__(self, model_name: str, api_key: str):
+        try:
+            from huggingface_hub import InferenceClient
+        except ImportError as e:
+            raise ImportError("huggingface_hub is not installed. Install it with: pip install huggingface_hub") from e
+        self.model_name = model_name
+        self.client = InferenceClient(model=model_name, token=api_key)
+
+    def _embed_batch(self, texts: List[str]):
+        vectors = np.asarray(self.client.feature_extraction(texts), dtype=np.float32)
+        # Models without pooling return one vector per token; mean-pool them
+        return vectors.mean(axis=1) if vectors.ndim == 3 else vectors
+
+def create_embedder() -> Embedder:
+    """Create the embedder selected by MemoryConfig"""
+    model = MemoryConfig.embedding_model
+    model_name = MemoryConfig.embedding_model_name
+    if model == "sentence-transformers":
+        return SentenceTransformerEmbedder(model_name)
+    elif model == "openai":
+        # all-MiniLM-L6-v2 is a sentence-transformers model; use OpenAI's small model instead
+        openai_model = model_name if model_name.startswith("text-embedding") else "text-embedding-3-small"
+        return OpenAIEmbedder(openai_model, MemoryConfig.openai_api_key)
+    elif model == "huggingface":
+        hf_model = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        return HuggingFaceEmbedder(hf_model, MemoryConfig.hf_api_key)
+    else:
+        raise ValueError(f"Unsupported embedding model: {model} # Options: sentence-transformers, openai, huggingface")
+
+__all__ = ['Embedder', 'SentenceTransformerEmbedder', 'OpenAIEmbedder', 'HuggingFaceEmbedder', 'create_embedder', 'normalize']
@@ -0,0 +1,261 @@
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from pydantic import BaseModel
+from src.config.memory_config import MemoryConfig
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can did do does for from how i in is it me of on or tell the to was what "
+    "when where which who whom why will with about you your please explain describe".split()
+)
+ENTITY = re.compile(r"\b[A-Z][\w'-]*(?:\s+(?:of|de|the|von|van)?\s*[A-Z][\w'-]*)*")
+
+SUFFIXES = ("ing", "ers", "er", "ed", "es", "s")
+
+def stem(term: str) -> str:
+    """Strip a common suffix so "designed" and "designer" match"""
+    for suffix in SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+def terms(text: str) -> List[str]:
+    return [stem(t) for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+def extract_entities(text: str) -> List[str]:
+    """Capitalized names in a text, lowercased and without leading stopwords ("The", "Who", ...)"""
+    entities = []
+    for match in ENTITY.findall(text):
+        words = match.lower().split()
+        while words and words[0] in STOPWORDS:
+            words.pop(0)
+        name = " ".join(words)
+        if name and name not in entities:
+            entities.append(name)
+    return entities
+
+def mentions(entities: List[str], entity: str) -> bool:
+    """Whether an entity is among, or a whole-word part of, a list of entities"""
+    return any(f" {entity} " in f" {other} " for other in entities)
+
+class Finding(BaseModel):
+    id: int
+    topic: str  # The query the finding was researched for
+    text: str
+    entities: List[str] = []
+    created_at: float
+    last_used: float
+
+class KnowledgeHit(BaseModel):
+    finding: Finding
+    score: float  # 0-1 coverage of the query
+    fresh: bool
+
+class KnowledgeStore:
+    """Research findings shared by all sessions, looked up by topic and entities
+
+    Findings are indexed by their terms and entities (and, optionally, by
+    embedding). A lookup scores how much of the query a finding covers; a
+    finding missing any of the query's entities never matches. Findings younger
+    than fresh_for seconds can stand in for a new search; all expire after ttl
+    and the least recently used are evicted beyond max_entries. With a path
+    they are also kept in SQLite and reloaded on start.
+    """
+
+    _shared: Optional["KnowledgeStore"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = "", fresh_for: int = 21600, ttl: int = 604800, max_entries: int = 5000,
+                 embedder=None):
+        self.fresh_for = fresh_for
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self._findings: "OrderedDict[int, Finding]" = OrderedDict()  # least recently used first
+        self._terms: Dict[int, Set[str]] = {}
+        self._index: Dict[str, Set[int]] = {}  # term or entity -> finding ids
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    @classmethod
+    def shared(cls) -> Optional["KnowledgeStore"]:
+        """Process-wide knowledge store, or None when disabled"""
+        if not MemoryConfig.knowledge_store_enabled:
+            return None
+        with cls._shared_lock:
+            if cls._shared is None:
+                embedder = None
+                if MemoryConfig.knowledge_use_embeddings:
+                    from .embedding_service import EmbeddingService
+                    embedder = EmbeddingService.shared()
+                cls._shared = cls(
+                    MemoryConfig.knowledge_store_path,
+                    fresh_for=MemoryConfig.knowledge_fresh_seconds,
+                    ttl=MemoryConfig.knowledge_ttl,
+                    max_entries=MemoryConfig.knowledge_max_entries,
+                    embedder=embedder
+                )
+            return cls._shared
+
+    def _open(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by all threads; access is serialized by self._lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS findings (
+                id INTEGER PRIMARY KEY,
+                topic TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("DELETE FROM findings WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT id, topic, text, created_at, last_used FROM findings ORDER BY last_used"
+        ).fetchall()
+        for finding_id, topic, text, created_at, last_used in rows:
+            self._index_finding(Finding(id=finding_id, topic=topic, text=text,
+                                        entities=extract_entities(f"{topic}. {text}"),
+                                        created_at=created_at, last_used=last_used))
+            self._next_id = max(self._next_id, finding_id + 1)
+
+    def _index_finding(self, finding: Finding):
+        finding_terms = set(terms(f"{finding.topic} {finding.text}"))
+        self._findings[finding.id] = finding
+        self._terms[finding.id] = finding_terms
+        for key in finding_terms | {f"entity:{e}" for e in finding.entities}:
+            self._index.setdefault(key, set()).add(finding.id)
+
+    def _remove(self, finding_id: int):
+        finding = self._findings.pop(finding_id)
+        for key in self._terms.pop(finding_id) | {f"entity:{e}" for e in finding.entities}:
+            ids = self._index.get(key)
+            if ids is not None:
+                ids.discard(finding_id)
+                if not ids:
+                    del self._index[key]
+        self._vectors.pop(finding_id, None)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embedder is None:
+            return None
+        try:
+            return self.embedder.embed_one(text)
+        except Exception as e:
+            logger.warning("Error embedding knowledge, using keyword matching only: %s", e)
+            self.embedder = None
+            return None
+
+    def add(self, topic: str, text: str) -> Optional[Finding]:
+        """Record a research finding for a topic (typically the query it answers)"""
+        text = text.strip()
+        if not topic.strip() or not text:
+            return None
+        vector = self._embed(f"{topic}\n{text}")
+        now = time.time()
+        with self._lock:
+            finding = Finding(id=self._next_id, topic=topic, text=text,
+                              entities=extract_entities(f"{topic}. {text}"), created_at=now, last_used=now)
+            self._next_id += 1
+            self._index_finding(finding)
+            if vector is not None:
+                self._vectors[finding.id] = vector
+            evicted = []
+            while len(self._findings) > self.max_entries:
+                evicted.append(next(iter(self._findings)))
+                self._remove(evicted[-1])
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT INTO findings (id, topic, text, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (finding.id, topic, text, now, now)
+                )
+                if evicted:
+                    self._conn.executemany("DELETE FROM findings WHERE id = ?", [(i,) for i in evicted])
+                self._conn.commit()
+        return finding
+
+    def lookup(self, query: str, k: int = 3, min_score: Optional[float] = None) -> List[KnowledgeHit]:
+        """Findings covering the query, best first"""
+        min_score = min_score if min_score is not None else MemoryConfig.knowledge_min_score
+        query_terms = set(terms(query))
+        query_entities = extract_entities(query)
+        vector = self._embed(query) if self._vectors else None
+        now = time.time()
+        with self._lock:
+            for finding_id in [i for i, f in self._findings.items() if now - f.created_at > self.ttl]:
+                self._remove(finding_id)
+            candidates: Set[int] = set()
+            for key in query_terms | {f"entity:{e}" for e in query_entities}:
+                candidates |= self._index.get(key, set())
+            # Rare terms say more about the topic than common ones
+            weights = {t: math.log(1 + len(self._findings) / (1 + len(self._index.get(t, ())))) for t in query_terms}
+            total = sum(weights.values()) or 1.0
+
+            scored = []
+            for finding_id in candidates:
+                finding = self._findings[finding_id]
+                if not all(mentions(finding.entities, e) for e in query_entities):
+                    continue
+                score = sum(w for t, w in weights.items() if t in self._terms[finding_id]) / total
+                if vector is not None and finding_id in self._vectors:
+                    score = max(score, float(self._vectors[finding_id] @ vector))
+                if score >= min_score:
+                    scored.append((score, finding))
+            scored.sort(key=lambda item: (-item[0], -item[1].created_at))
+
+            hits = []
+            for score, finding in scored[:k]:
+                finding.last_used = now
+                self._findings.move_to_end(finding.id)
+                hits.append(KnowledgeHit(finding=finding, score=score, fresh=now - finding.created_at <= self.fresh_for))
+            if hits:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if hits and self._conn is not None:
+                self._conn.executemany("UPDATE findings SET last_used = ? WHERE id = ?",
+                                       [(now, hit.finding.id) for hit in hits])
+                self._conn.commit()
+        return hits
+
+    @staticmethod
+    def format_hits(hits: List[KnowledgeHit]) -> str:
+        return "\n\n".join(
+            f"- (researched for \"{hit.finding.topic}\", {(time.time() - hit.finding.created_at) / 60:.0f} min ago) {hit.finding.text}"
+            for hit in hits
+        )
+
+    def clear(self):
+        with self._lock:
+            self._findings.clear()
+            self._terms.clear()
+            self._index.clear()
+            self._vectors.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM findings")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"findings": len(self._findings), "hits": self.hits, "misses": self.misses}
+
+__all__ = ['Finding', 'KnowledgeHit', 'KnowledgeStore', 'extract_entities']
\ No newline at end of file
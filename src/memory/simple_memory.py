@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.config.memory_config import MemoryConfig
+from .embeddings import Embedder
+from .embedding_service import EmbeddingService
+from .vector_stores import MemoryHit, VectorStore, create_vector_store
+
+class VectorMemory:
+    """Embeds texts in batches and retrieves the top-k most similar ones"""
+
+    _shared: Dict[tuple, "VectorMemory"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, embedder: Embedder, store: Optional[VectorStore] = None, vector_store: Optional[str] = None):
+        self.embedder = embedder
+        self.vector_store = vector_store
+        self.store = store
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "VectorMemory":
+        """Process-wide memory for the configured backend, so the embedding model loads once"""
+        key = (MemoryConfig.vector_store, MemoryConfig.embedding_model, MemoryConfig.embedding_model_name)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(EmbeddingService.shared())
+            return cls._shared[key]
+
+    def _get_store(self, dimension: int) -> VectorStore:
+        with self._lock:
+            if self.store is None:
+                self.store = create_vector_store(dimension, self.vector_store)
+            return self.store
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        if not texts:
+            return []
+        vectors = self.embedder.embed(texts)
+        store = self._get_store(vectors.shape[1])
+        return store.add(vectors, texts, metadatas or [{} for _ in texts])
+
+    def search(self, query: str, k: Optional[int] = None) -> List[MemoryHit]:
+        vector = self.embedder.embed_one(query)
+        return self._get_store(vector.shape[0]).search(vector, k or MemoryConfig.memory_top_k)
+
+class SimpleMemory:
+    """Memory of tool results used by the agents
+
+    Results of the current query are always replayed. With a vector store
+    configured, findings from earlier queries are stored there and the top-k
+    most relevant ones are retrieved instead of replaying the whole transcript.
+    """
+
+    def __init__(self, vector_memory: Optional[VectorMemory] = None, top_k: Optional[int] = None):
+        if vector_memory is None and MemoryConfig.vector_store:
+            vector_memory = VectorMemory.shared()
+        self.vector_memory = vector_memory
+        self.top_k = top_k or MemoryConfig.memory_top_k
+        self.current_query: Optional[str] = None
+        self.current_results: List[Any] = []
+        self._stored_keys = set()
+
+    @staticmethod
+    def _result_key(res, user_q: str) -> str:
+        payload = json.dumps([user_q, res.tool_name, res.tool_input, res.tool_output], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def add_memory(self, lst_res: List, user_q: str):
+        """Record tool results for a query, embedding any new ones in one batch"""
+        if user_q != self.current_query:
+            self.current_query = user_q
+            self.current_results = []
+
+        new_results = []
+        for res in lst_res:
+            if res.tool_output is None:
+                continue
+            key = self._result_key(res, user_q)
+            if key in self._stored_keys:
+                continue
+            self._stored_keys.add(key)
+            self.current_results.append(res)
+            new_results.append(res)
+
+        if self.vector_memory is not None and new_results:
+            self.vector_memory.add_texts(
+                [res.tool_output for res in new_results],
+                [{"query": user_q, "tool_name": res.tool_name, "tool_input": json.dumps(res.tool_input)} for res in new_results]
+            )
+
+    def get_past_findings(self, user_q: str, exclude: Optional[set] = None) -> List[MemoryHit]:
+        """Top-k stored findings most similar to the query (empty without a vector store)"""
+        if self.vector_memory is None:
+            return []
+        exclude = exclude or set()
+        return [hit for hit in self.vector_memory.search(user_q, self.top_k) if hit.text not in exclude]
+
+    @staticmethod
+    def format_findings(hits: List[MemoryHit]) -> str:
+        return "\n\n".join(f"- (for \"{hit.metadata.get('query', '')}\") {hit.text}" for hit in hits)
+
+    def get_relevant_context(self, user_q: str) -> List[Dict[str, str]]:
+        """Messages replaying this query's tool results plus relevant past findings"""
+        memory = []
+        current = self.current_results if user_q == self.current_query else []
+        for res in current:
+            memory.extend([
+                {"role": "assistant", "content": json.dumps({"name": res.tool_name, "parameters": res.tool_input})},
+                {"role": "user", "content": res.tool_output}
+            ])
+
+        past = self.get_past_findings(user_q, exclude={res.tool_output for res in current})
+        if past:
+            memory.append({"role": "user", "content": "Relevant findings from earlier research:\n" + self.format_findings(past)})
+
+        if memory:
+            memory.append({"role": "user", "content": f"""
+                This is just a reminder that my original query was `{user_q}`.
+                Only answer to the original query, and nothing else, but use the information I gave you.
+                Provide as much information as possible when you use the `final_answer` tool.
+                """})
+        return memory
+
+__all__ = ['VectorMemory', 'SimpleMemory']
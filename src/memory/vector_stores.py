@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+from src.config.memory_config import MemoryConfig
+
+class MemoryHit(BaseModel):
+    text: str
+    metadata: Dict[str, Any] = {}
+    score: float
+
+class VectorStore(ABC):
+    """Interface shared by the FAISS, Chroma and Qdrant backends
+
+    Vectors are expected to be L2-normalized, so scores are cosine similarities.
+    """
+
+    @abstractmethod
+    def add(self, vectors: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]]) -> List[str]:
+        ...
+
+    @abstractmethod
+    def search(self, vector: np.ndarray, k: int) -> List[MemoryHit]:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+class FaissStore(VectorStore):
+    """In-process FAISS index with flat, IVF or HNSW search
+
+    IVF needs training data, so vectors are served from an exact flat index until
+    enough have been added to train the clustering (roughly 8 points per list).
+    With a persist_dir, each batch is appended to vectors.f32 and records.jsonl.
+    """
+
+    def __init__(self, dimension: int, index_type: str = "flat", nlist: int = 64, hnsw_m: int = 32,
+                 persist_dir: str = ""):
+        try:
+            import faiss
+        except ImportError as e:
+            raise ImportError("faiss is not installed. Install it with: pip install -r requirements-faiss.txt") from e
+        self.faiss = faiss
+        self.dimension = dimension
+        self.index_type = index_type
+        self.nlist = nlist
+        self.hnsw_m = hnsw_m
+        self.persist_dir = persist_dir
+        self._lock = threading.Lock()
+        self._vector_batches: List[np.ndarray] = []  # Joined only when an index is (re)built
+        self.records: List[Dict[str, Any]] = []  # {"id", "text", "metadata"} per vector position
+        self.index = self._new_index(trained=False)
+        if persist_dir:
+            self._load()
+
+    def _new_index(self, trained: bool):
+        faiss = self.faiss
+        if self.index_type == "hnsw":
+            return faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "ivf" and trained:
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(self.vectors())
+            index.nprobe = max(1, self.nlist // 8)
+            return index
+        return faiss.IndexFlatIP(self.dimension)
+
+    def add(self, vectors: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]]) -> List[str]:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = [str(uuid.uuid4()) for _ in texts]
+        with self._lock:
+            records = [{"id": i, "text": t, "metadata": m} for i, t, m in zip(ids, texts, metadatas)]
+            self._vector_batches.append(vectors)
+            self.records.extend(records)
+            if self.index_type == "ivf" and not getattr(self.index, "nlist", 0) and len(self.records) >= self.nlist * 8:
+                # Enough data to train the IVF clustering: rebuild from all stored vectors
+                self.index = self._new_index(trained=True)
+                self.index.add(self.vectors())
+            else:
+                self.index.add(vectors)
+            if self.persist_dir:
+                self._append(vectors, records)
+        return ids
+
+    def vectors(self) -> np.ndarray:
+        """All stored vectors in one array, in record order"""
+        if len(self._vector_batches) != 1:
+            joined = np.vstack(self._vector_batches) if self._vector_batches else np.zeros((0, self.dimension), dtype=np.float32)
+            self._vector_batches = [joined]
+        return self._vector_batches[0]
+
+    def search(self, vector: np.ndarray, k: int) -> List[MemoryHit]:
+        with self._lock:
+            if not self.records:
+                return []
+            query = np.ascontiguousarray(vector.reshape(1, -1), dtype=np.float32)
+            scores, positions = self.index.search(query, min(k, len(self.records)))
+            return [
+                MemoryHit(text=self.records[pos]["text"], metadata=self.records[pos]["metadata"], score=float(score))
+                for score, pos in zip(scores[0], positions[0]) if pos >= 0
+            ]
+
+    def count(self) -> int:
+        return len(self.records)
+
+    def _paths(self):
+        return tuple(os.path.join(self.persist_dir, name) for name in ("vectors.f32", "records.jsonl", "meta.json"))
+
+    def _append(self, vectors: np.ndarray, records: List[Dict[str, Any]]):
+        """Append one batch to the files on disk, so a write costs O(batch) rather than O(store)"""
+        vectors_path, records_path, meta_path = self._paths()
+        if not os.path.exists(meta_path):
+            os.makedirs(self.persist_dir, exist_ok=True)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dimension": self.dimension}, f)
+        with open(records_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+        with open(vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+
+    def _load(self):
+        vectors_path, records_path, meta_path = self._paths()
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            dimension = json.load(f).get("dimension")
+        if dimension != self.dimension:
+            # Written by a different embedding model; start over rather than mixing spaces
+            for path in (vectors_path, records_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        records: List[Dict[str, Any]] = []
+        ends = [0]  # Byte offset after each complete record
+        if os.path.exists(records_path):
+            with open(records_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+                    ends.append(ends[-1] + len(line))
+        row_bytes = 4 * self.dimension
+        stored = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+        count = min(len(records), stored)
+        # An interrupted append can leave the files out of step; keep only complete pairs
+        if os.path.exists(records_path):
+            os.truncate(records_path, ends[count])
+        if os.path.exists(vectors_path):
+            os.truncate(vectors_path, count * row_bytes)
+        if not count:
+            return
+
+        self.records = records[:count]
+        self._vector_batches = [np.fromfile(vectors_path, dtype=np.float32, count=count * self.dimension)
+                                .reshape(count, self.dimension)]
+        trained = self.index_type == "ivf" and count >= self.nlist * 8
+        self.index = self._new_index(trained=trained)
+        self.index.add(self.vectors())
+
+class ChromaStore(VectorStore):
+    def __init__(self, persist_dir: str, collection: str):
+        try:
+            import chromadb
+        except ImportError as e:
+            raise ImportError("chromadb is not installed. Install it with: pip install -r requirements-chroma.txt") from e
+        self.client = chromadb.PersistentClient(path=persist_dir)
+        self.collection = self.client.get_or_create_collection(name=collection, metadata={"hnsw:space": "cosine"})
+
+    def add(self, vectors: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]]) -> List[str]:
+        ids = [str(uuid.uuid4()) for _ in texts]
+        self.collection.add(
+            ids=ids,
+            embeddings=[v.tolist() for v in vectors],
+            documents=texts,
+            # Chroma metadata values must be scalars
+            metadatas=[{k: v if isinstance(v, (str, int, float, bool)) else json.dumps(v) for k, v in m.items()} or None
+                       for m in metadatas]
+        )
+        return ids
+
+    def search(self, vector: np.ndarray, k: int) -> List[MemoryHit]:
+        count = self.count()
+        if not count:
+            return []
+        result = self.collection.query(query_embeddings=[vector.tolist()], n_results=min(k, count))
+        return [
+            MemoryHit(text=text, metadata=metadata or {}, score=1.0 - float(distance))
+            for text, metadata, distance in zip(result["documents"][0], result["metadatas"][0], result["distances"][0])
+        ]
+
+    def count(self) -> int:
+        return self.collection.count()
+
+class QdrantStore(VectorStore):
+    """Qdrant backend; runs against a server when url is set, otherwise locally on disk or in memory"""
+
+    def __init__(self, dimension: int, collection: str, url: str = "", api_key: str = "", path: str = ""):
+        try:
+            from qdrant_client import QdrantClient, models
+        except ImportError as e:
+            raise ImportError("qdrant-client is not installed. Install it with: pip install -r requirements-qdrant.txt") from e
+        self.models = models
+        self.collection = collection
+        if url:
+            self.client = QdrantClient(url=url, api_key=api_key or None)
+        elif path:
+            self.client = QdrantClient(path=path)
+        else:
+            self.client = QdrantClient(location=":memory:")
+        if not self.client.collection_exists(collection):
+            self.client.create_collection(
+                collection_name=collection,
+                vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE)
+            )
+
+    def add(self, vectors: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]]) -> List[str]:
+        ids = [str(uuid.uuid4()) for _ in texts]
+        self.client.upsert(
+            collection_name=self.collection,
+            points=[
+                self.models.PointStruct(id=i, vector=v.tolist(), payload={"text": t, "metadata": m})
+                for i, v, t, m in zip(ids, vectors, texts, metadatas)
+            ]
+        )
+        return ids
+
+    def search(self, vector: np.ndarray, k: int) -> List[MemoryHit]:
+        points = self.client.query_points(collection_name=self.collection, query=vector.tolist(), limit=k).points
+        return [
+            MemoryHit(text=p.payload.get("text", ""), metadata=p.payload.get("metadata", {}), score=float(p.score))
+            for p in points
+        ]
+
+    def count(self) -> int:
+        return self.client.count(collection_name=self.collection).count
+
+def create_vector_store(dimension: int, vector_store: Optional[str] = None) -> VectorStore:
+    """Create the vector store selected by MemoryConfig"""
+    vector_store = vector_store or MemoryConfig.vector_store or "faiss"
+    if vector_store == "faiss":
+        return FaissStore(
+            dimension,
+            index_type=MemoryConfig.faiss_index_type,
+            nlist=MemoryConfig.faiss_nlist,
+            hnsw_m=MemoryConfig.faiss_hnsw_m,
+            persist_dir=MemoryConfig.faiss_persist_dir
+        )
+    elif vector_store == "chroma":
+        return ChromaStore(MemoryConfig.chroma_persist_dir, MemoryConfig.memory_collection)
+    elif vector_store == "qdrant":
+        return QdrantStore(
+            dimension,
+            MemoryConfig.memory_collection,
+            url=MemoryConfig.qdrant_url,
+            api_key=MemoryConfig.qdrant_api_key,
+            path=MemoryConfig.qdrant_path
+        )
+    else:
+        raise ValueError(f"Unsupported vector store: {vector_store} # Options: chroma, qdrant, faiss")
+
+__all__ = ['MemoryHit', 'VectorStore', 'FaissStore', 'ChromaStore', 'QdrantStore', 'create_vector_store']
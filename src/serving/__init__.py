@@ -0,0 +1,5 @@
+from .scheduler import QueryScheduler, QueueFullError
+from .server import create_app
+from .batch import run_batch
+
+__all__ = ['QueryScheduler', 'QueueFullError', 'create_app', 'run_batch']
\ No newline at end of file
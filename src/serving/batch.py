@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+from src.agents.engine import QueryEngine
+from .scheduler import QueryScheduler
+
+def read_queries(lines: TextIO) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """Yield (id, record) for each JSONL line
+
+    A record's query is its "query" field, or its "title" and "body" joined (the
+    format of requests.jsonl). The id is "id" or "request_id", else the line number.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "query" not in record:
+            record["query"] = "\n\n".join(str(record[key]) for key in ("title", "body") if record.get(key))
+        yield record.get("id", record.get("request_id", line_no)), record
+
+async def run_batch(lines: TextIO, out: TextIO, scheduler: Optional[QueryScheduler] = None,
+                    timeout: Optional[float] = None) -> Dict[str, int]:
+    """Answer every query in lines, writing one JSON result per line to out as each completes"""
+    scheduler = scheduler or QueryScheduler()
+    # Read ahead only as far as the queue and workers can take, so large files are streamed
+    reading = asyncio.Semaphore(scheduler.queue_size + scheduler.workers)
+    totals = {"answered": 0, "failed": 0}
+
+    async def handle(query_id: Any, record: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            result = await scheduler.submit(
+                record["query"],
+                history=record.get("history"),
+                config=record.get("config"),
+                timeout=record.get("timeout", timeout)
+            )
+            row = {"id": query_id, "answer": result.answer, "elapsed": round(result.elapsed, 3)}
+            totals["answered"] += 1
+        except Exception as e:
+            row = {"id": query_id, "error": f"{type(e).__name__}: {e}", "elapsed": round(time.perf_counter() - started, 3)}
+            totals["failed"] += 1
+        finally:
+            reading.release()
+        out.write(json.dumps(row) + "\n")
+        out.flush()
+
+    tasks = []
+    for query_id, record in read_queries(lines):
+        await reading.acquire()
+        tasks.append(asyncio.create_task(handle(query_id, record)))
+    await asyncio.gather(*tasks)
+    await scheduler.close()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of queries and write JSONL answers")
+    parser.add_argument("input", help="JSONL file of queries, or - for stdin")
+    # Agents log to stdout, so answers go to a file unless - is given explicitly
+    parser.add_argument("output", help="JSONL file for answers, or - for stdout")
+    parser.add_argument("--workers", type=int, help="Queries answered at once (default: ENGINE_MAX_WORKERS)")
+    parser.add_argument("--timeout", type=float, help="Per-query deadline in seconds (default: SERVE_REQUEST_TIMEOUT)")
+    args = parser.parse_args()
+
+    lines = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        engine = QueryEngine(max_workers=args.workers) if args.workers else None
+        totals = asyncio.run(run_batch(lines, out, QueryScheduler(engine, workers=args.workers), args.timeout))
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"Answered {totals['answered']} queries, {totals['failed']} failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import asyncio
+import itertools
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from src.config.engine_config import EngineConfig
+from src.config.llm_config import LLMConfig
+from src.agents.engine import EngineAnswer, QueryEngine
+
+class QueueFullError(RuntimeError):
+    """Raised when a query is submitted without waiting and the queue is full"""
+
+@dataclass
+class QueryJob:
+    query: str
+    history: List[Dict[str, str]]
+    config: Optional[Dict[str, Any]]
+    provider: str
+    deadline: float
+    future: asyncio.Future = field(repr=False)
+    seq: int = 0
+    timer: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+class QueryScheduler:
+    """Bounded queue and worker pool in front of the query engine
+
+    Queries wait in a queue of at most queue_size entries; submit either waits for
+    room (batch mode) or fails fast with QueueFullError (HTTP mode). workers
+    queries run at once, and at most provider_limits[provider] of them against the
+    same LLM provider. Queries are queued per provider and a worker slot is only
+    given to the oldest query whose provider has capacity, so a saturated provider
+    never holds workers that queries for other providers could use. Every query has
+    a deadline covering both queueing and processing; a query still queued at its
+    deadline is dropped, and the caller of a running one gets a TimeoutError while
+    its thread finishes in the background (keeping its slots until then).
+    """
+
+    def __init__(self, engine: Optional[QueryEngine] = None, workers: Optional[int] = None,
+                 queue_size: Optional[int] = None, request_timeout: Optional[float] = None,
+                 provider_limits: Optional[Dict[str, int]] = None):
+        self.engine = engine or QueryEngine.shared()
+        self.workers = workers or EngineConfig.engine_max_workers
+        self.queue_size = queue_size or EngineConfig.serve_queue_size
+        self.request_timeout = request_timeout or EngineConfig.serve_request_timeout
+        self.provider_limits = provider_limits if provider_limits is not None else EngineConfig.get_provider_limits()
+        self._pending: Dict[str, Deque[QueryJob]] = defaultdict(deque)
+        self._room_waiters: Deque[asyncio.Future] = deque()
+        self._idle: Optional[asyncio.Event] = None
+        self._seq = itertools.count()
+        self.active = 0
+        self.running: Counter = Counter()
+        self.counts: Counter = Counter()
+
+    def _ensure_started(self):
+        # The idle event belongs to the event loop of the first submit
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    def queued(self) -> int:
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, self.workers)
+
+    @staticmethod
+    def provider_for(config: Optional[Dict[str, Any]]) -> str:
+        # crew_llm imports CrewAI, so it loads with the first query
+        from src.llm.crew_llm import llm_config_key
+        with LLMConfig.use_settings(config):
+            return llm_config_key()[0]
+
+    async def submit(self, query: str, history: Optional[List[Dict[str, str]]] = None,
+                     config: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+                     wait: bool = True) -> EngineAnswer:
+        """Queue a query and wait for its answer
+
+        Args:
+            timeout: Seconds until the query's deadline (defaults to SERVE_REQUEST_TIMEOUT)
+            wait: Wait for room when the queue is full instead of raising QueueFullError
+        """
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.request_timeout
+        job = QueryJob(query=query, history=list(history or []), config=config,
+                       provider=self.provider_for(config), deadline=loop.time() + timeout,
+                       future=loop.create_future(), seq=next(self._seq))
+        self.counts["submitted"] += 1
+        if self.queued() >= self.queue_size:
+            if not wait:
+                self.counts["rejected"] += 1
+                raise QueueFullError(f"Query queue is full ({self.queue_size} waiting)")
+            try:
+                await self._wait_for_room(job.deadline)
+            except asyncio.TimeoutError:
+                self.counts["expired"] += 1
+                raise TimeoutError(f"Query deadline of {timeout:g}s passed while waiting for a queue slot")
+
+        self._pending[job.provider].append(job)
+        self._idle.clear()
+        job.timer = loop.call_at(job.deadline, self._expire, job)
+        # A caller that goes away (or a query that expires) gives up its place in the queue
+        job.future.add_done_callback(lambda _: self._unqueue(job))
+        self._dispatch()
+        return await job.future
+
+    async def _wait_for_room(self, deadline: float):
+        loop = asyncio.get_running_loop()
+        while self.queued() >= self.queue_size:
+            waiter = loop.create_future()
+            self._room_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, max(deadline - loop.time(), 0))
+            finally:
+                if waiter in self._room_waiters:
+                    self._room_waiters.remove(waiter)
+
+    def _wake_room_waiter(self):
+        while self._room_waiters:
+            waiter = self._room_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _unqueue(self, job: QueryJob):
+        jobs = self._pending.get(job.provider)
+        if jobs and job in jobs:
+            jobs.remove(job)
+            self._wake_room_waiter()
+            self._check_idle()
+
+    def _expire(self, job: QueryJob):
+        if job.future.done():
+            return
+        self.counts["expired"] += 1
+        queued = job in self._pending.get(job.provider, ())
+        message = "while it was queued" if queued else "while it was being answered"
+        job.future.set_exception(TimeoutError(f"Query deadline passed {message}"))
+
+    def _dispatch(self):
+        """Start the oldest queued queries whose provider has capacity while workers are free"""
+        while self.active < self.workers:
+            ready = [jobs[0] for provider, jobs in self._pending.items()
+                     if jobs and self.running[provider] < self._limit(provider)]
+            if not ready:
+                return
+            job = min(ready, key=lambda j: j.seq)
+            self._pending[job.provider].popleft()
+            self._wake_room_waiter()
+            if not job.future.done():  # Expired or abandoned, but not yet unqueued by its callback
+                self._start(job)
+
+    def _start(self, job: QueryJob):
+        self.active += 1
+        self.running[job.provider] += 1
+        running = asyncio.ensure_future(self.engine.answer(job.query, job.history, job.config))
+        running.add_done_callback(lambda task: self._finished(job, task))
+
+    def _finished(self, job: QueryJob, running: asyncio.Future):
+        self.active -= 1
+        self.running[job.provider] -= 1
+        if job.timer is not None:
+            job.timer.cancel()
+        error = running.exception() if not running.cancelled() else asyncio.CancelledError()
+        if not job.future.done():
+            # Otherwise the query expired or its caller went away; nobody waits for the outcome
+            if error is not None:
+                self.counts["failed"] += 1
+                job.future.set_exception(error)
+            else:
+                self.counts["completed"] += 1
+                job.future.set_result(running.result())
+        self._dispatch()
+        self._check_idle()
+
+    def _check_idle(self):
+        if self._idle is not None and not self.active and not self.queued():
+            self._idle.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued(),
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            "running": {provider: count for provider, count in self.running.items() if count},
+            "provider_limits": self.provider_limits,
+            **{name: self.counts[name] for name in ("submitted", "completed", "failed", "rejected", "expired")}
+        }
+
+    async def close(self):
+        """Wait until queued and running queries have been handled"""
+        if self._idle is None:
+            return
+        await self._idle.wait()
+        self._idle = None
@@ -0,0 +1,77 @@
+import argparse
+from typing import Optional
+
+from src.config.engine_config import EngineConfig
+from src.agents.warmup import warm_up
+from .scheduler import QueryScheduler, QueueFullError
+
+def create_app(scheduler: Optional[QueryScheduler] = None):
+    """Create the ASGI app
+
+    POST /answer takes {"query", "history", "config", "timeout"} and returns the
+    engine's answer; GET /health reports queue and worker statistics.
+    """
+    try:
+        from starlette.applications import Starlette
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse
+        from starlette.routing import Route
+    except ImportError as e:
+        raise ImportError("starlette is not installed. Install it with: pip install -r requirements-server.txt") from e
+
+    scheduler = scheduler or QueryScheduler()
+    warm_up()
+
+    async def answer(request: Request) -> JSONResponse:
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Request body must be JSON"}, status_code=400)
+        query = payload.get("query") if isinstance(payload, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            return JSONResponse({"error": "A non-empty \"query\" string is required"}, status_code=400)
+
+        timeout = payload.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+            return JSONResponse({"error": "\"timeout\" must be a positive number of seconds"}, status_code=400)
+        if not isinstance(payload.get("history") or [], list) or not isinstance(payload.get("config") or {}, dict):
+            return JSONResponse({"error": "\"history\" must be a list and \"config\" an object"}, status_code=400)
+
+        try:
+            result = await scheduler.submit(
+                query,
+                history=payload.get("history"),
+                config=payload.get("config"),
+                timeout=timeout,
+                wait=False
+            )
+        except QueueFullError as e:
+            return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+        except TimeoutError as e:
+            return JSONResponse({"error": str(e)}, status_code=504)
+        except Exception as e:
+            return JSONResponse({"error": f"{type(e).__name__}: {e}"}, status_code=500)
+        return JSONResponse(result.model_dump())
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse(scheduler.stats())
+
+    return Starlette(routes=[
+        Route("/answer", answer, methods=["POST"]),
+        Route("/health", health, methods=["GET"])
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the query engine over HTTP")
+    parser.add_argument("--host", default=EngineConfig.serve_host)
+    parser.add_argument("--port", type=int, default=EngineConfig.serve_port)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError("uvicorn is not installed. Install it with: pip install -r requirements-server.txt") from e
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
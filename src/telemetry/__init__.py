@@ -0,0 +1,15 @@
+from .tracing import Span, Tracer, get_tracer, span, current_span, set_attribute, add_to_attribute, traced
+from .export import to_otlp_json, FileExporter
+
+__all__ = [
+    'Span',
+    'Tracer',
+    'get_tracer',
+    'span',
+    'current_span',
+    'set_attribute',
+    'add_to_attribute',
+    'traced',
+    'to_otlp_json',
+    'FileExporter'
+]
@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List
+
+from src.config.telemetry_config import TelemetryConfig
+from .tracing import Span
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    """An attribute value in OTLP/JSON form"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+def to_otlp_json(spans: List[Span], service_name: str = "") -> Dict[str, Any]:
+    """Spans as an OTLP/JSON ExportTraceServiceRequest, as accepted by OpenTelemetry collectors"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": otlp_value(service_name or TelemetryConfig.trace_service_name)}
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "src.telemetry"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": SPAN_KINDS.get(span.kind, 1),
+                        "startTimeUnixNano": str(int(span.start_time * 1e9)),
+                        "endTimeUnixNano": str(int((span.end_time or span.start_time) * 1e9)),
+                        "attributes": [{"key": k, "value": otlp_value(v)} for k, v in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                    }
+                    for span in spans
+                ]
+            }]
+        }]
+    }
+
+class FileExporter:
+    """Appends each finished trace to a file as one line of OTLP/JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, spans: List[Span]):
+        line = json.dumps(to_otlp_json(spans))
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+__all__ = ['to_otlp_json', 'FileExporter']
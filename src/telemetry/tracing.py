@@ -0,0 +1,169 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+from src.config.telemetry_config import TelemetryConfig
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def new_id(length: int) -> str:
+    return os.urandom(length // 2).hex()
+
+class Span(BaseModel):
+    """One timed stage of a query; spans of the same query share a trace_id"""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    kind: str = "internal"  # internal, client (LLM and tool calls)
+    start_time: float
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = {}
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_to_attribute(self, key: str, amount: float):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+class Tracer:
+    """Collects spans per trace and keeps the most recent max_traces traces
+
+    A trace is finished when its root span ends; it is then passed to the
+    exporters on a background thread, after the before_export hooks (e.g.
+    waiting for LLM token counts that arrive through events) have run.
+    """
+
+    _shared: Optional["Tracer"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled: bool = True, max_traces: int = 50):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exporters: List[Callable[[List[Span]], None]] = []
+        self.before_export: List[Callable[[], None]] = []
+        self._export_executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def shared(cls) -> "Tracer":
+        """Process-wide tracer configured from TelemetryConfig"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(TelemetryConfig.tracing_enabled, TelemetryConfig.trace_max_traces)
+                if TelemetryConfig.trace_export_path:
+                    from .export import FileExporter
+                    cls._shared.exporters.append(FileExporter(TelemetryConfig.trace_export_path))
+            return cls._shared
+
+    def start_span(self, name: str, kind: str = "internal", parent: Optional[Span] = None,
+                   start_time: Optional[float] = None, **attributes) -> Span:
+        parent = parent if parent is not None else _current_span.get()
+        span = Span(
+            trace_id=parent.trace_id if parent else new_id(32),
+            span_id=new_id(16),
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            kind=kind,
+            start_time=start_time or time.time(),
+            attributes=attributes
+        )
+        with self._lock:
+            self._traces.setdefault(span.trace_id, []).append(span)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        return span
+
+    def end_span(self, span: Span, end_time: Optional[float] = None):
+        span.end_time = end_time or time.time()
+        if span.parent_id is None:
+            self._finish_trace(span.trace_id)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+        """Time the enclosed block as a child of the current span"""
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return list(self._traces.get(trace_id, []))
+
+    def _finish_trace(self, trace_id: str):
+        if not self.exporters:
+            return
+        with self._lock:
+            if self._export_executor is None:
+                self._export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        self._export_executor.submit(self._export, trace_id)
+
+    def _export(self, trace_id: str):
+        for hook in self.before_export:
+            hook()
+        spans = self.get_trace(trace_id)
+        for exporter in self.exporters:
+            try:
+                exporter(spans)
+            except Exception as e:
+                logger.warning("Error exporting trace %s: %s", trace_id, e)
+
+def get_tracer() -> Tracer:
+    return Tracer.shared()
+
+def span(name: str, kind: str = "internal", **attributes):
+    """Context manager timing a stage of the current query"""
+    return get_tracer().span(name, kind, **attributes)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def set_attribute(key: str, value: Any):
+    """Set an attribute on the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+def add_to_attribute(key: str, amount: float):
+    """Add to a numeric attribute of the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.add_to_attribute(key, amount)
+
+def traced(name: str, kind: str = "internal") -> Callable:
+    """Decorator running a function inside a span"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+__all__ = ['Span', 'Tracer', 'get_tracer', 'span', 'current_span', 'set_attribute', 'add_to_attribute', 'traced']
@@ -1,11 +1,29 @@
-from .crew_tools import (
-    DuckDuckGoSearchTool,
-    WikipediaSearchTool,
-    get_search_tools
-)
+import importlib
+
+from .search_cache import SearchCache, get_search_cache, cached_search, is_failed_search
+
+# crew_tools imports CrewAI, so its tools load on first access
+_LAZY = {
+    'DuckDuckGoSearchTool': '.crew_tools',
+    'WikipediaSearchTool': '.crew_tools',
+    'FinalAnswerTool': '.crew_tools',
+    'get_search_tools': '.crew_tools'
+}
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'DuckDuckGoSearchTool',
     'WikipediaSearchTool',
-    'get_search_tools'
+    'FinalAnswerTool',
+    'get_search_tools',
+    'SearchCache',
+    'get_search_cache',
+    'cached_search',
+    'is_failed_search'
 ]
\ No newline at end of file
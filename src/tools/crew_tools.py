@@ -1,41 +1,74 @@
 # Import crewAI's native tools
+from typing import Any
 from crewai.tools import BaseTool
-from pydantic import Field
-from langchain_community.utilities import (
-    DuckDuckGoSearchAPIWrapper,
-    WikipediaAPIWrapper
-)
+from src.config.research_config import ResearchConfig
+from .passage_ranker import rank_tool_output
+from .search_cache import cached_search
 
 class DuckDuckGoSearchTool(BaseTool):
     name: str = "DuckDuckGo Search"
     description: str = "Search the internet using DuckDuckGo. Use this for general queries and finding current information."
-    search: DuckDuckGoSearchAPIWrapper = Field(default_factory=DuckDuckGoSearchAPIWrapper)
+    search: Any = None  # DuckDuckGoSearchAPIWrapper, created on first use
+    use_cache: bool = True  # Set to False to bypass the shared search result cache
+
+    def wrapper(self):
+        if self.search is None:
+            from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+            self.search = DuckDuckGoSearchAPIWrapper()
+        return self.search
 
     def _run(self, query: str) -> str:
         """Execute the search query and return results"""
         try:
-            return self.search.run(query)
+            return rank_tool_output(query, self.raw_search(query), self.name)
         except Exception as e:
             return f"Error performing DuckDuckGo search: {str(e)}"
 
+    def raw_search(self, query: str) -> str:
+        """Unranked results, for callers that rank the results of several tools together"""
+        return cached_search("duckduckgo", query, lambda q: self.wrapper().run(q), use_cache=self.use_cache)
+
 class WikipediaSearchTool(BaseTool):
     name: str = "Wikipedia Research"
     description: str = "Search Wikipedia for factual information and detailed explanations."
-    search: WikipediaAPIWrapper = Field(default_factory=WikipediaAPIWrapper)
+    search: Any = None  # WikipediaAPIWrapper, created on first use
+    use_cache: bool = True  # Set to False to bypass the shared search result cache
+
+    def wrapper(self):
+        if self.search is None:
+            from langchain_community.utilities import WikipediaAPIWrapper
+            self.search = WikipediaAPIWrapper()
+        return self.search
 
     def _run(self, query: str) -> str:
         """Search Wikipedia and return results"""
         try:
-            return self.search.run(query)
+            return rank_tool_output(query, self.raw_search(query), self.name)
         except Exception as e:
             return f"Error searching Wikipedia: {str(e)}"
 
-def get_search_tools():
+    def raw_search(self, query: str) -> str:
+        """Unranked results, for callers that rank the results of several tools together"""
+        return cached_search("wikipedia", query, lambda q: self.wrapper().run(q), use_cache=self.use_cache)
+
+class FinalAnswerTool(BaseTool):
+    name: str = "final_answer"
+    description: str = "Returns a natural language response to the user. The parameter is `text` with the complete answer."
+
+    def _run(self, text: str) -> str:
+        return text
+
+def get_search_tools(use_cache: bool = True):
     """Get available search tools"""
-    return [DuckDuckGoSearchTool(), WikipediaSearchTool()]
+    if ResearchConfig.wikipedia_backend == "local":
+        # Local lookups take milliseconds, so they skip the search cache
+        from .local_wiki import LocalWikipediaSearchTool
+        return [DuckDuckGoSearchTool(use_cache=use_cache), LocalWikipediaSearchTool()]
+    return [DuckDuckGoSearchTool(use_cache=use_cache), WikipediaSearchTool(use_cache=use_cache)]
 
 __all__ = [
     'DuckDuckGoSearchTool',
     'WikipediaSearchTool',
+    'FinalAnswerTool',
     'get_search_tools'
 ]
\ No newline at end of file
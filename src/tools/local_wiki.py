@@ -0,0 +1,255 @@
+"""Offline Wikipedia search over a local SQLite FTS5 index
+
+Build an index by streaming a compressed dump (or a JSONL corpus of
+{"title", "text"} records, or a folder of .txt files):
+
+    python -m src.tools.local_wiki enwiki-latest-pages-articles.xml.bz2 --index ./.cache/wiki_index.db
+
+then set WIKIPEDIA_BACKEND=local to answer Wikipedia lookups from it.
+"""
+import argparse
+import bz2
+import gzip
+import json
+import lzma
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from crewai.tools import BaseTool
+from src.config.research_config import ResearchConfig
+from .passage_ranker import rank_tool_output
+
+Article = Tuple[str, str]  # (title, text)
+
+WIKI_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+WIKI_TABLE = re.compile(r"\{\|.*?\|\}", re.S)
+WIKI_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S)
+WIKI_TAG = re.compile(r"<[^>]+>")
+WIKI_FILE_LINK = re.compile(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", re.I)
+WIKI_LINK = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]")
+WIKI_EXTERNAL_LINK = re.compile(r"\[https?://\S+\s*([^\]]*)\]")
+WIKI_HEADING = re.compile(r"^=+\s*(.*?)\s*=+\s*$", re.M)
+WIKI_EMPHASIS = re.compile(r"'{2,}")
+
+# Words matching most articles; OR-ing them in makes FTS5 score nearly every row
+STOPWORDS = frozenset(
+    "a about an and are as at be been by can could did do does for from had has have how i in into is it its "
+    "me my of on or our should tell than that the their them then there these they this those to was we "
+    "were what when where which who whom why will with would you your please explain describe".split()
+)
+MAX_MATCH_TERMS = 8
+
+def open_compressed(path: str) -> IO[bytes]:
+    """Open a file for streaming, decompressing .bz2, .gz and .xz on the fly"""
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+def clean_wikitext(text: str) -> str:
+    """Reduce wikitext markup to plain prose"""
+    text = WIKI_REF.sub("", text)
+    # Templates nest, so strip innermost ones until none are left
+    previous = None
+    while previous != text:
+        previous = text
+        text = WIKI_TEMPLATE.sub("", text)
+    text = WIKI_TABLE.sub("", text)
+    text = WIKI_FILE_LINK.sub("", text)
+    text = WIKI_LINK.sub(r"\1", text)
+    text = WIKI_EXTERNAL_LINK.sub(r"\1", text)
+    text = WIKI_HEADING.sub(r"\1", text)
+    text = WIKI_EMPHASIS.sub("", text)
+    text = WIKI_TAG.sub("", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def iter_wikipedia_dump(path: str) -> Iterator[Article]:
+    """Articles of a MediaWiki XML dump, read incrementally so memory stays flat"""
+    with open_compressed(path) as f:
+        title, namespace, redirect = "", "", False
+        root = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "start":
+                continue
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = elem.text or ""
+            elif tag == "ns":
+                namespace = elem.text or ""
+            elif tag == "redirect":
+                redirect = True
+            elif tag == "text" and namespace == "0" and not redirect and elem.text:
+                text = clean_wikitext(elem.text)
+                if text:
+                    yield title, text
+            elif tag == "page":
+                title, namespace, redirect = "", "", False
+                # Drop finished pages so the parsed tree does not grow with the dump
+                root.clear()
+
+def iter_jsonl_corpus(path: str) -> Iterator[Article]:
+    """Articles of a JSON lines file with "title" and "text" fields"""
+    with open_compressed(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield str(record.get("title", "")), str(record.get("text", ""))
+
+def iter_text_corpus(directory: str) -> Iterator[Article]:
+    """Articles from a folder of .txt files, titled by file name"""
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(".txt"):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    yield os.path.splitext(name)[0].replace("_", " "), f.read()
+
+def iter_corpus(path: str) -> Iterator[Article]:
+    """Articles of a Wikipedia dump or user-supplied corpus, chosen by path"""
+    if os.path.isdir(path):
+        return iter_text_corpus(path)
+    if re.search(r"\.jsonl?(\.(bz2|gz|xz))?$", path):
+        return iter_jsonl_corpus(path)
+    return iter_wikipedia_dump(path)
+
+class LocalWikiIndex:
+    """Full-text index of articles in one SQLite FTS5 file
+
+    Searches use a read-only connection per thread with the file memory-mapped,
+    so concurrent lookups do not contend on a lock or copy pages through reads.
+    """
+
+    _shared: Dict[str, "LocalWikiIndex"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, mmap_mb: Optional[int] = None):
+        self.path = path
+        self.mmap_size = (mmap_mb if mmap_mb is not None else ResearchConfig.local_wiki_mmap_mb) * 1024 * 1024
+        self._local = threading.local()
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> "LocalWikiIndex":
+        path = path or ResearchConfig.local_wiki_index_path
+        with cls._shared_lock:
+            if path not in cls._shared:
+                cls._shared[path] = cls(path)
+            return cls._shared[path]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"No local Wikipedia index at {self.path}; build one with python -m src.tools.local_wiki")
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            self._local.conn = conn
+        return conn
+
+    def build(self, articles: Iterable[Article], batch_size: int = 1000,
+              on_progress: Optional[Callable[[int], None]] = None) -> int:
+        """Index articles into a new file, replacing any existing index; returns the article count"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".building"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        # Bulk load: nothing else reads the file until it is renamed into place
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE VIRTUAL TABLE articles USING fts5(title, text, tokenize='porter unicode61')")
+        count = 0
+        batch: List[Article] = []
+        for article in articles:
+            batch.append(article)
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT INTO articles (title, text) VALUES (?, ?)", batch)
+                count += len(batch)
+                batch = []
+                if on_progress:
+                    on_progress(count)
+        if batch:
+            conn.executemany("INSERT INTO articles (title, text) VALUES (?, ?)", batch)
+            count += len(batch)
+        conn.commit()
+        # Merge the index segments so queries touch as few b-trees as possible
+        conn.execute("INSERT INTO articles (articles) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, self.path)
+        return count
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """An FTS5 query matching any of the query's content words, quoted so user text cannot inject syntax
+
+        Stopwords are left out (unless the query has nothing else) and at most
+        MAX_MATCH_TERMS distinct terms are used, longest first, so a lookup only
+        scores articles sharing a meaningful word with the query.
+        """
+        words = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+        terms = [word for word in words if word not in STOPWORDS] or words
+        terms = sorted(terms, key=len, reverse=True)[:MAX_MATCH_TERMS]
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def search(self, query: str, k: int = 3, max_chars: int = 2000) -> List[Article]:
+        """Best matching articles, ranked by BM25 with title matches weighted up"""
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        rows = self._connection().execute(
+            "SELECT title, substr(text, 1, ?) FROM articles WHERE articles MATCH ? "
+            "ORDER BY bm25(articles, 5.0, 1.0) LIMIT ?",
+            (max_chars, expression, k)
+        ).fetchall()
+        return [(title, text) for title, text in rows]
+
+class LocalWikipediaSearchTool(BaseTool):
+    name: str = "Wikipedia Research"
+    description: str = "Search Wikipedia for factual information and detailed explanations."
+    index_path: str = ""  # Defaults to LOCAL_WIKI_INDEX_PATH
+    top_k: int = 0  # Defaults to LOCAL_WIKI_TOP_K
+
+    def _run(self, query: str) -> str:
+        """Search the local index, formatting results like WikipediaAPIWrapper"""
+        try:
+            return rank_tool_output(query, self.raw_search(query), self.name)
+        except Exception as e:
+            return f"Error searching Wikipedia: {str(e)}"
+
+    def raw_search(self, query: str) -> str:
+        """Unranked results, for callers that rank the results of several tools together"""
+        index = LocalWikiIndex.shared(self.index_path or None)
+        results = index.search(query, self.top_k or ResearchConfig.local_wiki_top_k)
+        if not results:
+            return "No good Wikipedia Search Result was found"
+        return "\n\n".join(f"Page: {title}\nSummary: {text}" for title, text in results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a local Wikipedia full-text index")
+    parser.add_argument("source", help="MediaWiki XML dump (.xml, .bz2, .gz, .xz), JSONL corpus or folder of .txt files")
+    parser.add_argument("--index", default=ResearchConfig.local_wiki_index_path, help="Index file to write")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.time()
+    count = LocalWikiIndex(args.index).build(
+        iter_corpus(args.source), args.batch_size,
+        on_progress=lambda n: print(f"\rIndexed {n} articles ({time.time() - start:.0f}s)", end="", flush=True)
+    )
+    print(f"\rIndexed {count} articles into {args.index} in {time.time() - start:.1f}s")
+
+__all__ = ['LocalWikiIndex', 'LocalWikipediaSearchTool', 'iter_corpus', 'iter_wikipedia_dump', 'clean_wikitext']
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
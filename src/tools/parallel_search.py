@@ -0,0 +1,138 @@
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+from src.config.research_config import ResearchConfig
+from .search_cache import is_failed_search
+
+class SearchSnippet(BaseModel):
+    source: str
+    text: str
+
+class SearchResults(BaseModel):
+    snippets: List[SearchSnippet] = []
+    errors: Dict[str, str] = {}  # source -> error or timeout message
+    elapsed: float = 0.0
+
+    def to_prompt(self) -> str:
+        """Format merged snippets for a task prompt"""
+        return "\n\n".join(f"[{snippet.source}] {snippet.text}" for snippet in self.snippets)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_search_executor() -> ThreadPoolExecutor:
+    """Get the process-wide bounded thread pool used for search fan-out"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=ResearchConfig.search_max_workers,
+                thread_name_prefix="search"
+            )
+        return _executor
+
+def search_sources(tools: List) -> Dict[str, Callable[[str], str]]:
+    """Map search tools to callables taking a query string
+
+    Tools with raw_search() are called without their own ranking, since the
+    merged results are ranked once by the caller.
+    """
+    return {tool.name: getattr(tool, "raw_search", None) or (lambda query, tool=tool: tool.run(query=query))
+            for tool in tools}
+
+def split_passages(text: str) -> List[str]:
+    """Split raw tool output into passages on blank lines"""
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+def _dedupe_key(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+def merge_results(outputs: Dict[str, str]) -> List[SearchSnippet]:
+    """Merge tool outputs into passages, dropping repeated or contained passages"""
+    snippets: List[SearchSnippet] = []
+    seen: List[str] = []
+    for source, output in outputs.items():
+        for passage in split_passages(output):
+            key = _dedupe_key(passage)
+            if not key or any(key in other for other in seen):
+                continue
+            # A longer passage replaces shorter ones it contains
+            for i in range(len(seen) - 1, -1, -1):
+                if seen[i] in key:
+                    del seen[i]
+                    del snippets[i]
+            seen.append(key)
+            snippets.append(SearchSnippet(source=source, text=passage))
+    return snippets
+
+def parallel_search(query: str, sources: Dict[str, Callable[[str], str]],
+                    timeout: Optional[float] = None,
+                    timeouts: Optional[Dict[str, float]] = None,
+                    stop: Optional[Future] = None) -> SearchResults:
+    """Run every search source on the query at once and merge their results
+
+    Args:
+        query: The search query
+        sources: Source name -> function performing the search
+        timeout: Default per-source timeout in seconds
+        timeouts: Optional per-source overrides of the timeout
+        stop: Optional future whose completion abandons the sources still pending
+    """
+    timeout = timeout if timeout is not None else ResearchConfig.search_timeout
+    timeouts = timeouts or {}
+    executor = get_search_executor()
+    start = time.monotonic()
+
+    # Each search runs in a copy of the caller's context, so its span joins the caller's trace
+    futures: Dict[Future, str] = {
+        executor.submit(contextvars.copy_context().run, fn, query): name for name, fn in sources.items()
+    }
+    deadlines = {future: start + timeouts.get(name, timeout) for future, name in futures.items()}
+    outputs: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+
+    pending = set(futures)
+    while pending:
+        remaining = min(deadlines[future] for future in pending) - time.monotonic()
+        waiting = pending | {stop} if stop is not None else pending
+        done, _ = wait(waiting, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+        pending -= done
+        if stop is not None and stop.done():
+            # Sources not yet started are dropped from the pool's queue
+            for future in pending:
+                future.cancel()
+                errors[futures[future]] = "Cancelled"
+            break
+        for future in done:
+            name = futures[future]
+            try:
+                output = str(future.result())
+            except Exception as e:
+                errors[name] = f"Error: {str(e)}"
+                continue
+            # Error and "no result" texts are reported as errors, not merged as results
+            if is_failed_search(output):
+                errors[name] = output.strip() or "No results"
+            else:
+                outputs[name] = output
+        now = time.monotonic()
+        for future in [f for f in pending if deadlines[f] <= now]:
+            # The worker thread cannot be interrupted; its result is simply ignored
+            future.cancel()
+            errors[futures[future]] = f"Timed out after {deadlines[future] - start:.1f}s"
+            pending.discard(future)
+
+    # Keep source order stable regardless of completion order
+    ordered = {name: outputs[name] for name in sources if name in outputs}
+    return SearchResults(
+        snippets=merge_results(ordered),
+        errors=errors,
+        elapsed=time.monotonic() - start
+    )
+
+__all__ = ['SearchSnippet', 'SearchResults', 'parallel_search', 'search_sources', 'merge_results', 'get_search_executor']
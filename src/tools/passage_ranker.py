@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+from src.config.research_config import ResearchConfig
+from src.telemetry import span
+from .parallel_search import SearchSnippet, split_passages
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), as used for the chat context budget"""
+    return len(text) // 4 + 1
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def split_by_tokens(text: str, chunk_tokens: int) -> List[str]:
+    """Hard-split text without sentence breaks into runs of whole words (or slices of one huge word)"""
+    max_chars = max(chunk_tokens - 1, 1) * 4
+    pieces = []
+    current = ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {word}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_text(text: str, chunk_tokens: int) -> List[str]:
+    """Split tool output into paragraphs, and long paragraphs into runs of whole sentences
+
+    A sentence longer than chunk_tokens on its own is split by word count, so
+    every chunk fits the limit.
+    """
+    chunks = []
+    for passage in split_passages(text):
+        if estimate_tokens(passage) <= chunk_tokens:
+            chunks.append(passage)
+            continue
+        current = ""
+        for sentence in SENTENCE_END.split(passage):
+            if current and estimate_tokens(current) + estimate_tokens(sentence) > chunk_tokens:
+                chunks.append(current)
+                current = ""
+            if estimate_tokens(sentence) > chunk_tokens:
+                *whole, sentence = split_by_tokens(sentence, chunk_tokens)
+                chunks.extend(whole)
+            current = f"{current} {sentence}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+class BM25:
+    """Okapi BM25 over a small, per-query set of passages"""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(documents)) if documents else 0.0
+        doc_freq = Counter(term for doc in documents for term in set(doc))
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: List[str]) -> List[float]:
+        result = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            result.append(sum(
+                self.idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term in set(query) if term in counts
+            ))
+        return result
+
+def simhash(text: str, bits: int = 64) -> int:
+    """Fingerprint whose Hamming distance to another is small when the texts are near-duplicates"""
+    words = tokenize(text)
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))]
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for i in range(bits):
+            weights[i] += 1 if h >> i & 1 else -1
+    return sum(1 << i for i, weight in enumerate(weights) if weight > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class PassageRanker:
+    """Keeps the passages of search results most relevant to a query within a token budget
+
+    Results are chunked, scored with BM25 (blended with embedding similarity
+    when embedding_weight > 0), stripped of near-duplicates by SimHash, and
+    packed into token_budget in score order.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, chunk_tokens: Optional[int] = None,
+                 embedding_weight: Optional[float] = None, dedupe_distance: Optional[int] = None):
+        self.token_budget = token_budget or ResearchConfig.passage_token_budget
+        self.chunk_tokens = chunk_tokens or ResearchConfig.passage_chunk_tokens
+        self.embedding_weight = embedding_weight if embedding_weight is not None else ResearchConfig.passage_embedding_weight
+        self.dedupe_distance = dedupe_distance if dedupe_distance is not None else ResearchConfig.passage_dedupe_distance
+
+    def embedding_scores(self, query: str, passages: List[str]) -> Optional[np.ndarray]:
+        """Cosine similarity of each passage to the query, or None if no embedding model is available"""
+        try:
+            from src.memory import EmbeddingService
+            vectors = EmbeddingService.shared().embed([query] + passages)
+        except Exception as e:
+            logger.warning("Error embedding search passages, ranking with BM25 only: %s", e)
+            return None
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1
+        return vectors[1:] @ vectors[0] / (norms[1:] * norms[0])
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        scores = np.array(BM25([tokenize(p) for p in passages]).scores(tokenize(query)))
+        if scores.max(initial=0) > 0:
+            scores = scores / scores.max()
+        if self.embedding_weight > 0:
+            similarity = self.embedding_scores(query, passages)
+            if similarity is not None:
+                scores = (1 - self.embedding_weight) * scores + self.embedding_weight * similarity
+        return scores.tolist()
+
+    def rank(self, query: str, snippets: List[SearchSnippet]) -> List[SearchSnippet]:
+        chunks = [SearchSnippet(source=s.source, text=chunk)
+                  for s in snippets for chunk in chunk_text(s.text, self.chunk_tokens)]
+        if not chunks:
+            return []
+        with span("search.rank", passages=len(chunks)) as rank_span:
+            scores = self.score(query, [c.text for c in chunks])
+            # Stable sort: ties keep source order
+            order = sorted(range(len(chunks)), key=lambda i: -scores[i])
+
+            # Passages sharing nothing with the query are dropped, unless none do
+            relevant_only = scores[order[0]] > 0
+            kept: List[SearchSnippet] = []
+            fingerprints: List[int] = []
+            used = 0
+            for i in order:
+                if relevant_only and scores[i] <= 0:
+                    break
+                tokens = estimate_tokens(chunks[i].text)
+                if used + tokens > self.token_budget:
+                    continue
+                fingerprint = simhash(chunks[i].text)
+                if any(hamming_distance(fingerprint, other) <= self.dedupe_distance for other in fingerprints):
+                    continue
+                fingerprints.append(fingerprint)
+                kept.append(chunks[i])
+                used += tokens
+            if not kept:
+                # Even the best passage exceeds the budget: keep as much of it as fits rather than nothing
+                best = chunks[order[0]]
+                kept.append(SearchSnippet(source=best.source, text=split_by_tokens(best.text, self.token_budget)[0]))
+                used = estimate_tokens(kept[0].text)
+            if rank_span is not None:
+                rank_span.set_attribute("kept", len(kept))
+                rank_span.set_attribute("tokens", used)
+        return kept
+
+    def rank_text(self, query: str, text: str, source: str = "") -> str:
+        """Rank a single tool output, returning the kept passages as text"""
+        return "\n\n".join(s.text for s in self.rank(query, [SearchSnippet(source=source, text=text)]))
+
+def rank_passages(query: str, snippets: List[SearchSnippet]) -> List[SearchSnippet]:
+    """Rank snippets with the configured budget, or return them unchanged when ranking is disabled"""
+    if not ResearchConfig.passage_ranking_enabled:
+        return snippets
+    return PassageRanker().rank(query, snippets)
+
+def rank_tool_output(query: str, text: str, source: str = "") -> str:
+    """Trim a search tool's raw output to the passages most relevant to its query, when ranking is enabled"""
+    if not ResearchConfig.passage_ranking_enabled or not text.strip():
+        return text
+    return PassageRanker().rank_text(query, text, source) or text
+
+__all__ = ['PassageRanker', 'BM25', 'chunk_text', 'simhash', 'hamming_distance', 'rank_passages', 'rank_tool_output']
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.config.cache_config import CacheConfig
+from src.telemetry import span
+
+# Fallbacks that search wrappers and tools return instead of results
+FAILED_SEARCH = re.compile(r"^(?:No good .* Result was found|Error (?:searching|performing)\b)", re.I)
+
+def is_failed_search(result: str) -> bool:
+    """Whether a search output is empty, an error or a "no result" fallback"""
+    result = str(result or "").strip()
+    return not result or FAILED_SEARCH.match(result) is not None
+
+class SearchCache:
+    """Shared on-disk cache of search tool results with TTL and LRU eviction"""
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # One connection shared by all threads; access is serialized by self._lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        if path != ":memory:":
+            # WAL lets several app processes share the cache file without blocking readers
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_results (
+                tool TEXT NOT NULL,
+                query TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (tool, query)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_last_access ON search_results (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so trivially different spellings share a cache entry"""
+        return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+    def get(self, tool: str, query: str) -> Optional[str]:
+        """Return the cached result for a tool/query pair, or None on a miss"""
+        key = self.normalize_query(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM search_results WHERE tool = ? AND query = ?",
+                (tool, key)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM search_results WHERE tool = ? AND query = ?", (tool, key))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_results SET last_access = ? WHERE tool = ? AND query = ?",
+                (now, tool, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, tool: str, query: str, result: str):
+        """Store a result and evict the least recently used entries beyond the size cap"""
+        key = self.normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (tool, query, result, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (tool, key, result, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM search_results WHERE created_at < ?",
+                (now - self.ttl,)
+            )
+            self._conn.execute("""
+                DELETE FROM search_results WHERE rowid IN (
+                    SELECT rowid FROM search_results ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_results")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this process and the number of stored entries"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Get the process-wide search cache, or None if caching is disabled"""
+    global _search_cache
+    if not CacheConfig.search_cache_enabled:
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                path=CacheConfig.search_cache_path,
+                ttl=CacheConfig.search_cache_ttl,
+                max_entries=CacheConfig.search_cache_max_entries
+            )
+        return _search_cache
+
+def cached_search(tool: str, query: str, search_fn: Callable[[str], str], use_cache: bool = True) -> str:
+    """Run search_fn(query) through the search cache
+
+    Args:
+        tool: Cache namespace for the tool producing the result
+        query: The search query
+        search_fn: Function performing the actual search
+        use_cache: Set to False to bypass the cache for this call
+    """
+    with span("search", kind="client", tool=tool, query=query) as search_span:
+        cache = get_search_cache() if use_cache else None
+        if cache is not None:
+            cached = cache.get(tool, query)
+            if search_span is not None:
+                search_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                return cached
+
+        result = search_fn(query)
+        # A failed or empty lookup may be transient, so it is tried again next time
+        if cache is not None and not is_failed_search(result):
+            cache.set(tool, query, result)
+        return result
+
+__all__ = ['SearchCache', 'get_search_cache', 'cached_search', 'is_failed_search']
@@ -14,7 +14,8 @@ class EnvConfig:
             "LLM_PROVIDER": os.getenv("LLM_PROVIDER", "ollama"),
             "LLM_MODEL": os.getenv("LLM_MODEL", "gemma3:4b"),
             "GROQ_API_KEY": os.getenv("GROQ_API_KEY", ""),
-            "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "")
+            "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", ""),
+            "STREAM_RESPONSES": os.getenv("STREAM_RESPONSES", "true")
         }
         return env_vars
 
@@ -62,15 +63,24 @@ class EnvConfig:
                                       value=st.session_state.env_vars.get("GEMINI_API_KEY", ""), 
                                       type="password")
             
+            stream_responses = st.checkbox(
+                "Stream responses",
+                value=str(st.session_state.env_vars.get("STREAM_RESPONSES", "true")).split("#")[0].strip().lower() in ("1", "true", "yes")
+            )
+            
             if st.button("Save Configuration"):
                 new_config = {
                     "LLM_PROVIDER": provider,
                     "LLM_MODEL": model,
+                    "STREAM_RESPONSES": "true" if stream_responses else "false",
                 }
                 
                 if provider in ["groq", "gemini"]:
                     new_config[f"{provider.upper()}_API_KEY"] = api_key
                 
                 st.session_state.env_vars.update(new_config)
+                # Pooled LLM clients and agents were built for the previous configuration
+                from src.llm.crew_llm import invalidate_llm_cache
+                invalidate_llm_cache()
                 st.success("Configuration updated!")
                 # st.rerun()
\ No newline at end of file
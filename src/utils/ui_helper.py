@@ -1,33 +1,57 @@
+import asyncio
 import streamlit as st
-from typing import Optional, Any, Dict
-from src.config import Config, MemoryConfig
+from typing import Optional, Any, AsyncIterator, Dict, Iterable, Iterator, List
+from src.config import Config, MemoryConfig, UIConfig
+from src.agents.events import WorkflowEvent
+from src.memory import ConversationStore
+from src.telemetry import Span, get_tracer
 
 class StreamlitUI:
     @staticmethod
     def initialize_session_state():
         """Initialize all required session state variables"""
         if 'messages' not in st.session_state:
-            st.session_state.messages = []
+            # Compact, bounded log of the chat; older turns are compressed or spilled to disk
+            st.session_state.messages = ConversationStore()
         if 'current_step' not in st.session_state:
             st.session_state.current_step = None
         if 'env_vars' not in st.session_state:
             st.session_state.env_vars = Config.get_all()
         if 'progress_updates' not in st.session_state:
+            # Progress of the current query only; it is never added to the chat messages
             st.session_state.progress_updates = []
+        if 'history_limit' not in st.session_state:
+            st.session_state.history_limit = UIConfig.chat_page_size
         if 'show_progress' not in st.session_state:
             st.session_state.show_progress = True
+        if 'last_trace_id' not in st.session_state:
+            st.session_state.last_trace_id = None
 
     @staticmethod
     def setup_sidebar():
         """Setup the sidebar with current step indicator and configuration options"""
+        st.session_state.step_placeholder = st.sidebar.empty()
+        if st.session_state.current_step:
+            st.session_state.step_placeholder.info(st.session_state.current_step)
         StreamlitUI.setup_memory_config_ui()
+        # Filled in now and again once a query has finished
+        st.session_state.trace_panel = st.sidebar.empty()
+        StreamlitUI.show_trace_panel()
 
     @staticmethod
     def show_chat_messages():
-        """Display all chat messages from the session state"""
-        for message in st.session_state.messages:
+        """Display the latest page of chat messages, with a button revealing earlier ones"""
+        messages = st.session_state.messages
+        hidden = len(messages) - st.session_state.history_limit
+        if hidden > 0:
+            st.button(f"Show earlier messages ({hidden} hidden)", on_click=StreamlitUI.show_earlier_messages)
+        for message in messages.recent(st.session_state.history_limit):
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+
+    @staticmethod
+    def show_earlier_messages():
+        st.session_state.history_limit += UIConfig.chat_page_size
     
     @staticmethod
     def add_chat_message(role: str, content: str, is_progress: bool = False):
@@ -38,21 +62,141 @@ class StreamlitUI:
             content: The content of the message
             is_progress: Whether this is a progress update message
         """
-        # Add to session state
-        st.session_state.messages.append({"role": role, "content": content})
-        
-        # Display the message
         if is_progress:
-            if st.session_state.show_progress:
-                st.session_state.progress_updates.append({"role": role, "content": content})
-                with st.expander("Progress Updates", expanded=True):
-                    for update in st.session_state.progress_updates:
-                        with st.chat_message(update["role"]):
-                            st.markdown(update["content"])
+            StreamlitUI.add_progress(role, content)
+            return
+
+        st.session_state.messages.append(role, content)
+        with st.chat_message(role):
+            st.markdown(content)
+
+    @staticmethod
+    def start_progress():
+        """Begin the progress log of a new query; its panel is created with the first update"""
+        st.session_state.progress_updates = []
+        st.session_state.progress_box = None
+        st.session_state.progress_overflow = None
+
+    @staticmethod
+    def add_progress(role: str, content: str):
+        """Append one update to the progress panel without redrawing the earlier ones"""
+        updates = st.session_state.progress_updates
+        updates.append({"role": role, "content": content})
+        if not st.session_state.show_progress:
+            return
+
+        if st.session_state.get("progress_box") is None:
+            st.session_state.progress_box = st.expander("Progress Updates", expanded=True)
+        with st.session_state.progress_box:
+            if len(updates) <= UIConfig.progress_max_visible:
+                with st.chat_message(role):
+                    st.markdown(content)
+                return
+            # Past the cap, one line is rewritten in place instead of adding elements
+            if st.session_state.get("progress_overflow") is None:
+                st.session_state.progress_overflow = st.empty()
+            latest = content if len(content) <= 200 else content[:200] + "..."
+            st.session_state.progress_overflow.caption(
+                f"{len(updates) - UIConfig.progress_max_visible} more updates. Latest: {latest}"
+            )
+
+    @staticmethod
+    def stream_chat_message(role: str, chunks: Iterable[str]) -> str:
+        """Display a message as its chunks arrive and add the full text to the chat history
+        
+        Args:
+            role: The role of the message sender (user, assistant, system)
+            chunks: Iterable of text chunks making up the message
+        
+        Returns:
+            The complete message text
+        """
+        with st.chat_message(role):
+            content = st.write_stream(chunks)
+        if not isinstance(content, str):
+            content = "".join(str(part) for part in content)
+        st.session_state.messages.append(role, content)
+        return content
+
+    @staticmethod
+    def handle_event(event: WorkflowEvent):
+        """Show a query engine event: step updates go to the current step, the rest to progress"""
+        if event.type == "step":
+            st.session_state.current_step = event.message
+            placeholder = st.session_state.get("step_placeholder")
+            if placeholder is not None:
+                placeholder.info(event.message)
+        elif event.type == "trace":
+            st.session_state.last_trace_id = event.data["trace_id"]
         else:
-            # Display immediately if it's not a progress message
-            with st.chat_message(role):
-                st.markdown(content)
+            StreamlitUI.add_chat_message(event.role, event.message, is_progress=True)
+
+    @staticmethod
+    def trace_rows(spans: List[Span]) -> List[Dict[str, Any]]:
+        """One row per span in call order, indented under its parent"""
+        depth = {}
+        rows = []
+        for span in sorted(spans, key=lambda s: s.start_time):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+            attributes = span.attributes
+            tokens = attributes.get("prompt_tokens", 0) + attributes.get("completion_tokens", 0)
+            cache_hit = attributes.get("cache_hit", attributes.get("hit"))
+            rows.append({
+                "stage": "\u00a0\u00a0" * depth[span.span_id] + span.name,
+                "ms": round(span.duration * 1000) if span.duration is not None else None,
+                "tokens": tokens or None,
+                "cache": {True: "hit", False: "miss"}.get(cache_hit, ""),
+                "detail": attributes.get("agent_role") or attributes.get("tool") or attributes.get("decision") or span.error or ""
+            })
+        return rows
+
+    @staticmethod
+    def show_trace_panel():
+        """Show the time, tokens and cache hits of each stage of the last query in the sidebar"""
+        trace_id = st.session_state.get("last_trace_id")
+        panel = st.session_state.get("trace_panel")
+        spans = get_tracer().get_trace(trace_id) if trace_id else []
+        if panel is None or not spans:
+            return
+        with panel.container():
+            with st.expander("Last Query Trace"):
+                root = next((span for span in spans if span.parent_id is None), None)
+                if root is not None and root.duration is not None:
+                    llm_calls = [span for span in spans if span.name == "llm.call"]
+                    tokens = sum(span.attributes.get("prompt_tokens", 0) + span.attributes.get("completion_tokens", 0)
+                                 for span in llm_calls)
+                    st.caption(f"{root.duration:.2f}s, {len(llm_calls)} LLM calls, {tokens} tokens")
+                st.dataframe(StreamlitUI.trace_rows(spans), hide_index=True)
+
+    @staticmethod
+    def iter_async(chunks: AsyncIterator[str]) -> Iterator[str]:
+        """Consume an async stream from the script thread, so its events can update the page
+        
+        The first chunk is fetched before returning, so progress reported while the
+        answer is being prepared is rendered outside the streamed message.
+        """
+        loop = asyncio.new_event_loop()
+
+        def pull() -> Optional[str]:
+            try:
+                return loop.run_until_complete(chunks.__anext__())
+            except StopAsyncIteration:
+                return None
+
+        first = pull()
+
+        def rest():
+            try:
+                chunk = first
+                while chunk is not None:
+                    yield chunk
+                    chunk = pull()
+            finally:
+                # Closing the stream stops and waits for the engine's worker, so nothing
+                # is posted to the loop once it is closed
+                loop.run_until_complete(chunks.aclose())
+                loop.close()
+        return rest()
 
     @staticmethod
     def setup_memory_config_ui():